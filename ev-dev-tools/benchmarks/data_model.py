@@ -0,0 +1,153 @@
+#!/usr/bin/env -S python3 -tt
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Benchmark of the generator internal data model.
+
+Builds the template data of all type files and interfaces of a synthetic tree and renders their headers.
+Reports the memory retained by the template data and the time needed for building and rendering it.  The
+definitions and the type files they reference get loaded beforehand, so the yaml parsing doesn't hide the
+cost of the data model.  With --baseline-rev, the same is measured with ev-cli of the given git revision.
+"""
+
+from pathlib import Path
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import synthetic_tree
+
+from interface_calls import extract_ev_cli
+
+
+BENCHMARKS_DIR = Path(__file__).parent.resolve()
+EV_CLI_SRC = BENCHMARKS_DIR.parent / 'src'
+
+# runs in a subprocess with the ev_cli package of the measured variant, prints the results as json
+MEASURE_SCRIPT = '''
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from ev_cli import ev, helpers
+from ev_cli.type_parsing import TypeParser
+
+(tree, repeat) = (Path(sys.argv[1]), int(sys.argv[2]))
+ev.everest_dirs = helpers.everest_dirs = [tree]
+ev.work_dir = tree
+ev.validators = TypeParser.validators = helpers.load_validators(tree / 'schemas')
+ev.setup_jinja_env()
+TypeParser.templates = ev.templates
+
+# referenced type files get loaded while building, keep them in memory like the definitions themselves
+loaded_type_defs = {}
+load_type_definition = TypeParser.load_type_definition
+TypeParser.load_type_definition = staticmethod(
+    lambda type_path: loaded_type_defs.get(type_path) or loaded_type_defs.setdefault(
+        type_path, load_type_definition(type_path)))
+
+type_defs = [(twn, TypeParser.load_type_definition(twn['path'])[0]) for twn in ev.list_types_with_namespace()]
+if_defs = [(interface, ev.load_interface_definition(interface)[0]) for interface in ev.list_all_interfaces()]
+
+
+def build():
+    return ([TypeParser.generate_tmpl_data_for_type(twn, type_def) for (twn, type_def) in type_defs] +
+            [ev.generate_tmpl_data_for_if(interface, if_def, False) for (interface, if_def) in if_defs])
+
+
+def render(all_tmpl_data):
+    return sum(len(ev.templates['types.hpp'].render(tmpl_data)) for tmpl_data in all_tmpl_data)
+
+
+def best_time(function, *args):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return (best, result)
+
+
+# the templates expect these, like types_genhdr and interface_genhdr set them
+def prepare(all_tmpl_data):
+    for tmpl_data in all_tmpl_data:
+        info = tmpl_data['info']
+        info.setdefault('interface_name', info.get('type', info.get('interface')))
+        info['namespace'] = ['types', 'bench']
+        info['hpp_guard'] = 'BENCH_HPP'
+        info.setdefault('type_groups', [])
+    return all_tmpl_data
+
+
+(build_time, all_tmpl_data) = best_time(build)
+(render_time, rendered_bytes) = best_time(render, prepare(all_tmpl_data))
+del all_tmpl_data
+
+gc.collect()
+tracemalloc.start()
+before = tracemalloc.get_traced_memory()[0]
+all_tmpl_data = prepare(build())
+gc.collect()
+retained = tracemalloc.get_traced_memory()[0] - before
+tracemalloc.stop()
+
+print(json.dumps({'build_time': build_time, 'render_time': render_time, 'retained_bytes': retained,
+                  'rendered_bytes': rendered_bytes}))
+'''
+
+
+def run_variant(ev_cli_src: Path, tree: Path, repeat: int):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(ev_cli_src), env.get('PYTHONPATH')]))
+    output = subprocess.run([sys.executable, '-c', MEASURE_SCRIPT, str(tree), str(repeat)], check=True,
+                            env=env, capture_output=True, text=True).stdout
+
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the generator internal data model')
+    parser.add_argument('--baseline-rev', type=str, help='git revision of ev-cli to compare against')
+    parser.add_argument('--size', choices=synthetic_tree.SIZES.keys(), default='large',
+                        help='size of the synthetic tree (default: large)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the best counts (default: 3)')
+    parser.add_argument('--keep', action='store_true', help='keep the synthetic tree')
+    args = parser.parse_args()
+
+    tree = Path(tempfile.mkdtemp(prefix='ev-cli-data-model-bench-'))
+    try:
+        synthetic_tree.generate_tree(tree, synthetic_tree.SIZES[args.size])
+
+        variants = [('current', EV_CLI_SRC)]
+        if args.baseline_rev:
+            variants.insert(0, (args.baseline_rev, extract_ev_cli(args.baseline_rev, tree / 'baseline-src')))
+
+        results = {name: run_variant(src, tree, args.repeat) for (name, src) in variants}
+
+        rows = [('retained [KiB]', lambda result: f'{result["retained_bytes"] / 1024:.0f}'),
+                ('build [ms]', lambda result: f'{result["build_time"] * 1000:.1f}'),
+                ('render [ms]', lambda result: f'{result["render_time"] * 1000:.1f}'),
+                ('rendered bytes', lambda result: str(result['rendered_bytes']))]
+        print(f'{"":<16}' + ''.join(f'{name:>16}' for name in results))
+        for (header, value) in rows:
+            print(f'{header:<16}' + ''.join(f'{value(result):>16}' for result in results.values()))
+    finally:
+        if args.keep:
+            print(f'kept synthetic tree in {tree}')
+        else:
+            shutil.rmtree(tree)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+// SPDX-License-Identifier: Apache-2.0
+// Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+//
+// Micro benchmark of the generated enum conversions against the former linear if-chains.
+//
+// Gets compiled by enum_conversion.py, which generates the types header for the BenchEnum enum with
+// BENCH_ENUM_SIZE values and the legacy conversion functions.
+#include <algorithm>
+#include <chrono>
+#include <cstdint>
+#include <cstdlib>
+#include <iomanip>
+#include <iostream>
+#include <random>
+#include <stdexcept>
+#include <string>
+#include <vector>
+
+#include <generated/types/enum_bench.hpp>
+
+#include "legacy_enum_bench.hpp"
+
+using types::enum_bench::BenchEnum;
+
+template <typename Function> static double ns_per_op(std::size_t iterations, Function&& function) {
+    const auto start = std::chrono::steady_clock::now();
+    for (std::size_t i = 0; i < iterations; ++i) {
+        function(i);
+    }
+    const std::chrono::duration<double, std::nano> duration = std::chrono::steady_clock::now() - start;
+    return duration.count() / iterations;
+}
+
+static void report(const char* name, double legacy, double generated) {
+    std::cout << std::left << std::setw(24) << name << std::right << std::fixed << std::setprecision(2)
+              << std::setw(12) << legacy << std::setw(12) << generated << std::setw(10) << legacy / generated
+              << std::endl;
+}
+
+int main(int argc, char* argv[]) {
+    const std::size_t iterations = (argc > 1) ? std::strtoull(argv[1], nullptr, 10) : 2000000;
+
+    std::vector<BenchEnum> values;
+    std::vector<std::string> strings;
+    for (int i = 0; i < BENCH_ENUM_SIZE; ++i) {
+        values.push_back(static_cast<BenchEnum>(i));
+    }
+    // random access order, so the branch predictor can't learn the sequence
+    std::shuffle(values.begin(), values.end(), std::mt19937(42));
+    for (const auto value : values) {
+        strings.push_back(types::enum_bench::bench_enum_to_string(value));
+    }
+
+    // check, that both implementations agree before measuring
+    for (std::size_t i = 0; i < values.size(); ++i) {
+        if (legacy::string_to_bench_enum(strings[i]) != types::enum_bench::string_to_bench_enum(strings[i]) ||
+            legacy::bench_enum_to_string(values[i]) != types::enum_bench::bench_enum_to_string_view(values[i])) {
+            std::cerr << "conversions disagree for " << strings[i] << std::endl;
+            return 1;
+        }
+    }
+
+    volatile std::uint64_t sink = 0;
+    const auto count = values.size();
+
+    std::cout << BENCH_ENUM_SIZE << " enum values, " << iterations << " iterations" << std::endl;
+    std::cout << std::left << std::setw(24) << "[ns/op]" << std::right << std::setw(12) << "legacy" << std::setw(12)
+              << "generated" << std::setw(10) << "speedup" << std::endl;
+
+    const auto legacy_parse = ns_per_op(iterations, [&](std::size_t i) {
+        sink = sink + static_cast<std::uint64_t>(legacy::string_to_bench_enum(strings[i % count]));
+    });
+    const auto generated_parse = ns_per_op(iterations, [&](std::size_t i) {
+        sink = sink + static_cast<std::uint64_t>(types::enum_bench::string_to_bench_enum(strings[i % count]));
+    });
+    report("string to enum", legacy_parse, generated_parse);
+
+    const auto legacy_to_string = ns_per_op(iterations, [&](std::size_t i) {
+        sink = sink + legacy::bench_enum_to_string(values[i % count]).size();
+    });
+    const auto generated_to_string = ns_per_op(iterations, [&](std::size_t i) {
+        sink = sink + types::enum_bench::bench_enum_to_string_view(values[i % count]).size();
+    });
+    report("enum to string(_view)", legacy_to_string, generated_to_string);
+
+    return 0;
+}
@@ -0,0 +1,114 @@
+#!/usr/bin/env -S python3 -tt
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Micro benchmark of the enum conversion functions generated into the types headers.
+
+Generates the types header of a synthetic enum with ev-cli, together with the former linear if-chain
+implementation of the conversions, compiles enum_conversion.cpp against both and runs it.
+"""
+
+from pathlib import Path
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import yaml
+
+import synthetic_tree
+
+
+BENCHMARKS_DIR = Path(__file__).parent.resolve()
+EV_CLI_SRC = BENCHMARKS_DIR.parent / 'src'
+
+# words of OCPP like error codes, combined into enum values of varying length
+WORDS = ['Connector', 'Lock', 'Failure', 'EV', 'Communication', 'Error', 'Ground', 'High', 'Temperature',
+         'Internal', 'Local', 'List', 'Conflict', 'No', 'Other', 'Over', 'Current', 'Voltage', 'Power', 'Meter',
+         'Reader', 'Reset', 'Under', 'Weak', 'Signal', 'Mode', 'Charging', 'Profile', 'Rejected', 'Not', 'Supported']
+
+LEGACY_ENUM_CONVERSIONS = '''#pragma once
+// linear if-chain conversions, as generated before
+namespace legacy {{
+using types::enum_bench::BenchEnum;
+
+static const std::string bench_enum_to_string(BenchEnum e) {{
+    switch (e) {{
+{to_string_cases}
+    }}
+
+    throw std::out_of_range("No known string conversion for provided enum of type BenchEnum");
+}}
+
+static const BenchEnum string_to_bench_enum(std::string s) {{
+{string_to_ifs}
+
+    throw std::out_of_range("Provided string " + s + " could not be converted to enum of type BenchEnum");
+}}
+}} // namespace legacy
+'''
+
+
+def enum_values(size: int, seed: int):
+    rnd = random.Random(seed)
+    values = []
+    while len(values) < size:
+        value = ''.join(rnd.sample(WORDS, rnd.randint(1, 4)))
+        if value not in values:
+            values.append(value)
+    return values
+
+
+def write_legacy_header(path: Path, values):
+    path.write_text(LEGACY_ENUM_CONVERSIONS.format(
+        to_string_cases='\n'.join(f'    case BenchEnum::{value}: return "{value}";' for value in values),
+        string_to_ifs='\n'.join(f'    if (s == "{value}") {{\n        return BenchEnum::{value};\n    }}'
+                                for value in values)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the generated enum conversions')
+    parser.add_argument('--enum-size', type=int, default=64, help='number of enum values (default: 64)')
+    parser.add_argument('--iterations', type=int, default=2000000, help='iterations per measurement')
+    parser.add_argument('--seed', type=int, default=0, help='seed for generating the enum values')
+    parser.add_argument('--keep', action='store_true', help='keep the generated sources')
+    args = parser.parse_args()
+
+    cxx = os.environ.get('CXX', 'c++')
+    values = enum_values(args.enum_size, args.seed)
+
+    tree = Path(tempfile.mkdtemp(prefix='ev-cli-enum-bench-'))
+    try:
+        synthetic_tree.generate_tree(tree, synthetic_tree.TreeSize(type_files=0, interfaces=0, modules=0))
+        (tree / 'types' / 'enum_bench.yaml').write_text(yaml.safe_dump({
+            'description': 'enum conversion benchmark',
+            'types': {'BenchEnum': {'description': 'benchmark enum', 'type': 'string', 'enum': values}}
+        }, sort_keys=False))
+
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(EV_CLI_SRC), env.get('PYTHONPATH')]))
+        subprocess.run([sys.executable, '-m', 'ev_cli.ev', 'types', 'generate-headers', '--everest-dir', str(tree),
+                        '--work-dir', str(tree), '--schemas-dir', str(tree / 'schemas'), '--disable-clang-format',
+                        '-o', str(tree / 'include' / 'generated' / 'types')],
+                       check=True, env=env, stdout=subprocess.DEVNULL)
+        write_legacy_header(tree / 'include' / 'legacy_enum_bench.hpp', values)
+
+        binary = tree / 'enum_conversion'
+        subprocess.run([cxx, '-std=c++17', '-O2', f'-DBENCH_ENUM_SIZE={len(values)}', '-I', str(tree / 'include'),
+                        str(BENCHMARKS_DIR / 'enum_conversion.cpp'), '-o', str(binary)], check=True)
+        subprocess.run([str(binary), str(args.iterations)], check=True)
+    finally:
+        if args.keep:
+            print(f'kept sources in {tree}')
+        else:
+            shutil.rmtree(tree)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+// SPDX-License-Identifier: Apache-2.0
+// Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+//
+// Micro benchmark of the command calls of a generated Interface.hpp.
+//
+// Gets compiled by interface_calls.py, which generates interface_calls_samples.hpp with the interface
+// under test and sample values of its object argument and result.
+#include <chrono>
+#include <cstdint>
+#include <cstdlib>
+#include <iostream>
+#include <tuple>
+#include <type_traits>
+
+#include "interface_calls_samples.hpp"
+
+template <typename C, typename R, typename... A> std::tuple<std::decay_t<A>...> arguments_of(R (C::*)(A...));
+
+template <typename Function> static double calls_per_second(std::size_t iterations, Function&& function) {
+    const auto start = std::chrono::steady_clock::now();
+    for (std::size_t i = 0; i < iterations; ++i) {
+        function();
+    }
+    const std::chrono::duration<double> duration = std::chrono::steady_clock::now() - start;
+    return iterations / duration.count();
+}
+
+int main(int argc, char* argv[]) {
+    const std::size_t iterations = (argc > 1) ? std::strtoull(argv[1], nullptr, 10) : 200000;
+
+    std::uint64_t received = 0;
+    const json configure_result = json::parse(configure_result_sample);
+
+    Everest::ModuleAdapter adapter;
+    adapter.call = [&](const Requirement&, const std::string& cmd_name, Parameters args) -> Result {
+        received += args.size();
+        if (cmd_name == "configure") {
+            return configure_result;
+        }
+        return json(true);
+    };
+    adapter.subscribe = [](const Requirement&, const std::string&, ValueCallback) {};
+
+    BenchInterface intf(&adapter, Requirement{"bench", 0}, "bench");
+
+    decltype(arguments_of(&BenchInterface::call_configure)) configure_args;
+    std::get<0>(configure_args) = json::parse(configure_config_sample);
+    std::get<2>(configure_args).resize(8);
+    std::get<3>(configure_args) = 16.0;
+
+    const auto configure = calls_per_second(iterations, [&]() {
+        std::apply([&](const auto&... args) { intf.call_configure(args...); }, configure_args);
+    });
+    const auto enable = calls_per_second(iterations, [&]() { received += intf.call_enable(true); });
+
+    std::cout << "configure " << configure << std::endl;
+    std::cout << "enable " << enable << std::endl;
+
+    return (received > 0) ? 0 : 1;
+}
@@ -0,0 +1,128 @@
+#!/usr/bin/env -S python3 -tt
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Micro benchmark of the command calls of generated interface headers.
+
+Generates the headers of a synthetic interface, compiles interface_calls.cpp against them with a stub
+ModuleAdapter and reports the calls per second.  With --baseline-rev, the headers are additionally
+generated with ev-cli of the given git revision, so the effect of template changes can be compared.
+"""
+
+from pathlib import Path
+import argparse
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+import yaml
+
+import synthetic_tree
+
+
+BENCHMARKS_DIR = Path(__file__).parent.resolve()
+EV_CLI_SRC = BENCHMARKS_DIR.parent / 'src'
+
+SAMPLES_HEADER = '''#pragma once
+#include <generated/interfaces/bench_if0/Interface.hpp>
+
+using BenchInterface = bench_if0Intf;
+
+static const char* const configure_config_sample = R"sample({config})sample";
+static const char* const configure_result_sample = R"sample({result})sample";
+'''
+
+
+def extract_ev_cli(rev: str, target: Path) -> Path:
+    """Extract the ev_cli package of the given git revision into target and return its source directory."""
+    # run from within ev-dev-tools, git archive stores the paths relative to it
+    archive = subprocess.run(['git', 'archive', '--format=tar', rev, '--', 'src/ev_cli'],
+                             cwd=BENCHMARKS_DIR.parent, check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target)
+
+    return target / 'src'
+
+
+def generate_samples(tree: Path):
+    """Generate sample json values for the object argument and result of the configure command."""
+    sys.path.insert(0, str(EV_CLI_SRC))
+    from ev_cli import helpers
+    from ev_cli.type_parsing import TypeParser
+
+    helpers.everest_dirs = [tree]
+    TypeParser.validators = helpers.load_validators(tree / 'schemas')
+
+    configure = yaml.safe_load((tree / 'interfaces' / 'bench_if0.yaml').read_text())['cmds']['configure']
+    return (TypeParser.generate_sample_json(configure['arguments']['config']),
+            TypeParser.generate_sample_json(configure['result']))
+
+
+def run_variant(name: str, ev_cli_src: Path, tree: Path, samples, include_dirs, iterations: int):
+    variant_dir = tree / name
+    include_dir = variant_dir / 'include'
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(ev_cli_src), env.get('PYTHONPATH')]))
+    common = ['--everest-dir', str(tree), '--work-dir', str(tree), '--schemas-dir', str(tree / 'schemas'),
+              '--disable-clang-format']
+    for (kind, output) in (('types', 'types'), ('interface', 'interfaces')):
+        subprocess.run([sys.executable, '-m', 'ev_cli.ev', kind, 'generate-headers', *common, '-f',
+                        '-o', str(include_dir / 'generated' / output)],
+                       check=True, env=env, stdout=subprocess.DEVNULL)
+
+    (variant_dir / 'interface_calls_samples.hpp').write_text(
+        SAMPLES_HEADER.format(config=json.dumps(samples[0]), result=json.dumps(samples[1])))
+
+    binary = variant_dir / 'interface_calls'
+    cxx = os.environ.get('CXX', 'c++')
+    include_args = [arg for include in include_dirs for arg in ('-I', include)]
+    subprocess.run([cxx, '-std=c++17', '-O2', '-I', str(variant_dir), '-I', str(include_dir),
+                    '-I', str(BENCHMARKS_DIR / 'stubs'), *include_args, str(BENCHMARKS_DIR / 'interface_calls.cpp'),
+                    '-o', str(binary)], check=True)
+    output = subprocess.run([str(binary), str(iterations)], check=True, capture_output=True, text=True).stdout
+
+    return {cmd: float(calls) for (cmd, calls) in (line.split() for line in output.splitlines())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the command calls of generated interface headers')
+    parser.add_argument('--baseline-rev', type=str, help='git revision of ev-cli to compare against')
+    parser.add_argument('--iterations', type=int, default=200000, help='calls per measurement (default: 200000)')
+    parser.add_argument('--include-dir', '-I', action='append', default=[],
+                        help='additional include directory, e.g. for nlohmann/json.hpp')
+    parser.add_argument('--keep', action='store_true', help='keep the generated sources')
+    args = parser.parse_args()
+
+    tree = Path(tempfile.mkdtemp(prefix='ev-cli-interface-bench-'))
+    try:
+        synthetic_tree.generate_tree(tree, synthetic_tree.TreeSize(interfaces=1, modules=0))
+        samples = generate_samples(tree)
+
+        variants = [('current', EV_CLI_SRC)]
+        if args.baseline_rev:
+            variants.insert(0, (args.baseline_rev, extract_ev_cli(args.baseline_rev, tree / 'baseline-src')))
+
+        results = {name: run_variant(name, src, tree, samples, args.include_dir, args.iterations)
+                   for (name, src) in variants}
+
+        print(f'{"[calls/s]":<16}' + ''.join(f'{name:>16}' for name in results))
+        for cmd in results['current']:
+            print(f'{cmd:<16}' + ''.join(f'{result[cmd]:>16.0f}' for result in results.values()))
+    finally:
+        if args.keep:
+            print(f'kept sources in {tree}')
+        else:
+            shutil.rmtree(tree)
+
+
+if __name__ == '__main__':
+    main()
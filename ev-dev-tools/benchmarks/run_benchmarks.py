@@ -0,0 +1,186 @@
+#!/usr/bin/env -S python3 -tt
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Benchmark ev-cli subcommands on synthetic everest trees.
+
+Every benchmark runs ev-cli in a subprocess and records its wall time and peak RSS.  The results are
+compared against a stored baseline and the run fails, if a result exceeds the baseline by more than the
+given tolerance.
+"""
+
+from pathlib import Path
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import synthetic_tree
+
+
+BENCHMARKS_DIR = Path(__file__).parent.resolve()
+DEFAULT_BASELINE = BENCHMARKS_DIR / 'baseline.json'
+EV_CLI_SRC = BENCHMARKS_DIR.parent / 'src'
+
+
+def run_measured(cmd, cwd: Path):
+    """Run cmd and return (wall time in s, peak RSS in KiB)."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(EV_CLI_SRC), env.get('PYTHONPATH')]))
+
+    # stderr goes to a file, a pipe could fill up while we wait for the child
+    with tempfile.TemporaryFile() as err_file:
+        start = time.perf_counter()
+        process = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=err_file)
+        # wait4 gives us the resource usage of exactly this child
+        (_pid, status, rusage) = os.wait4(process.pid, 0)
+        wall_time = time.perf_counter() - start
+        err_file.seek(0)
+        stderr = err_file.read().decode(errors='replace')
+    process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+
+    if process.returncode != 0:
+        raise RuntimeError(f'{" ".join(cmd)} failed with return code {process.returncode}:\n{stderr}')
+
+    return (wall_time, rusage.ru_maxrss)
+
+
+def ev_cli(*args):
+    return [sys.executable, '-m', 'ev_cli.ev', *args]
+
+
+def benchmark_commands(tree: Path, size: synthetic_tree.TreeSize, schemas_dir: Path, out_dir: Path):
+    """Return the benchmarks as {name: [commands]} - the commands of a benchmark run one after another."""
+    common = ['--everest-dir', str(tree), '--work-dir', str(tree), '--schemas-dir', str(schemas_dir),
+              '--disable-clang-format']
+    modules = synthetic_tree.module_names(size)
+    largest_type_file = max((tree / 'types').glob('**/*.yaml'), key=lambda path: path.stat().st_size)
+
+    return {
+        'types generate-headers': [ev_cli('types', 'generate-headers', *common, '-f', '-o', str(out_dir / 'types'))],
+        'interface generate-headers': [
+            ev_cli('interface', 'generate-headers', *common, '-f', '-o', str(out_dir / 'interfaces'))],
+        'module generate-loader': [
+            ev_cli('module', 'generate-loader', *common, '-o', str(out_dir / 'modules'), mod) for mod in modules],
+        'module create': [ev_cli('module', 'create', *common, '-f', mod) for mod in modules],
+        'module update': [ev_cli('module', 'update', *common, '-f', mod) for mod in modules],
+        'helpers yaml2json': [ev_cli('helpers', 'yaml2json', str(largest_type_file), str(out_dir / 'types.json'))],
+        'helpers json2yaml': [ev_cli('helpers', 'json2yaml', str(out_dir / 'types.json'), str(out_dir / 'types.yaml'))],
+        'helpers yaml2json tree': [ev_cli('helpers', 'yaml2json', '-f', str(tree / 'types'), str(tree / 'interfaces'),
+                                          str(tree / 'modules'), str(out_dir / 'json'))],
+        'validate': [ev_cli('validate', *common)],
+    }
+
+
+def run_size(size_name: str, size: synthetic_tree.TreeSize, repeat: int, schemas_dir: Path, keep: bool,
+             selected=None):
+    tree = Path(tempfile.mkdtemp(prefix=f'ev-cli-bench-{size_name}-'))
+    try:
+        synthetic_tree.generate_tree(tree, size, schemas=schemas_dir is None)
+        (tree / 'build').mkdir()
+        commands = benchmark_commands(tree, size, schemas_dir or tree / 'schemas', tree / 'build')
+
+        results = {}
+        for name, cmds in commands.items():
+            if selected and name not in selected:
+                continue
+            best_time = None
+            peak_rss = 0
+            for _ in range(repeat):
+                total_time = 0.0
+                for cmd in cmds:
+                    (wall_time, max_rss) = run_measured(cmd, tree)
+                    total_time += wall_time
+                    peak_rss = max(peak_rss, max_rss)
+                best_time = total_time if best_time is None else min(best_time, total_time)
+
+            results[name] = {'time_s': round(best_time, 4), 'max_rss_kib': peak_rss}
+            print(f'  {name:<32}{best_time:>10.3f} s{peak_rss / 1024:>10.1f} MiB', flush=True)
+
+        return results
+    finally:
+        if keep:
+            print(f'  kept tree in {tree}')
+        else:
+            shutil.rmtree(tree)
+
+
+def compare(results, baseline, time_tolerance: float, rss_tolerance: float):
+    """Compare results against baseline and return a list of regressions."""
+    regressions = []
+    for size_name, size_results in results.items():
+        for name, result in size_results.items():
+            reference = baseline.get(size_name, {}).get(name)
+            if reference is None:
+                print(f'No baseline for {size_name}/{name}')
+                continue
+
+            for key, tolerance in (('time_s', time_tolerance), ('max_rss_kib', rss_tolerance)):
+                if result[key] > reference[key] * tolerance:
+                    regressions.append(f'{size_name}/{name}: {key} {result[key]} exceeds baseline {reference[key]} '
+                                       f'by more than a factor of {tolerance}')
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ev-cli on synthetic everest trees')
+    parser.add_argument('--size', '-s', action='append', choices=synthetic_tree.SIZES.keys(),
+                        help='tree size(s) to benchmark (default: small)')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='repetitions per benchmark, the best time '
+                        'is taken (default: 3)')
+    parser.add_argument('--schemas-dir', type=str, help='everest-framework schema directory, if not given '
+                        'permissive schemas are generated into the synthetic tree')
+    parser.add_argument('--baseline', type=str, default=str(DEFAULT_BASELINE),
+                        help=f'baseline file (default: {DEFAULT_BASELINE})')
+    parser.add_argument('--update-baseline', action='store_true', help='store the results as new baseline')
+    parser.add_argument('--time-tolerance', type=float, default=1.5,
+                        help='allowed factor of time compared to the baseline (default: 1.5)')
+    parser.add_argument('--rss-tolerance', type=float, default=1.25,
+                        help='allowed factor of peak RSS compared to the baseline (default: 1.25)')
+    parser.add_argument('--output', '-o', type=str, help='write the results to this json file')
+    parser.add_argument('--keep', action='store_true', help='keep the generated trees')
+    parser.add_argument('--benchmark', '-b', action='append',
+                        help='only run the given benchmark(s), e.g. "module update" (default: all)')
+    args = parser.parse_args()
+
+    schemas_dir = Path(args.schemas_dir).resolve() if args.schemas_dir else None
+    results = {}
+    for size_name in args.size or ['small']:
+        print(f'Benchmarking {size_name} tree')
+        results[size_name] = run_size(size_name, synthetic_tree.SIZES[size_name], args.repeat, schemas_dir, args.keep,
+                                      args.benchmark)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + '\n')
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        for size_name, size_results in results.items():
+            baseline.setdefault(size_name, {}).update(size_results)
+        baseline_path.write_text(json.dumps(baseline, indent=2) + '\n')
+        print(f'Updated baseline {baseline_path}')
+        return
+
+    if not baseline_path.exists():
+        print(f'No baseline file {baseline_path} - use --update-baseline to create one')
+        return
+
+    regressions = compare(results, json.loads(baseline_path.read_text()), args.time_tolerance, args.rss_tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+
+    if regressions:
+        exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+// SPDX-License-Identifier: Apache-2.0
+// Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+//
+// Minimal stand-in for the ModuleAdapter of everest-framework, so generated interface headers can be
+// compiled and benchmarked without the framework.
+#ifndef EV_CLI_BENCHMARK_STUBS_MODULE_ADAPTER_HPP
+#define EV_CLI_BENCHMARK_STUBS_MODULE_ADAPTER_HPP
+
+#include <cstddef>
+#include <functional>
+#include <iostream>
+#include <optional>
+#include <string>
+#include <variant>
+#include <vector>
+
+#include <nlohmann/json.hpp>
+
+using json = nlohmann::json;
+using Parameters = json;
+using Result = std::optional<json>;
+using Value = json;
+using Object = json::object_t;
+using Array = json::array_t;
+using ValueCallback = std::function<void(const Value&)>;
+
+#define EVLOG_error std::cerr
+
+struct Requirement {
+    std::string id;
+    std::size_t index;
+};
+
+namespace Everest {
+namespace detail {
+template <typename T> struct FundamentalTypeTrait { static constexpr json::value_t type = json::value_t::null; };
+} // namespace detail
+
+template <typename... Ts> json variant_to_json(const std::variant<Ts...>& value) {
+    return std::visit([](const auto& alternative) { return json(alternative); }, value);
+}
+
+struct ModuleAdapter {
+    std::function<Result(const Requirement&, const std::string&, Parameters)> call;
+    std::function<void(const Requirement&, const std::string&, ValueCallback)> subscribe;
+};
+} // namespace Everest
+
+#endif // EV_CLI_BENCHMARK_STUBS_MODULE_ADAPTER_HPP
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Generate synthetic everest trees of configurable size for benchmarking ev-cli.
+"""
+
+from dataclasses import dataclass, asdict
+from pathlib import Path
+import random
+import subprocess
+
+import yaml
+
+
+@dataclass
+class TreeSize:
+    """Shape of a synthetic everest tree."""
+    type_files: int = 4
+    types_per_file: int = 4
+    interfaces: int = 4
+    modules: int = 2
+    nesting_depth: int = 2
+    ref_fanout: int = 2
+    enum_size: int = 8
+
+
+SIZES = {
+    'small': TreeSize(),
+    'medium': TreeSize(type_files=8, types_per_file=6, interfaces=12, modules=4,
+                       nesting_depth=3, ref_fanout=3, enum_size=16),
+    'large': TreeSize(type_files=32, types_per_file=12, interfaces=48, modules=16,
+                      nesting_depth=4, ref_fanout=6, enum_size=64),
+}
+
+
+# the schemas of everest-framework are not available offline, so the generated tree contains permissive ones
+PERMISSIVE_SCHEMAS = ['interface', 'manifest', 'config', 'type']
+
+
+def _nested_object(name: str, depth: int) -> dict:
+    properties = {
+        f'{name}_id': {'description': 'identifier', 'type': 'string'},
+        f'{name}_value': {'description': 'value', 'type': 'number'},
+    }
+    if depth > 0:
+        properties[f'{name}_child'] = _nested_object(f'{name}_child', depth - 1)
+
+    return {
+        'description': f'nested object {name}',
+        'type': 'object',
+        'required': [f'{name}_id'],
+        'properties': properties
+    }
+
+
+def _type_file(file_idx: int, size: TreeSize, rnd: random.Random) -> dict:
+    types = {}
+    for type_idx in range(size.types_per_file):
+        types[f'Enum{type_idx}'] = {
+            'description': f'synthetic enum {type_idx}',
+            'type': 'string',
+            'enum': [f'Value{type_idx}_{value}' for value in range(size.enum_size)]
+        }
+
+        properties = {
+            'id': {'description': 'identifier', 'type': 'string'},
+            'count': {'description': 'counter', 'type': 'integer'},
+            'ratio': {'description': 'ratio', 'type': 'number'},
+            'active': {'description': 'flag', 'type': 'boolean'},
+            'samples': {'description': 'samples', 'type': 'array', 'items': {'type': 'number'}},
+            'mode': {'description': 'mode', 'type': 'string', '$ref': f'/bench/t{file_idx}#/Enum{type_idx}'},
+        }
+        if size.nesting_depth > 0:
+            properties[f'o{type_idx}'] = _nested_object(f'o{type_idx}', size.nesting_depth - 1)
+
+        # only reference types of previous files, so no include cycles get generated
+        for ref_idx in range(size.ref_fanout if file_idx > 0 else 0):
+            ref_file = rnd.randrange(file_idx)
+            ref_type = rnd.randrange(size.types_per_file)
+            if ref_idx % 2 == 0:
+                properties[f'ref{ref_idx}'] = {
+                    'description': 'referenced object',
+                    'type': 'object',
+                    '$ref': f'/bench/t{ref_file}#/Object{ref_type}'
+                }
+            else:
+                properties[f'ref{ref_idx}'] = {
+                    'description': 'referenced enums',
+                    'type': 'array',
+                    'items': {'type': 'string', '$ref': f'/bench/t{ref_file}#/Enum{ref_type}'}
+                }
+
+        types[f'Object{type_idx}'] = {
+            'description': f'synthetic object {type_idx}',
+            'type': 'object',
+            'required': ['id', 'count'],
+            'properties': properties
+        }
+
+    return {'description': f'synthetic types {file_idx}', 'types': types}
+
+
+def _random_type_ref(size: TreeSize, rnd: random.Random, kind: str) -> str:
+    return f'/bench/t{rnd.randrange(size.type_files)}#/{kind}{rnd.randrange(size.types_per_file)}'
+
+
+def _interface(size: TreeSize, rnd: random.Random) -> dict:
+    return {
+        'description': 'synthetic interface',
+        'vars': {
+            'state': {'description': 'object var', 'type': 'object', '$ref': _random_type_ref(size, rnd, 'Object')},
+            'mode': {'description': 'enum var', 'type': 'string', '$ref': _random_type_ref(size, rnd, 'Enum')},
+            'level': {'description': 'number var', 'type': 'number'},
+        },
+        'cmds': {
+            'configure': {
+                'description': 'command with object, enum and array arguments',
+                'arguments': {
+                    'config': {'description': 'config', 'type': 'object',
+                               '$ref': _random_type_ref(size, rnd, 'Object')},
+                    'mode': {'description': 'mode', 'type': 'string', '$ref': _random_type_ref(size, rnd, 'Enum')},
+                    'modes': {
+                        'description': 'modes',
+                        'type': 'array',
+                        'items': {'type': 'string', '$ref': _random_type_ref(size, rnd, 'Enum')}
+                    },
+                    'limit': {'description': 'limit', 'type': 'number'},
+                },
+                'result': {'description': 'result', 'type': 'object', '$ref': _random_type_ref(size, rnd, 'Object')}
+            },
+            'enable': {
+                'description': 'command with primitive arguments',
+                'arguments': {'value': {'description': 'value', 'type': 'boolean'}},
+                'result': {'description': 'result', 'type': 'boolean'}
+            },
+        }
+    }
+
+
+def _manifest(mod_idx: int, size: TreeSize, rnd: random.Random) -> dict:
+    provided = rnd.sample(range(size.interfaces), min(2, size.interfaces))
+    required = rnd.sample(range(size.interfaces), min(2, size.interfaces))
+    return {
+        'description': f'synthetic module {mod_idx}',
+        'config': {'enabled': {'description': 'enabled', 'type': 'boolean', 'default': True}},
+        'provides': {
+            f'impl{idx}': {
+                'description': 'implementation',
+                'interface': f'bench_if{if_idx}',
+                'config': {'limit': {'description': 'limit', 'type': 'integer', 'default': 16}}
+            } for idx, if_idx in enumerate(provided)
+        },
+        'requires': {f'req{idx}': {'interface': f'bench_if{if_idx}'} for idx, if_idx in enumerate(required)},
+        'metadata': {'license': 'https://opensource.org/licenses/Apache-2.0', 'authors': ['ev-cli benchmark']}
+    }
+
+
+def generate_tree(root: Path, size: TreeSize, seed: int = 0, schemas: bool = True) -> Path:
+    """Generate a synthetic everest tree in root and return root.
+
+    The tree is a git repository, because ev-cli tags generated files with git information.
+    """
+    rnd = random.Random(seed)
+
+    types_dir = root / 'types' / 'bench'
+    types_dir.mkdir(parents=True, exist_ok=True)
+    for file_idx in range(size.type_files):
+        (types_dir / f't{file_idx}.yaml').write_text(
+            yaml.safe_dump(_type_file(file_idx, size, rnd), sort_keys=False))
+
+    if_dir = root / 'interfaces'
+    if_dir.mkdir(parents=True, exist_ok=True)
+    for if_idx in range(size.interfaces):
+        (if_dir / f'bench_if{if_idx}.yaml').write_text(yaml.safe_dump(_interface(size, rnd), sort_keys=False))
+
+    for mod_idx in range(size.modules):
+        mod_dir = root / 'modules' / f'BenchMod{mod_idx}'
+        mod_dir.mkdir(parents=True, exist_ok=True)
+        (mod_dir / 'manifest.yaml').write_text(yaml.safe_dump(_manifest(mod_idx, size, rnd), sort_keys=False))
+
+    if schemas:
+        schemas_dir = root / 'schemas'
+        schemas_dir.mkdir(parents=True, exist_ok=True)
+        for schema in PERMISSIVE_SCHEMAS:
+            (schemas_dir / f'{schema}.yaml').write_text(yaml.safe_dump({'type': 'object'}))
+
+    if not (root / '.git').exists():
+        subprocess.run(['git', 'init', '-q', str(root)], check=True)
+
+    (root / 'tree-size.yaml').write_text(yaml.safe_dump({'seed': seed, **asdict(size)}))
+
+    return root
+
+
+def module_names(size: TreeSize):
+    return [f'BenchMod{mod_idx}' for mod_idx in range(size.modules)]
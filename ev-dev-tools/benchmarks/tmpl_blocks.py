@@ -0,0 +1,121 @@
+#!/usr/bin/env -S python3 -tt
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Benchmark of the extraction of the user blocks, which module update preserves.
+
+Writes module headers, whose blocks contain --block-lines lines of user code each, and loads the blocks of all of
+them, like module update does.  With --baseline-rev, the same is measured with ev-cli of the given git revision.
+"""
+
+from pathlib import Path
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from interface_calls import extract_ev_cli
+
+
+BENCHMARKS_DIR = Path(__file__).parent.resolve()
+EV_CLI_SRC = BENCHMARKS_DIR.parent / 'src'
+
+# the blocks definition of the module headers, as used by module update
+BLOCKS_DEF = {
+    'version': 'v1',
+    'format_str': '// ev@{uuid}:{version}',
+    'regex_str': r'^(?P<indent>\s*)// ev@(?P<uuid>[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-'
+                 r'[0-9a-f]{12}):(?P<version>.*)$',
+    'definitions': {
+        'add_headers': {'id': '4bf81b14-a215-475c-a1d3-0a484ae48918', 'content': ''},
+        'public_defs': {'id': '1fce4c5e-0ab8-41bb-90f7-14277703d2ac', 'content': ''},
+        'private_defs': {'id': '211cfdbe-f69a-4cd6-a4ec-f8aaa3d1b6c8', 'content': ''},
+    }
+}
+
+# runs in a subprocess with the ev_cli package of the measured variant, prints the results as json
+MEASURE_SCRIPT = '''
+import json
+import sys
+import time
+from pathlib import Path
+
+from ev_cli import helpers
+
+(blocks_def, files, repeat) = (json.loads(sys.argv[1]), sorted(Path(sys.argv[2]).iterdir()), int(sys.argv[3]))
+
+
+def load_all():
+    if hasattr(helpers, 'load_tmpl_blocks_of_files'):
+        return helpers.load_tmpl_blocks_of_files([(blocks_def, path) for path in files], True)
+    return [helpers.load_tmpl_blocks(blocks_def, path, True) for path in files]
+
+
+best = None
+for _ in range(repeat):
+    start = time.perf_counter()
+    blocks = load_all()
+    elapsed = time.perf_counter() - start
+    best = elapsed if best is None else min(best, elapsed)
+
+print(json.dumps({'time': best, 'content_bytes': sum(len(block['content']) for file_blocks in blocks
+                                                     for block in file_blocks.values())}))
+'''
+
+
+def write_files(files_dir: Path, files: int, block_lines: int):
+    files_dir.mkdir(parents=True)
+    for index in range(files):
+        lines = [f'#ifndef MODULE_{index}_HPP', f'#define MODULE_{index}_HPP', '']
+        for (block_name, block_def) in BLOCKS_DEF['definitions'].items():
+            tag = BLOCKS_DEF['format_str'].format(uuid=block_def['id'], version=BLOCKS_DEF['version'])
+            lines.append(tag)
+            lines += [f'    int {block_name}_{line}{{{line}}}; // user code of module {index}'
+                      for line in range(block_lines)]
+            lines.append(tag)
+            lines += ['', f'class Generated{index} {{', '};', '']
+        lines.append('#endif')
+        (files_dir / f'Module{index}.hpp').write_text('\n'.join(lines) + '\n')
+
+
+def run_variant(ev_cli_src: Path, files_dir: Path, repeat: int):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(ev_cli_src), env.get('PYTHONPATH')]))
+    output = subprocess.run([sys.executable, '-c', MEASURE_SCRIPT, json.dumps(BLOCKS_DEF), str(files_dir),
+                             str(repeat)], check=True, env=env, capture_output=True, text=True).stdout
+
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the extraction of the user blocks of module files')
+    parser.add_argument('--baseline-rev', type=str, help='git revision of ev-cli to compare against')
+    parser.add_argument('--files', type=int, default=200, help='number of module files (default: 200)')
+    parser.add_argument('--block-lines', type=int, default=2000,
+                        help='lines of user code per block (default: 2000)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the best counts (default: 3)')
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix='ev-cli-tmpl-blocks-bench-'))
+    try:
+        write_files(work_dir / 'files', args.files, args.block_lines)
+
+        variants = [('current', EV_CLI_SRC)]
+        if args.baseline_rev:
+            variants.insert(0, (args.baseline_rev, extract_ev_cli(args.baseline_rev, work_dir / 'baseline-src')))
+
+        for (name, src) in variants:
+            result = run_variant(src, work_dir / 'files', args.repeat)
+            print(f'{name:<16}{result["time"] * 1000:>10.1f} ms{result["content_bytes"]:>14} bytes of blocks')
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Provide seeded corpora of random payloads, which are valid against the schemas of types and interfaces.
+
+The payloads pick random enum members, arrays of random length and random optional properties, so they cover
+the shapes the generated serializers and the MQTT path see in practice.  Every corpus file gets its own random
+generator, seeded by the seed and the name of the file, so a corpus is reproducible and doesn't change when other
+files are added or left out.
+"""
+
+from . import helpers
+from .type_parsing import TypeParser
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List
+import math
+import random
+import re
+import string
+import uuid
+
+
+WORDS = ['everest', 'charger', 'evse', 'connector', 'session', 'meter', 'power', 'energy', 'limit', 'phase',
+         'voltage', 'current', 'token', 'auth', 'plug', 'socket', 'grid', 'tariff', 'schedule', 'status']
+
+# random integers and numbers without limits stay in this range, like real measurements
+DEFAULT_MINIMUM = -1000
+DEFAULT_MAXIMUM = 100000
+
+# below this depth of nested objects, optional properties are left out and arrays are as short as possible,
+# so recursive types terminate
+MAX_DEPTH = 16
+
+
+class PayloadGenerator:
+    """Generate random json values valid against a schema."""
+
+    def __init__(self, rng: random.Random, max_array_length: int = 8, optional_probability: float = 0.5):
+        self.rng = rng
+        self.max_array_length = max_array_length
+        self.optional_probability = optional_probability
+        self.unmatched_patterns = set()
+
+    def generate(self, schema: Dict, depth: int = 0):
+        if '$ref' in schema:
+            schema = TypeParser.resolve_type_schema(schema['$ref'], schema['type'])
+
+        json_type = schema.get('type')
+        if isinstance(json_type, list):
+            json_type = self.rng.choice(json_type)
+
+        if 'enum' in schema:
+            return self.rng.choice(schema['enum'])
+        if 'const' in schema:
+            return schema['const']
+
+        if json_type == 'object':
+            return self.generate_object(schema, depth)
+        elif json_type == 'array':
+            return self.generate_array(schema, depth)
+        elif json_type == 'string':
+            return self.generate_string(schema)
+        elif json_type == 'integer':
+            return self.generate_integer(schema)
+        elif json_type == 'number':
+            return self.generate_number(schema)
+        elif json_type == 'boolean':
+            return self.rng.random() < 0.5
+        elif json_type == 'null':
+            return None
+
+        # no type at all, any value is valid
+        return self.rng.choice(WORDS)
+
+    def generate_object(self, schema: Dict, depth: int) -> Dict:
+        properties = schema.get('properties')
+        if properties is None:
+            # free objects get some arbitrary content
+            return {word: self.rng.randint(0, 100) for word in self.rng.sample(WORDS, self.rng.randint(0, 3))}
+
+        required = schema.get('required', [])
+        value = {}
+        for (prop_name, prop) in properties.items():
+            if prop_name in required or (depth < MAX_DEPTH and self.rng.random() < self.optional_probability):
+                value[prop_name] = self.generate(prop, depth + 1)
+
+        return value
+
+    def generate_array(self, schema: Dict, depth: int) -> List:
+        items = schema.get('items', {})
+        min_items = schema.get('minItems', 0)
+        max_items = max(min_items, min(schema.get('maxItems', self.max_array_length), self.max_array_length))
+        length = min_items if depth >= MAX_DEPTH else self.rng.randint(min_items, max_items)
+        if isinstance(items, list):
+            # tuple validation, the items follow the schemas in order
+            return [self.generate(item, depth + 1) for item in items]
+
+        return [self.generate(items, depth + 1) for _ in range(length)]
+
+    def generate_string(self, schema: Dict) -> str:
+        string_format = schema.get('format')
+        if string_format == 'date-time':
+            timestamp = datetime(2022, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=self.rng.randint(0, 10 ** 8))
+            return timestamp.isoformat().replace('+00:00', 'Z')
+        if string_format == 'uuid':
+            return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+        min_length = schema.get('minLength', 0)
+        max_length = schema.get('maxLength', max(min_length, 32))
+
+        candidates = [*schema.get('examples', []), *([schema['default']] if 'default' in schema else [])]
+        candidates.append('_'.join(self.rng.sample(WORDS, self.rng.randint(1, 3))))
+        if 'pattern' in schema:
+            pattern = re.compile(schema['pattern'])
+            matching = [candidate for candidate in candidates if isinstance(candidate, str) and
+                        pattern.search(candidate)]
+            if matching:
+                return self.rng.choice(matching)
+            # patterns can't be generated from, the length limits are applied at least
+            self.unmatched_patterns.add(schema['pattern'])
+
+        value = candidates[-1][:max_length]
+        if len(value) < min_length:
+            value += ''.join(self.rng.choices(string.ascii_lowercase, k=min_length - len(value)))
+
+        return value
+
+    @staticmethod
+    def limits(schema: Dict, step):
+        """Return the inclusive limits of an integer or number, step is the distance to exclusive limits."""
+        lower = [schema['minimum']] if 'minimum' in schema else []
+        lower += [schema['exclusiveMinimum'] + step] if 'exclusiveMinimum' in schema else []
+        upper = [schema['maximum']] if 'maximum' in schema else []
+        upper += [schema['exclusiveMaximum'] - step] if 'exclusiveMaximum' in schema else []
+
+        default_range = DEFAULT_MAXIMUM - DEFAULT_MINIMUM
+        minimum = max(lower) if lower else (min(upper) - default_range if upper else DEFAULT_MINIMUM)
+        maximum = min(upper) if upper else (minimum + default_range if lower else DEFAULT_MAXIMUM)
+
+        return (minimum, maximum)
+
+    def generate_integer(self, schema: Dict) -> int:
+        (minimum, maximum) = PayloadGenerator.limits(schema, 1)
+        return self.rng.randint(math.ceil(minimum), math.floor(maximum))
+
+    def generate_number(self, schema: Dict) -> float:
+        (minimum, maximum) = PayloadGenerator.limits(schema, 1e-6)
+        return round(self.rng.uniform(minimum, maximum), 3)
+
+
+def type_file_entries(type_with_namespace, type_def) -> Iterator[Dict]:
+    """Yield name and schema of every type of a type file."""
+    for type_name, type_schema in type_def.get('types', {}).items():
+        yield {'kind': 'type', 'name': f'/{type_with_namespace["relative_path"].as_posix()}#/{type_name}',
+               'schema': type_schema}
+
+
+def interface_entries(if_def) -> Iterator[Dict]:
+    """Yield name and schema of every var, command arguments and command result of an interface."""
+    for var, var_info in if_def.get('vars', {}).items():
+        yield {'kind': 'var', 'name': var, 'schema': var_info}
+
+    for cmd, cmd_info in if_def.get('cmds', {}).items():
+        arguments = cmd_info.get('arguments', {})
+        yield {'kind': 'cmd_arguments', 'name': cmd,
+               'schema': {'type': 'object', 'properties': arguments, 'required': list(arguments)}}
+        if 'result' in cmd_info:
+            yield {'kind': 'cmd_result', 'name': cmd, 'schema': cmd_info['result']}
+
+
+def generate_corpus(corpus_name: str, entries: List[Dict], count: int, seed: int, max_array_length: int,
+                    optional_probability: float) -> Iterator[Dict]:
+    """Yield count payloads for each of the entries, which are generated by the random generator of the corpus."""
+    generator = PayloadGenerator(random.Random(f'{seed}:{corpus_name}'), max_array_length, optional_probability)
+
+    for entry in entries:
+        try:
+            for _ in range(count):
+                yield {'kind': entry['kind'], 'name': entry['name'], 'payload': generator.generate(entry['schema'])}
+        except helpers.EVerestParsingException as e:
+            raise helpers.EVerestParsingException(f'Error generating payloads of {entry["name"]}: {e}')
+
+    for pattern in sorted(generator.unmatched_patterns):
+        print(f'Warning: no value matching the pattern "{pattern}" found in {corpus_name}, '
+              'its payloads only respect the length limits')
@@ -12,9 +12,21 @@ FIXME (aw): Module documentation.
 from . import __version__
 from . import helpers
 from .type_parsing import TypeParser
+from .inline_types import SHARED_HEADER, SharedInlineTypes
+from .model import Command, EnumInfo, FileInfo
+from .output_cache import CACHE_DIR_ENV, CACHE_MAX_SIZE_ENV, DEFAULT_MAX_SIZE, OutputCache, format_size
+from . import corpus
+from . import python_bindings
+from . import report
+from . import schema_bundles
+from . import validation
+from .profiling import Profiler, ProfiledTemplate
 
 from datetime import datetime
+import json
+import os
 from pathlib import Path
+import tempfile
 import jinja2 as j2
 import argparse
 import stringcase
@@ -31,9 +43,15 @@ work_dir: Path = None
 env = j2.Environment(loader=j2.FileSystemLoader(Path(__file__).parent / 'templates'),
                      lstrip_blocks=True, trim_blocks=True, undefined=j2.StrictUndefined,
                      keep_trailing_newline=True)
+env.template_class = ProfiledTemplate
 
 templates = {}
 validators = {}
+output_cache = None
+
+# the section of the add_other block of CMakeLists.txt, which holds the --precompiled-headers/--unity-build settings
+CMAKE_BUILD_SETTINGS_BEGIN = '# ev-cli build settings begin (rewritten by module create/update, edits get lost)'
+CMAKE_BUILD_SETTINGS_END = '# ev-cli build settings end'
 
 # Function declarations
 
@@ -44,6 +62,7 @@ def setup_jinja_env():
     env.globals['git'] = helpers.gather_git_info(work_dir)
     env.filters['snake_case'] = helpers.snake_case
     env.filters['create_dummy_result'] = helpers.create_dummy_result
+    env.filters['group_enum_values'] = helpers.group_enum_values
 
     templates.update({
         'interface_base': env.get_template('interface-Base.hpp.j2'),
@@ -51,6 +70,10 @@ def setup_jinja_env():
         'interface_impl.hpp': env.get_template('interface-Impl.hpp.j2'),
         'interface_impl.cpp': env.get_template('interface-Impl.cpp.j2'),
         'types.hpp': env.get_template('types.hpp.j2'),
+        'types.cpp': env.get_template('types.cpp.j2'),
+        'types.cmake': env.get_template('types.cmake.j2'),
+        'types_roundtrip_test.cpp': env.get_template('types_roundtrip_test.cpp.j2'),
+        'types_umbrella.hpp': env.get_template('types_umbrella.hpp.j2'),
         'module.hpp': env.get_template('module.hpp.j2'),
         'module.cpp': env.get_template('module.cpp.j2'),
         'ld-ev.hpp': env.get_template('ld-ev.hpp.j2'),
@@ -58,9 +81,30 @@ def setup_jinja_env():
         'cmakelists': env.get_template('CMakeLists.txt.j2'),
         'doc.rst': env.get_template('doc.rst.j2'),
         'index.rst': env.get_template('index.rst.j2'),
+        'python_runtime.py': env.get_template('python_runtime.py.j2'),
+        'python_module.py': env.get_template('python_module.py.j2'),
+        'python_package.py': env.get_template('python_package.py.j2'),
     })
 
 
+def generate_cached(kind, name, inputs, options, output_dir, last_mtime, generate):
+    """Return the outputs of generate, taken from the output cache if it is enabled and has them."""
+    if not output_cache:
+        return generate()
+
+    key = output_cache.key(kind, name, inputs, options)
+    return output_cache.get_or_generate(key, output_dir, last_mtime, generate)
+
+
+def stream_template(template_name, tmpl_data):
+    """Return a generator yielding the rendered chunks of the template.
+
+    Rendering happens lazily while the chunks are consumed, so the info dict is copied - the callers keep modifying
+    it for their subsequent files.
+    """
+    return templates[template_name].generate({**tmpl_data, 'info': dict(tmpl_data['info'])})
+
+
 def generate_tmpl_data_for_if(interface, if_def, type_file):
     helpers.parsed_enums.clear()
     helpers.parsed_types.clear()
@@ -93,27 +137,24 @@ def generate_tmpl_data_for_if(interface, if_def, type_file):
             if enum_info and type_file:
                 enums.append(enum_info)
 
-        cmds.append({'name': cmd, 'args': args, 'result': result_type_info})
+        cmds.append(Command(name=cmd, args=args, result=result_type_info))
 
     if type_file:
         for parsed_enum in helpers.parsed_enums:
-            enum_info = {
-                'name': parsed_enum['name'],
-                'description': parsed_enum['description'],
-                'enum_type': stringcase.capitalcase(parsed_enum['name']),
-                'enum': parsed_enum['enums']
-            }
+            enum_info = EnumInfo(
+                name=parsed_enum.name,
+                description=parsed_enum.description,
+                enum_type=stringcase.capitalcase(parsed_enum.name),
+                enum=parsed_enum.enums
+            )
             enums.append(enum_info)
 
     if type_file:
         for parsed_type in helpers.parsed_types:
-            parsed_type['name'] = stringcase.capitalcase(parsed_type['name'])
-            if 'properties' in parsed_type:
-                for prop in parsed_type['properties']:
-                    if 'type_dict' in prop['info']:
-                        path = Path('generated/types') / \
-                            prop['info']['type_dict']['type_relative_path'].with_suffix('.hpp')
-                        helpers.type_headers.add(path.as_posix())
+            parsed_type.name = stringcase.capitalcase(parsed_type.name)
+            for prop in parsed_type.properties:
+                if 'type_dict' in prop.info:
+                    helpers.type_headers.add(TypeParser.type_header_path(prop.info.type_dict))
 
             types.append(parsed_type)
 
@@ -216,27 +257,63 @@ def generate_module_loader_files(rel_mod_dir, output_dir):
     # ld-ev.hpp
     tmpl_data['info']['hpp_guard'] = 'LD_EV_HPP'
 
-    loader_files.append({
-        'filename': 'ld-ev.hpp',
-        'path': output_dir / mod / 'ld-ev.hpp',
-        'printable_name': f'{mod}/ld-ev.hpp',
-        'content': templates['ld-ev.hpp'].render(tmpl_data),
-        'last_mtime': mod_path.stat().st_mtime
-    })
+    loader_files.append(FileInfo(
+        filename='ld-ev.hpp',
+        path=output_dir / mod / 'ld-ev.hpp',
+        printable_name=f'{mod}/ld-ev.hpp',
+        content=templates['ld-ev.hpp'].render(tmpl_data),
+        last_mtime=mod_path.stat().st_mtime
+    ))
 
     # ld-ev.cpp
-    loader_files.append({
-        'filename': 'ld-ev.cpp',
-        'path': output_dir / mod / 'ld-ev.cpp',
-        'printable_name': f'{mod}/ld-ev.cpp',
-        'content': templates['ld-ev.cpp'].render(tmpl_data),
-        'last_mtime': mod_path.stat().st_mtime
-    })
+    loader_files.append(FileInfo(
+        filename='ld-ev.cpp',
+        path=output_dir / mod / 'ld-ev.cpp',
+        printable_name=f'{mod}/ld-ev.cpp',
+        content=templates['ld-ev.cpp'].render(tmpl_data),
+        last_mtime=mod_path.stat().st_mtime
+    ))
 
     return loader_files
 
 
-def generate_module_files(rel_mod_dir, update_flag):
+def generate_cmake_build_settings(tmpl_data, precompiled_headers, unity_build):
+    """Generate the cmake commands for precompiled headers and unity builds of a module."""
+    settings = []
+
+    if precompiled_headers:
+        headers = [tmpl_data['info']['ld_ev_header']]
+        for impl in tmpl_data['provides']:
+            headers.append(impl['base_class_header'])
+        for requirement in tmpl_data['requires']:
+            headers.append(requirement['exports_header'])
+
+        settings.append('\n'.join([
+            '# precompile the generated headers, which are included by all sources of the module',
+            'target_precompile_headers(${MODULE_NAME}',
+            '    PRIVATE',
+            *[f'        <{header}>' for header in dict.fromkeys(headers)],
+            ')'
+        ]))
+
+    if unity_build and tmpl_data['provides']:
+        settings.append('\n'.join([
+            '# compile all interface implementations as a single translation unit',
+            'set_source_files_properties(',
+            *[f'    "{impl["cpp_file_rel_path"]}"' for impl in tmpl_data['provides']],
+            '    PROPERTIES UNITY_GROUP "${MODULE_NAME}_impls"',
+            ')',
+            'set_target_properties(${MODULE_NAME}',
+            '    PROPERTIES',
+            '        UNITY_BUILD ON',
+            '        UNITY_BUILD_MODE GROUP',
+            ')'
+        ]))
+
+    return '\n\n'.join(settings)
+
+
+def generate_module_files(rel_mod_dir, update_flag, precompiled_headers=False, unity_build=False):
     (_, _, mod) = rel_mod_dir.rpartition('/')
 
     mod_files = {'core': [], 'interfaces': [], 'docs': []}
@@ -320,8 +397,17 @@ def generate_module_files(rel_mod_dir, update_flag):
         }
     }
 
+    cmakelists_file = output_path / 'CMakeLists.txt'
+    mod_hpp_file = output_path / f'{mod}.hpp'
+
+    # the blocks of all files of the module get loaded at once, their files are read concurrently
+    blocks_files = [(impl_hpp_blocks, output_path / construct_impl_file_paths(impl)[0])
+                    for impl in tmpl_data['provides']]
+    blocks_files += [(cmakelists_blocks, cmakelists_file), (mod_hpp_blocks, mod_hpp_file)]
+    loaded_blocks = helpers.load_tmpl_blocks_of_files(blocks_files, update_flag)
+
     # provided interface implementations (impl cpp & hpp)
-    for impl in tmpl_data['provides']:
+    for (impl, impl_blocks) in zip(tmpl_data['provides'], loaded_blocks):
         interface = impl['type']
         (impl_hpp_file, impl_cpp_file) = construct_impl_file_paths(impl)
 
@@ -340,70 +426,72 @@ def generate_module_files(rel_mod_dir, update_flag):
             'interface_implementation_id': impl['id']
         })
 
-        if_tmpl_data['info']['blocks'] = helpers.load_tmpl_blocks(
-            impl_hpp_blocks, output_path / impl_hpp_file, update_flag)
+        if_tmpl_data['info']['blocks'] = impl_blocks
 
         # FIXME (aw): time stamp should include parent interfaces modification dates
-        mod_files['interfaces'].append({
-            'abbr': f'{impl["id"]}.hpp',
-            'path': output_path / impl_hpp_file,
-            'printable_name': impl_hpp_file,
-            'content': templates['interface_impl.hpp'].render(if_tmpl_data),
-            'last_mtime': last_mtime
-        })
-
-        mod_files['interfaces'].append({
-            'abbr': f'{impl["id"]}.cpp',
-            'path': output_path / impl_cpp_file,
-            'printable_name': impl_cpp_file,
-            'content': templates['interface_impl.cpp'].render(if_tmpl_data),
-            'last_mtime': last_mtime
-        })
-
-    cmakelists_file = output_path / 'CMakeLists.txt'
-    tmpl_data['info']['blocks'] = helpers.load_tmpl_blocks(cmakelists_blocks, cmakelists_file, update_flag)
-    mod_files['core'].append({
-        'abbr': 'cmakelists',
-        'path': cmakelists_file,
-        'content': templates['cmakelists'].render(tmpl_data),
-        'last_mtime': mod_path.stat().st_mtime
-    })
+        mod_files['interfaces'].append(FileInfo(
+            abbr=f'{impl["id"]}.hpp',
+            path=output_path / impl_hpp_file,
+            printable_name=impl_hpp_file,
+            content=templates['interface_impl.hpp'].render(if_tmpl_data),
+            last_mtime=last_mtime
+        ))
+
+        mod_files['interfaces'].append(FileInfo(
+            abbr=f'{impl["id"]}.cpp',
+            path=output_path / impl_cpp_file,
+            printable_name=impl_cpp_file,
+            content=templates['interface_impl.cpp'].render(if_tmpl_data),
+            last_mtime=last_mtime
+        ))
+
+    tmpl_data['info']['blocks'] = loaded_blocks[-2]
+    # the build settings get rewritten on every create/update, so they follow the interfaces of the module
+    build_settings_changed = helpers.replace_tmpl_block_section(
+        tmpl_data['info']['blocks'], cmakelists_blocks, 'add_other', CMAKE_BUILD_SETTINGS_BEGIN,
+        CMAKE_BUILD_SETTINGS_END, generate_cmake_build_settings(tmpl_data, precompiled_headers, unity_build))
+    mod_files['core'].append(FileInfo(
+        abbr='cmakelists',
+        path=cmakelists_file,
+        content=templates['cmakelists'].render(tmpl_data),
+        # changed build settings make the file outdated, even if the manifest didn't change
+        last_mtime=float('inf') if build_settings_changed else mod_path.stat().st_mtime
+    ))
 
     # module.hpp
     tmpl_data['info']['hpp_guard'] = helpers.snake_case(mod).upper() + '_HPP'
-    mod_hpp_file = output_path / f'{mod}.hpp'
-    tmpl_data['info']['blocks'] = helpers.load_tmpl_blocks(mod_hpp_blocks, mod_hpp_file, update_flag)
-    mod_files['core'].append({
-        'abbr': 'module.hpp',
-        'path': mod_hpp_file,
-        'content': templates['module.hpp'].render(tmpl_data),
-        'last_mtime': mod_path.stat().st_mtime
-    })
+    tmpl_data['info']['blocks'] = loaded_blocks[-1]
+    mod_files['core'].append(FileInfo(
+        abbr='module.hpp',
+        path=mod_hpp_file,
+        content=templates['module.hpp'].render(tmpl_data),
+        last_mtime=mod_path.stat().st_mtime
+    ))
 
     # module.cpp
     mod_cpp_file = output_path / f'{mod}.cpp'
-    mod_files['core'].append({
-        'abbr': 'module.cpp',
-        'path': mod_cpp_file,
-        'content': templates['module.cpp'].render(tmpl_data),
-        'last_mtime': mod_path.stat().st_mtime
-    })
+    mod_files['core'].append(FileInfo(
+        abbr='module.cpp',
+        path=mod_cpp_file,
+        content=templates['module.cpp'].render(tmpl_data),
+        last_mtime=mod_path.stat().st_mtime
+    ))
 
     # doc.rst
-    mod_files['docs'].append({
-        'abbr': 'doc.rst',
-        'path': output_path / 'doc.rst',
-        'content': templates['doc.rst'].render(tmpl_data),
-        'last_mtime': mod_path.stat().st_mtime
-    })
+    mod_files['docs'].append(FileInfo(
+        abbr='doc.rst',
+        path=output_path / 'doc.rst',
+        content=templates['doc.rst'].render(tmpl_data),
+        last_mtime=mod_path.stat().st_mtime
+    ))
 
     # docs/index.rst
-    mod_files['docs'].append({
-        'abbr': 'index.rst',
-        'path': output_path / 'docs' / 'index.rst',
-        'content': templates['index.rst'].render(tmpl_data),
-        'last_mtime': mod_path.stat().st_mtime
-    })
+    mod_files['docs'].append(FileInfo(
+        abbr='index.rst',
+        path=output_path / 'docs' / 'index.rst',
+        content=templates['index.rst'].render(tmpl_data),
+        last_mtime=mod_path.stat().st_mtime
+    ))
 
     for file_info in [*mod_files['core'], *mod_files['interfaces'], *mod_files['docs']]:
         file_info['printable_name'] = file_info['path'].relative_to(output_path)
@@ -453,12 +541,12 @@ def generate_interface_headers(interface, all_interfaces_flag, output_dir):
 
     base_file = output_path / 'Implementation.hpp'
 
-    if_parts['base'] = {
-        'path': base_file,
-        'content': templates['interface_base'].render(tmpl_data),
-        'last_mtime': last_mtime,
-        'printable_name': base_file.relative_to(output_path.parent)
-    }
+    if_parts['base'] = FileInfo(
+        path=base_file,
+        content_stream=stream_template('interface_base', tmpl_data),
+        last_mtime=last_mtime,
+        printable_name=base_file.relative_to(output_path.parent)
+    )
 
     # generate Exports file (users view)
     tmpl_data['info']['hpp_guard'] = helpers.snake_case(interface).upper() + '_INTERFACE_HPP'
@@ -466,24 +554,24 @@ def generate_interface_headers(interface, all_interfaces_flag, output_dir):
 
     exports_file = output_path / 'Interface.hpp'
 
-    if_parts['exports'] = {
-        'path': exports_file,
-        'content': templates['interface_exports'].render(tmpl_data),
-        'last_mtime': last_mtime,
-        'printable_name': exports_file.relative_to(output_path.parent)
-    }
+    if_parts['exports'] = FileInfo(
+        path=exports_file,
+        content_stream=stream_template('interface_exports', tmpl_data),
+        last_mtime=last_mtime,
+        printable_name=exports_file.relative_to(output_path.parent)
+    )
 
     # generate Types file
     tmpl_data['info']['hpp_guard'] = helpers.snake_case(interface).upper() + '_TYPES_HPP'
 
     types_file = output_path / 'Types.hpp'
 
-    if_parts['types'] = {
-        'path': types_file,
-        'content': templates['types.hpp'].render(tmpl_data),
-        'last_mtime': last_mtime,
-        'printable_name': types_file.relative_to(output_path.parent)
-    }
+    if_parts['types'] = FileInfo(
+        path=types_file,
+        content_stream=stream_template('types.hpp', tmpl_data),
+        last_mtime=last_mtime,
+        printable_name=types_file.relative_to(output_path.parent)
+    )
 
     return if_parts
 
@@ -491,7 +579,7 @@ def generate_interface_headers(interface, all_interfaces_flag, output_dir):
 def module_create(args):
     create_strategy = 'force-create' if args.force else 'create'
 
-    mod_files = generate_module_files(args.module, False)
+    mod_files = generate_module_files(args.module, False, args.precompiled_headers, args.unity_build)
 
     if args.only == 'which':
         helpers.print_available_mod_files(mod_files)
@@ -521,7 +609,7 @@ def module_update(args):
         update_strategy[file_name] = primary_update_strategy
 
     # FIXME (aw): refactor out this only handling and rename it properly
-    mod_files = generate_module_files(args.module, True)
+    mod_files = generate_module_files(args.module, True, args.precompiled_headers, args.unity_build)
 
     if args.only == 'which':
         helpers.print_available_mod_files(mod_files)
@@ -551,20 +639,38 @@ def module_genld(args):
     output_dir = Path(args.output_dir).resolve() if args.output_dir else work_dir / \
         'build/generated/generated/modules'
 
-    loader_files = generate_module_loader_files(args.module, output_dir)
+    def generate():
+        loader_files = generate_module_loader_files(args.module, output_dir)
 
-    if not args.disable_clang_format:
-        for file_info in loader_files:
-            helpers.clang_format(args.clang_format_file, file_info)
+        if not args.disable_clang_format:
+            for file_info in loader_files:
+                helpers.clang_format(args.clang_format_file, file_info)
+
+        return loader_files
+
+    mod_path = work_dir / f'modules/{args.module}/manifest.yaml'
+    if output_cache and mod_path.exists():
+        loader_files = generate_cached('loader', args.module, [mod_path], {}, output_dir, mod_path.stat().st_mtime,
+                                       generate)
+    else:
+        loader_files = generate()
 
     for file_info in loader_files:
         helpers.write_content_to_file(file_info, 'force-update')
 
 
+def list_all_interfaces():
+    interfaces = []
+    for everest_dir in everest_dirs:
+        if_dir = everest_dir / 'interfaces'
+        interfaces += [if_path.stem for if_path in if_dir.iterdir() if (if_path.is_file()
+                                                                        and if_path.suffix == '.yaml')]
+
+    return interfaces
+
+
 def interface_genhdr(args):
-    # Always generate type info before generating interfaces
-    for type_with_namespace in list_types_with_namespace():
-        _tmpl_data, _last_mtime = TypeParser.generate_type_info(type_with_namespace, all_types=True)
+    type_infos_generated = False
 
     output_dir = Path(args.output_dir).resolve() if args.output_dir else work_dir / \
         'build/generated/include/generated/interfaces'
@@ -574,13 +680,16 @@ def interface_genhdr(args):
     all_interfaces = False
     if not interfaces:
         all_interfaces = True
-        interfaces = []
-        for everest_dir in everest_dirs:
-            if_dir = everest_dir / 'interfaces'
-            interfaces += [if_path.stem for if_path in if_dir.iterdir() if (if_path.is_file()
-                                                                            and if_path.suffix == '.yaml')]
+        interfaces = list_all_interfaces()
+
+    def generate(interface):
+        nonlocal type_infos_generated
+        if not type_infos_generated:
+            # Always generate type info before generating interfaces
+            for type_with_namespace in list_types_with_namespace():
+                _tmpl_data, _last_mtime = TypeParser.generate_type_info(type_with_namespace, all_types=True)
+            type_infos_generated = True
 
-    for interface in interfaces:
         if_parts = generate_interface_headers(interface, all_interfaces, output_dir)
 
         if not args.disable_clang_format:
@@ -589,9 +698,161 @@ def interface_genhdr(args):
             helpers.clang_format(args.clang_format_file, if_parts['exports'])
             helpers.clang_format(args.clang_format_file, if_parts['types'])
 
-        helpers.write_content_to_file(if_parts['base'], primary_update_strategy, args.diff)
-        helpers.write_content_to_file(if_parts['exports'], primary_update_strategy, args.diff)
-        helpers.write_content_to_file(if_parts['types'], primary_update_strategy, args.diff)
+        return [if_parts['base'], if_parts['exports'], if_parts['types']]
+
+    for interface in interfaces:
+        if output_cache:
+            if_path = helpers.resolve_everest_dir_path(f'interfaces/{interface}.yaml')
+            if_parts = generate_cached('interface', interface, output_cache.type_closure([if_path]),
+                                       {'fine_grained_headers': TypeParser.fine_grained_headers}, output_dir,
+                                       if_path.stat().st_mtime, lambda: generate(interface))
+        else:
+            if_parts = generate(interface)
+
+        for if_part in if_parts:
+            helpers.write_content_to_file(if_part, primary_update_strategy, args.diff)
+
+
+def interface_gen_schema_bundles(args):
+    output_dir = Path(args.output_dir).resolve() if args.output_dir else work_dir / \
+        'build/generated/schemas/interfaces'
+    primary_update_strategy = 'force-update' if args.force else 'update'
+
+    interfaces = args.interfaces
+    all_interfaces = False
+    if not interfaces:
+        all_interfaces = True
+        interfaces = list_all_interfaces()
+
+    for interface in interfaces:
+        try:
+            if_def, last_mtime = load_interface_definition(interface)
+        except Exception as e:
+            if not all_interfaces:
+                raise
+            print(f'Ignoring interface {interface} with reason: {e}')
+            continue
+
+        bundle, types_mtime = schema_bundles.generate_schema_bundle(interface, if_def)
+
+        if args.format == 'cbor':
+            content = schema_bundles.encode_cbor(bundle)
+        else:
+            content = json.dumps(bundle, separators=(',', ':'))
+
+        bundle_file = output_dir / f'{interface}.{args.format}'
+        helpers.write_content_to_file(FileInfo(
+            path=bundle_file,
+            content=content,
+            last_mtime=max(last_mtime, types_mtime),
+            printable_name=bundle_file.name
+        ), primary_update_strategy, args.diff)
+
+
+def python_bindings_output_dir(args) -> Path:
+    output_dir = Path(args.output_dir).resolve() if args.output_dir else work_dir / \
+        'build/generated/python/everest_generated'
+    if not output_dir.name.isidentifier():
+        raise helpers.EVerestParsingException(f'The name of the output directory "{output_dir.name}" is the name '
+                                              'of the generated python package and has to be a valid identifier')
+
+    return output_dir
+
+
+def write_python_package_files(output_dir: Path, subpackage: str, subpackage_dirs, args):
+    """Write the runtime and the __init__ files of the generated python package and the given subpackage."""
+    primary_update_strategy = 'force-update' if args.force else 'update'
+
+    def package_file(path: Path, description: str, root: bool = False) -> FileInfo:
+        return FileInfo(
+            path=path,
+            content=templates['python_package.py'].render({'description': description, 'root': root}),
+            last_mtime=0,
+            printable_name=path.relative_to(output_dir.parent)
+        )
+
+    package_files = [
+        package_file(output_dir / '__init__.py', 'Payload bindings of the EVerest types and interfaces.', root=True),
+        package_file(output_dir / subpackage / '__init__.py', f'Payload bindings of the EVerest {subpackage}.'),
+        FileInfo(
+            path=output_dir / '_runtime.py',
+            content=templates['python_runtime.py'].render({}),
+            last_mtime=0,
+            printable_name=(output_dir / '_runtime.py').relative_to(output_dir.parent)
+        )
+    ]
+    for subpackage_dir in sorted(subpackage_dirs):
+        package_files.append(package_file(output_dir / subpackage / subpackage_dir / '__init__.py',
+                                          f'Payload bindings of the EVerest {subpackage} in {subpackage_dir}.'))
+
+    for package_file_info in package_files:
+        helpers.write_content_to_file(package_file_info, primary_update_strategy, args.diff)
+
+
+def types_genpy(args):
+    output_dir = python_bindings_output_dir(args)
+    primary_update_strategy = 'force-update' if args.force else 'update'
+
+    all_types = not args.types
+    types_with_namespace = list_types_with_namespace(types=[Path(type_path).resolve() for type_path in args.types])
+
+    subpackage_dirs = set()
+    for type_with_namespace in types_with_namespace:
+        try:
+            type_def, last_mtime = TypeParser.load_type_definition(type_with_namespace['path'])
+        except Exception as e:
+            if not all_types:
+                raise
+            print(f'Ignoring type {type_with_namespace["namespace"]} with reason: {e}')
+            continue
+
+        tmpl_data = python_bindings.generate_tmpl_data_for_type(output_dir.name, type_with_namespace, type_def)
+
+        module_parts = [python_bindings.identifier(part) for part in type_with_namespace['relative_path'].parts]
+        for depth in range(1, len(module_parts)):
+            subpackage_dirs.add(Path(*module_parts[:depth]).as_posix())
+
+        module_file = output_dir.joinpath('types', *module_parts).with_suffix('.py')
+        helpers.write_content_to_file(FileInfo(
+            path=module_file,
+            content_stream=stream_template('python_module.py', tmpl_data),
+            last_mtime=max(last_mtime, tmpl_data['info']['last_mtime']),
+            printable_name=module_file.relative_to(output_dir.parent)
+        ), primary_update_strategy, args.diff)
+
+    write_python_package_files(output_dir, 'types', subpackage_dirs, args)
+
+
+def interface_genpy(args):
+    output_dir = python_bindings_output_dir(args)
+    primary_update_strategy = 'force-update' if args.force else 'update'
+
+    interfaces = args.interfaces
+    all_interfaces = False
+    if not interfaces:
+        all_interfaces = True
+        interfaces = list_all_interfaces()
+
+    for interface in interfaces:
+        try:
+            if_def, last_mtime = load_interface_definition(interface)
+        except Exception as e:
+            if not all_interfaces:
+                raise
+            print(f'Ignoring interface {interface} with reason: {e}')
+            continue
+
+        tmpl_data = python_bindings.generate_tmpl_data_for_if(output_dir.name, interface, if_def)
+
+        module_file = output_dir / 'interfaces' / f'{python_bindings.identifier(interface)}.py'
+        helpers.write_content_to_file(FileInfo(
+            path=module_file,
+            content_stream=stream_template('python_module.py', tmpl_data),
+            last_mtime=max(last_mtime, tmpl_data['info']['last_mtime']),
+            printable_name=module_file.relative_to(output_dir.parent)
+        ), primary_update_strategy, args.diff)
+
+    write_python_package_files(output_dir, 'interfaces', [], args)
 
 
 def helpers_genuuids(args):
@@ -600,12 +861,25 @@ def helpers_genuuids(args):
     helpers.generate_some_uuids(args.count)
 
 
+def helpers_convert(args, converter, input_suffixes, output_suffix):
+    output = Path(args.output)
+    single_input = args.input[0]
+    if len(args.input) == 1 and not Path(single_input).is_dir() and not helpers.is_glob_pattern(single_input) and \
+            not output.is_dir():
+        converter(Path(single_input).resolve(), output.resolve())
+        return
+
+    (conversions, skipped) = helpers.collect_conversions(args.input, output, input_suffixes, output_suffix, args.force)
+    helpers.convert_files(conversions, converter, args.jobs)
+    print(f'Converted {len(conversions)} file(s), skipped {skipped} up to date file(s)')
+
+
 def helpers_yaml2json(args):
-    helpers.yaml2json(Path(args.input).resolve(), Path(args.output).resolve())
+    helpers_convert(args, helpers.yaml2json, ['.yaml', '.yml'], '.json')
 
 
 def helpers_json2yaml(args):
-    helpers.json2yaml(Path(args.input).resolve(), Path(args.output).resolve())
+    helpers_convert(args, helpers.json2yaml, ['.json'], '.yaml')
 
 
 def list_types_with_namespace(types=None) -> List:
@@ -657,17 +931,210 @@ def types_genhdr(args):
 
     types_with_namespace = list_types_with_namespace(types=types)
 
+    def format_parts(parts):
+        if not args.disable_clang_format:
+            for part in parts:
+                helpers.clang_format(args.clang_format_file, part)
+
+        return parts
+
+    cache_options = {'split_sources': args.split_sources, 'fine_grained_headers': TypeParser.fine_grained_headers,
+                     'dedup_inline_types': args.dedup_inline_types}
+    shared_inline_types = None
+    if args.dedup_inline_types:
+        # the shared inline types depend on all type files, not only on the processed ones
+        all_type_paths = [type_with_namespace['path'] for type_with_namespace in list_types_with_namespace()]
+        shared_inline_types = SharedInlineTypes()
+        shared_inline_types.collect(list_types_with_namespace())
+
+        shared_parts = generate_cached(
+            'shared-inline-types', SHARED_HEADER, all_type_paths, cache_options, output_dir,
+            shared_inline_types.last_mtime,
+            lambda: format_parts(shared_inline_types.generate_header(output_dir, args.split_sources)))
+        for shared_part in shared_parts:
+            helpers.write_content_to_file(shared_part, primary_update_strategy, args.diff)
+
     for type_with_namespace in types_with_namespace:
-        type_parts = TypeParser.generate_type_headers(type_with_namespace, all_types, output_dir)
+        def generate():
+            return format_parts(TypeParser.generate_type_headers(type_with_namespace, all_types, output_dir,
+                                                                 args.split_sources, shared_inline_types))
+
+        if output_cache:
+            type_path = type_with_namespace['path']
+            type_parts = generate_cached(
+                'types', type_with_namespace['relative_path'].as_posix(),
+                all_type_paths if shared_inline_types else output_cache.type_closure([type_path]),
+                cache_options, output_dir, type_path.stat().st_mtime, generate)
+        else:
+            type_parts = generate()
+
+        for type_part in type_parts:
+            helpers.write_content_to_file(type_part, primary_update_strategy, args.diff)
+
+    if shared_inline_types:
+        summary = shared_inline_types.summary()
+        print(f'Shared {summary["shared_types"]} inline types of {summary["type_files"]} type files: '
+              f'{summary["replaced_declarations"]} declarations replaced by aliases, '
+              f'{summary["saved_declarations"]} declarations saved')
+
+        if args.dedup_report:
+            # renders all collected type files twice, regardless of the cache
+            dedup_report = shared_inline_types.report(types_with_namespace, output_dir, args.split_sources)
+            print(f'{dedup_report["saved_bytes"]} of {dedup_report["bytes_before"]} generated bytes saved by the '
+                  f'shared inline types')
+
+    if args.split_sources:
+        # the cmake file globs all generated sources, so it doesn't depend on the processed types
+        cmake_file = output_dir / 'types.cmake'
+        helpers.write_content_to_file(FileInfo(
+            path=cmake_file,
+            content=templates['types.cmake'].render({}),
+            last_mtime=0,
+            printable_name=cmake_file.name
+        ), primary_update_strategy, args.diff)
+
+    if args.roundtrip_test:
+        test_file = Path(args.roundtrip_test).resolve()
+        test_file.parent.mkdir(parents=True, exist_ok=True)
+        test_info = TypeParser.generate_roundtrip_test(types_with_namespace, test_file)
 
         if not args.disable_clang_format:
-            helpers.clang_format(args.clang_format_file, type_parts['types'])
+            helpers.clang_format(args.clang_format_file, test_info)
+
+        helpers.write_content_to_file(test_info, primary_update_strategy, args.diff)
+
+
+def report_all(args):
+    # Always generate type info before generating interfaces
+    for type_with_namespace in list_types_with_namespace():
+        _tmpl_data, _last_mtime = TypeParser.generate_type_info(type_with_namespace, all_types=True)
+
+    def content_of(file_info):
+        return file_info['content'] if 'content' in file_info else ''.join(file_info['content_stream'])
+
+    outputs = []
+    modules = []
+    # the files are only rendered, but the generate functions create their output directories
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        types_dir = Path(tmp_dir) / 'types'
+        for type_with_namespace in list_types_with_namespace():
+            for type_part in TypeParser.generate_type_headers(type_with_namespace, True, types_dir):
+                name = (Path('generated/types') / type_part['path'].relative_to(types_dir)).as_posix()
+                outputs.append(report.analyze_output(name, 'types', content_of(type_part)))
+
+        interfaces_dir = Path(tmp_dir) / 'interfaces'
+        for interface in list_all_interfaces():
+            if_parts = generate_interface_headers(interface, True, interfaces_dir)
+            if not if_parts:
+                continue
+            for if_part in if_parts.values():
+                name = (Path('generated/interfaces') / if_part['path'].relative_to(interfaces_dir)).as_posix()
+                outputs.append(report.analyze_output(name, 'interface', content_of(if_part)))
+
+        modules_dir = Path(tmp_dir) / 'modules'
+        for mod_path in sorted((work_dir / 'modules').glob('**/manifest.yaml')):
+            rel_mod_dir = mod_path.parent.relative_to(work_dir / 'modules').as_posix()
+            for loader_file in generate_module_loader_files(rel_mod_dir, modules_dir):
+                name = (Path('generated/modules') / loader_file['path'].relative_to(modules_dir)).as_posix()
+                outputs.append(report.analyze_output(name, 'module loader', content_of(loader_file)))
+
+            (_, _, mod) = rel_mod_dir.rpartition('/')
+            tmpl_data = generate_tmpl_data_for_module(
+                mod, helpers.load_validated_module_def(mod_path, validators['module']))
+            modules.append({
+                'name': rel_mod_dir,
+                'headers': ([f'generated/modules/{mod}/ld-ev.hpp'] +
+                            [impl['base_class_header'] for impl in tmpl_data['provides']] +
+                            [requirement['exports_header'] for requirement in tmpl_data['requires']]),
+                # the module and loader sources and one source per interface implementation
+                'translation_units': 2 + len(tmpl_data['provides'])
+            })
+
+    ranked_outputs = report.build_report(outputs, modules)
+
+    if args.json:
+        print(json.dumps(ranked_outputs, indent=2))
+    else:
+        print(report.format_report(ranked_outputs, args.top))
+
+
+def corpus_generate(args):
+    output_dir = Path(args.output_dir).resolve() if args.output_dir else work_dir / 'build/generated/corpus'
+
+    corpora = []
+    if args.only in (None, 'types'):
+        for type_with_namespace in list_types_with_namespace():
+            type_def, _last_mtime = TypeParser.load_type_definition(type_with_namespace['path'])
+            corpora.append((Path('types') / type_with_namespace['relative_path'],
+                            list(corpus.type_file_entries(type_with_namespace, type_def))))
+    if args.only in (None, 'interfaces'):
+        for interface in sorted(list_all_interfaces()):
+            if_def, _last_mtime = load_interface_definition(interface)
+            corpora.append((Path('interfaces') / interface, list(corpus.interface_entries(if_def))))
+
+    for (corpus_name, entries) in corpora:
+        payloads = corpus.generate_corpus(corpus_name.as_posix(), entries, args.count, args.seed,
+                                          args.max_array_length, args.optional_probability)
+        corpus_file = output_dir / corpus_name.with_suffix('.jsonl')
+        # the corpus depends on the options, so it is always regenerated
+        helpers.write_content_to_file(FileInfo(
+            path=corpus_file,
+            content_stream=(json.dumps(payload) + '\n' for payload in payloads),
+            last_mtime=0,
+            printable_name=corpus_file.relative_to(output_dir)
+        ), 'force-update')
+
+
+def validate_all(args):
+    files = [('type', type_with_namespace['path']) for type_with_namespace in list_types_with_namespace()]
+    for everest_dir in everest_dirs:
+        files += [('interface', if_path) for if_path in sorted((everest_dir / 'interfaces').glob('*.yaml'))]
+    files += [('module', mod_path) for mod_path in sorted((work_dir / 'modules').glob('**/manifest.yaml'))]
+
+    errors = validation.validate_tree(files, everest_dirs, Path(args.schemas_dir).resolve(), args.jobs)
+
+    if args.json:
+        print(json.dumps({'checked_files': len(files), 'errors': errors}, indent=2))
+    else:
+        for error in errors:
+            location = f' ({error["location"]})' if error['location'] else ''
+            print(f'{error["file"]}{location}: {error["message"]}')
+        print(f'Checked {len(files)} files, found {len(errors)} error(s)')
 
-        helpers.write_content_to_file(type_parts['types'], primary_update_strategy, args.diff)
+    if errors:
+        exit(1)
+
+
+def open_output_cache(args) -> OutputCache:
+    cache = OutputCache.from_args(args)
+    if not cache:
+        raise SystemExit(f'No output cache configured, use --cache-dir or set ${CACHE_DIR_ENV}')
+
+    return cache
+
+
+def cache_stats(args):
+    stats = open_output_cache(args).stats()
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return
+
+    print(f'Output cache {stats["cache_dir"]}')
+    print(f'  {stats["entries"]} entries with {format_size(stats["size"])} of {format_size(stats["max_size"])}')
+    print(f'  {stats["hits"]} hits and {stats["misses"]} misses in {stats["runs"]} runs, '
+          f'hit rate {stats["hit_rate"] * 100:.1f} %')
+    print(f'  {stats["stored"]} entries stored, {stats["evicted"]} evicted')
+
+
+def cache_clear(args):
+    cache = open_output_cache(args)
+    cache.clear()
+    print(f'Cleared output cache {cache.cache_dir}')
 
 
 def main():
-    global validators, everest_dirs, work_dir
+    global validators, everest_dirs, work_dir, output_cache
 
     parser = argparse.ArgumentParser(description='Everest command line tool')
     parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
@@ -685,12 +1152,34 @@ def main():
                                help='Path to the directory, containing the .clang-format file (default: .)')
     common_parser.add_argument("--disable-clang-format", action='store_true', default=False,
                                help="Set this flag to disable clang-format")
+    common_parser.add_argument("--profile", action='store_true', default=False,
+                               help='Record the duration of the generation phases and print a summary')
+    common_parser.add_argument("--profile-trace", type=str,
+                               help='Write the recorded phases as Chrome trace event file (implies --profile)')
+    common_parser.add_argument("--profile-top", type=int, default=20,
+                               help='Number of phase/file combinations shown in the profile summary (default: 20)')
+
+    cache_parser = argparse.ArgumentParser(add_help=False)
+    cache_parser.add_argument('--cache-dir', type=str, help='directory of the output cache, which can be shared '
+                              f'by worktrees and CI jobs (default: ${CACHE_DIR_ENV}, '
+                              'the cache is disabled if neither is given)')
+    cache_parser.add_argument('--cache-max-size', type=str, help='size limit of the output cache, like 512M - the '
+                              'least recently used outputs get evicted '
+                              f'(default: ${CACHE_MAX_SIZE_ENV} or '
+                              f'{DEFAULT_MAX_SIZE})')
 
     subparsers = parser.add_subparsers(metavar='<command>', help='available commands', required=True)
     parser_mod = subparsers.add_parser('module', aliases=['mod'], help='module related actions')
     parser_if = subparsers.add_parser('interface', aliases=['if'], help='interface related actions')
     parser_hlp = subparsers.add_parser('helpers', aliases=['hlp'], help='helper actions')
     parser_types = subparsers.add_parser('types', aliases=['ty'], help='type related actions')
+    parser_report = subparsers.add_parser('report', aliases=['rep'], parents=[common_parser],
+                                          help='report size and compile cost metrics of the generated code')
+    parser_validate = subparsers.add_parser('validate', aliases=['val'], parents=[common_parser],
+                                            help='validate all manifests, interfaces and types')
+    parser_cache = subparsers.add_parser('cache', help='output cache related actions')
+    parser_corpus = subparsers.add_parser('corpus', parents=[common_parser],
+                                          help='generate seeded corpora of random valid payloads as jsonl')
 
     mod_actions = parser_mod.add_subparsers(metavar='<action>', help='available actions', required=True)
     mod_create_parser = mod_actions.add_parser('create', aliases=['c'], parents=[
@@ -702,6 +1191,10 @@ def main():
     mod_create_parser.add_argument('--only', type=str,
                                    help='Comma separated filter list of module files, that should be created.  '
                                    'For a list of available files use "--only which".')
+    mod_create_parser.add_argument('--precompiled-headers', action='store_true',
+                                   help='precompile the generated headers of the module in CMakeLists.txt')
+    mod_create_parser.add_argument('--unity-build', action='store_true',
+                                   help='compile the interface implementations as a unity build in CMakeLists.txt')
     mod_create_parser.set_defaults(action_handler=module_create)
 
     mod_update_parser = mod_actions.add_parser('update', aliases=['u'], parents=[
@@ -712,10 +1205,14 @@ def main():
     mod_update_parser.add_argument('--only', type=str,
                                    help='Comma separated filter list of module files, that should be updated.  '
                                    'For a list of available files use "--only which".')
+    mod_update_parser.add_argument('--precompiled-headers', action='store_true',
+                                   help='precompile the generated headers of the module in CMakeLists.txt')
+    mod_update_parser.add_argument('--unity-build', action='store_true',
+                                   help='compile the interface implementations as a unity build in CMakeLists.txt')
     mod_update_parser.set_defaults(action_handler=module_update)
 
     mod_genld_parser = mod_actions.add_parser(
-        'generate-loader', aliases=['gl'], parents=[common_parser], help='generate everest loader')
+        'generate-loader', aliases=['gl'], parents=[common_parser, cache_parser], help='generate everest loader')
     mod_genld_parser.add_argument(
         'module', type=str, help='name of the module, for which the loader should be generated')
     mod_genld_parser.add_argument('-o', '--output-dir', type=str, help='Output directory for generated loader '
@@ -724,43 +1221,148 @@ def main():
 
     if_actions = parser_if.add_subparsers(metavar='<action>', help='available actions', required=True)
     if_genhdr_parser = if_actions.add_parser(
-        'generate-headers', aliases=['gh'], parents=[common_parser], help='generate headers')
+        'generate-headers', aliases=['gh'], parents=[common_parser, cache_parser], help='generate headers')
     if_genhdr_parser.add_argument('-f', '--force', action='store_true', help='force overwriting')
     if_genhdr_parser.add_argument('-o', '--output-dir', type=str, help='Output directory for generated interface '
                                   'headers (default: {everest-dir}/build/generated/generated/interfaces)')
     if_genhdr_parser.add_argument('-d', '--diff', '--dry-run', action='store_true', help='show resulting diff')
+    if_genhdr_parser.add_argument('--fine-grained-headers', action='store_true', help='include only the headers '
+                                  'of the used types, as generated by types generate-headers --fine-grained-headers')
     if_genhdr_parser.add_argument('interfaces', nargs='*', help='a list of interfaces, for which header files should '
                                   'be generated - if no interface is given, all will be processed and non-processable '
                                   'will be skipped')
     if_genhdr_parser.set_defaults(action_handler=interface_genhdr)
 
+    if_gensb_parser = if_actions.add_parser(
+        'generate-schema-bundles', aliases=['gsb'], parents=[common_parser],
+        help='generate self contained json schema bundles with all referenced types resolved')
+    if_gensb_parser.add_argument('-f', '--force', action='store_true', help='force overwriting')
+    if_gensb_parser.add_argument('-o', '--output-dir', type=str, help='Output directory for generated schema '
+                                 'bundles (default: {everest-dir}/build/generated/schemas/interfaces)')
+    if_gensb_parser.add_argument('-d', '--diff', '--dry-run', action='store_true', help='show resulting diff')
+    if_gensb_parser.add_argument('--format', choices=['json', 'cbor'], default='json',
+                                 help='write the bundles as minified json or as binary CBOR (default: json)')
+    if_gensb_parser.add_argument('interfaces', nargs='*', help='a list of interfaces, for which schema bundles '
+                                 'should be generated - if no interface is given, all will be processed and '
+                                 'non-processable will be skipped')
+    if_gensb_parser.set_defaults(action_handler=interface_gen_schema_bundles)
+
+    if_genpy_parser = if_actions.add_parser(
+        'generate-python', aliases=['gp'], parents=[common_parser],
+        help='generate python bindings validating and converting the payloads of interfaces')
+    if_genpy_parser.add_argument('-f', '--force', action='store_true', help='force overwriting')
+    if_genpy_parser.add_argument('-o', '--output-dir', type=str, help='Output directory of the generated python '
+                                 'package, its name is the name of the package - the modules of the used types are '
+                                 'generated into it by types generate-python '
+                                 '(default: {everest-dir}/build/generated/python/everest_generated)')
+    if_genpy_parser.add_argument('-d', '--diff', '--dry-run', action='store_true', help='show resulting diff')
+    if_genpy_parser.add_argument('interfaces', nargs='*', help='a list of interfaces, for which python bindings '
+                                 'should be generated - if no interface is given, all will be processed and '
+                                 'non-processable will be skipped')
+    if_genpy_parser.set_defaults(action_handler=interface_genpy)
+
     hlp_actions = parser_hlp.add_subparsers(metavar='<action>', help='available actions', required=True)
     hlp_genuuid_parser = hlp_actions.add_parser('generate-uuids', help='generete uuids')
     hlp_genuuid_parser.add_argument('count', type=int, default=3)
     hlp_genuuid_parser.set_defaults(action_handler=helpers_genuuids)
 
-    hlp_yaml2json_parser = hlp_actions.add_parser('yaml2json', help='convert yaml into json')
-    hlp_yaml2json_parser.add_argument('input', type=str, help='path to yaml input file')
-    hlp_yaml2json_parser.add_argument('output', type=str, help='path to json output file')
+    hlp_convert_parser = argparse.ArgumentParser(add_help=False)
+    hlp_convert_parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                                    help='number of parallel worker processes (default: number of cpus)')
+    hlp_convert_parser.add_argument('-f', '--force', action='store_true',
+                                    help='also convert files, whose output is already up to date')
+
+    hlp_yaml2json_parser = hlp_actions.add_parser('yaml2json', parents=[hlp_convert_parser],
+                                                  help='convert yaml into json')
+    hlp_yaml2json_parser.add_argument('input', type=str, nargs='+',
+                                      help='path to yaml input file(s), directories or glob patterns')
+    hlp_yaml2json_parser.add_argument('output', type=str,
+                                      help='path to json output file, or output directory for multiple inputs')
     hlp_yaml2json_parser.set_defaults(action_handler=helpers_yaml2json)
 
-    hlp_json2yaml_parser = hlp_actions.add_parser('json2yaml', help='convert json into yaml')
-    hlp_json2yaml_parser.add_argument('input', type=str, help='path to json input file')
-    hlp_json2yaml_parser.add_argument('output', type=str, help='path to yaml output file')
+    hlp_json2yaml_parser = hlp_actions.add_parser('json2yaml', parents=[hlp_convert_parser],
+                                                  help='convert json into yaml')
+    hlp_json2yaml_parser.add_argument('input', type=str, nargs='+',
+                                      help='path to json input file(s), directories or glob patterns')
+    hlp_json2yaml_parser.add_argument('output', type=str,
+                                      help='path to yaml output file, or output directory for multiple inputs')
     hlp_json2yaml_parser.set_defaults(action_handler=helpers_json2yaml)
 
     types_actions = parser_types.add_subparsers(metavar='<action>', help='available actions', required=True)
     types_genhdr_parser = types_actions.add_parser(
-        'generate-headers', aliases=['gh'], parents=[common_parser], help='generete type headers')
+        'generate-headers', aliases=['gh'], parents=[common_parser, cache_parser], help='generete type headers')
     types_genhdr_parser.add_argument('-f', '--force', action='store_true', help='force overwriting')
     types_genhdr_parser.add_argument('-o', '--output-dir', type=str, help='Output directory for generated type '
                                      'headers (default: {everest-dir}/build/generated/generated/types)')
     types_genhdr_parser.add_argument('-d', '--diff', '--dry-run', action='store_true', help='show resulting diff')
+    types_genhdr_parser.add_argument('--split-sources', action='store_true', help='only declare the conversion '
+                                     'functions in the type headers and generate their definitions into a source '
+                                     'file per type file, plus a types.cmake building them into a library')
+    types_genhdr_parser.add_argument('--fine-grained-headers', action='store_true', help='generate a header per '
+                                     'type, type headers only include the headers of the types they use')
+    types_genhdr_parser.add_argument('--dedup-inline-types', action='store_true', help='generate structurally '
+                                     'identical inline enums and objects of all type files once into a shared '
+                                     'header, the type headers get aliases for them')
+    types_genhdr_parser.add_argument('--dedup-report', action='store_true', help='with --dedup-inline-types, '
+                                     'additionally render all type files with and without the shared inline types '
+                                     'and print the saved generated bytes')
+    types_genhdr_parser.add_argument('--roundtrip-test', type=str, metavar='FILE', help='additionally generate a '
+                                     'c++ test program into FILE, which converts a sample json value of every type '
+                                     'into the type and back and checks the result')
     types_genhdr_parser.add_argument('types', nargs='*', help='a list of types, for which header files should '
                                      'be generated - if no type is given, all will be processed and non-processable '
                                      'will be skipped')
     types_genhdr_parser.set_defaults(action_handler=types_genhdr)
 
+    types_genpy_parser = types_actions.add_parser(
+        'generate-python', aliases=['gp'], parents=[common_parser],
+        help='generate python bindings validating and converting the payloads of types')
+    types_genpy_parser.add_argument('-f', '--force', action='store_true', help='force overwriting')
+    types_genpy_parser.add_argument('-o', '--output-dir', type=str, help='Output directory of the generated python '
+                                    'package, its name is the name of the package '
+                                    '(default: {everest-dir}/build/generated/python/everest_generated)')
+    types_genpy_parser.add_argument('-d', '--diff', '--dry-run', action='store_true', help='show resulting diff')
+    types_genpy_parser.add_argument('types', nargs='*', help='a list of type files, for which python bindings '
+                                    'should be generated - if no type is given, all will be processed and '
+                                    'non-processable will be skipped')
+    types_genpy_parser.set_defaults(action_handler=types_genpy)
+
+    parser_report.add_argument('--top', type=int, default=20,
+                               help='number of listed generated files, ranked by their estimated compile cost, '
+                               '0 lists all (default: 20)')
+    parser_report.add_argument('--json', action='store_true', help='print the metrics of all generated files as json')
+    parser_report.add_argument('--fine-grained-headers', action='store_true',
+                               help='report the generated code with a header per type')
+    parser_report.set_defaults(action_handler=report_all)
+
+    parser_validate.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                                 help='number of parallel worker processes (default: number of cpus)')
+    parser_validate.add_argument('--json', action='store_true', help='print the errors as json')
+    parser_validate.set_defaults(action_handler=validate_all)
+
+    parser_corpus.add_argument('-o', '--output-dir', type=str, help='Output directory for the corpus files '
+                               '(default: {everest-dir}/build/generated/corpus)')
+    parser_corpus.add_argument('-n', '--count', type=int, default=100,
+                               help='number of payloads per type, var, command arguments and result (default: 100)')
+    parser_corpus.add_argument('--seed', type=int, default=0,
+                               help='seed of the random payloads, the same seed gives the same corpus (default: 0)')
+    parser_corpus.add_argument('--max-array-length', type=int, default=8,
+                               help='maximum length of arrays, unless their schema requires more items (default: 8)')
+    parser_corpus.add_argument('--optional-probability', type=float, default=0.5,
+                               help='probability of an optional property being present (default: 0.5)')
+    parser_corpus.add_argument('--only', choices=['types', 'interfaces'],
+                               help='only generate the corpora of the types or of the interfaces')
+    parser_corpus.set_defaults(action_handler=corpus_generate)
+
+    cache_actions = parser_cache.add_subparsers(metavar='<action>', help='available actions', required=True)
+    cache_stats_parser = cache_actions.add_parser('stats', parents=[cache_parser],
+                                                  help='show the size and the hit rate of the output cache')
+    cache_stats_parser.add_argument('--json', action='store_true', help='print the statistics as json')
+    cache_stats_parser.set_defaults(action_handler=cache_stats)
+    cache_clear_parser = cache_actions.add_parser('clear', parents=[cache_parser],
+                                                  help='remove all outputs and statistics from the output cache')
+    cache_clear_parser.set_defaults(action_handler=cache_clear)
+
     args = parser.parse_args()
 
     if 'everest_dir' in args:
@@ -788,9 +1390,25 @@ def main():
 
         TypeParser.validators = validators
         TypeParser.templates = templates
+        TypeParser.fine_grained_headers = getattr(args, 'fine_grained_headers', False)
+
+        if 'cache_dir' in args:
+            output_cache = OutputCache.from_args(args)
+
+    profiling = getattr(args, 'profile', False) or getattr(args, 'profile_trace', None)
+    if profiling:
+        Profiler.enable()
 
     args.action_handler(args)
 
+    if output_cache:
+        output_cache.close()
+
+    if profiling:
+        Profiler.print_summary(args.profile_top)
+        if args.profile_trace:
+            Profiler.write_chrome_trace(Path(args.profile_trace).resolve())
+
 
 if __name__ == '__main__':
     try:
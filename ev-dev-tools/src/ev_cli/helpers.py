@@ -9,10 +9,18 @@ FIXME (aw): Module documentation.
 """
 
 from .type_parsing import TypeParser
+from .model import EnumInfo, ParsedEnum, ParsedType, Property, PropertyInfo, TypeInfo
+from .profiling import Profiler
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+import filecmp
+import functools
+import glob
+import os
 import shutil
 import subprocess
+import tempfile
 import re
 from typing import Dict, List, Tuple
 import keyword
@@ -29,6 +37,10 @@ import stringcase
 
 everest_dirs: List[Path] = []
 
+# prefer the libyaml based implementations, if pyyaml has been built with them
+YamlSafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+YamlSafeDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
 
 class EVerestParsingException(SystemExit):
     pass
@@ -64,6 +76,21 @@ def snake_case(word: str) -> str:
     return out
 
 
+def group_enum_values(values: List[str]) -> List[Dict]:
+    """Group enum values by their length and then by their first character, for generating the dispatch
+    of the string to enum conversion.
+
+    An empty value ends up alone in the group of length 0, which needs no dispatch on its first character."""
+    by_length = {}
+    for value in values:
+        by_length.setdefault(len(value), {}).setdefault(value[:1], []).append(value)
+
+    return [{
+        'length': length,
+        'first_chars': [{'first_char': first_char, 'enums': group} for first_char, group in first_chars.items()]
+    } for length, first_chars in sorted(by_length.items())]
+
+
 def create_dummy_result(json_type) -> str:
     def primitive_to_sample_value(type):
         if type == 'boolean':
@@ -142,11 +169,17 @@ def clang_format(config_file_path, file_info):
         raise RuntimeError(f'Supplied directory for the clang-format file '
                            f'({config_file_path}) does not contain a .clang-format file')
 
+    if 'content_stream' in file_info:
+        # streamed content gets piped through clang-format, when it is written out, which is profiled there
+        file_info['clang_format'] = (clang_format_path, config_file_path)
+        return
+
     content = file_info['content']
 
     run_parms = {'capture_output': True, 'cwd': config_file_path, 'encoding': 'utf-8', 'input': content}
 
-    format_cmd = subprocess.run([clang_format_path, '--style=file'], **run_parms)
+    with Profiler.phase('clang_format', file_info['path']):
+        format_cmd = subprocess.run([clang_format_path, '--style=file'], **run_parms)
 
     if format_cmd.returncode != 0:
         raise RuntimeError(f'clang-format failed with:\n{format_cmd.stderr}')
@@ -170,23 +203,23 @@ def resolve_everest_dir_path(postfix):
 
 
 def build_type_info(name, json_type):
-    ti = {
-        'name': name,
-        'is_variant': False,
-        'cpp_type': None,
-        'json_type': json_type
-    }
+    ti = TypeInfo(
+        name=name,
+        is_variant=False,
+        cpp_type=None,
+        json_type=json_type
+    )
 
     if isinstance(json_type, list):
-        ti['is_variant'] = True
-        ti['cpp_type'] = [cpp_type_map[e] for e in json_type if e != 'null']
-        ti['cpp_type'].sort()  # sort, so template generation might get reduced
+        ti.is_variant = True
+        ti.cpp_type = [cpp_type_map[e] for e in json_type if e != 'null']
+        ti.cpp_type.sort()  # sort, so template generation might get reduced
         # prepend boost::blank if type 'null' exists, so the variant
         # gets default initialized with blank
         if 'null' in json_type:
-            ti['cpp_type'].insert(0, cpp_type_map['null'])
+            ti.cpp_type.insert(0, cpp_type_map['null'])
     else:
-        ti['cpp_type'] = cpp_type_map[json_type]
+        ti.cpp_type = cpp_type_map[json_type]
 
     return ti
 
@@ -203,7 +236,7 @@ format_types = dict()
 def object_exists(name: str) -> bool:
     """Check if an object already exists."""
     for el in parsed_types:
-        if el['name'] == name:
+        if el.name == name:
             return True
 
     return False
@@ -212,41 +245,40 @@ def object_exists(name: str) -> bool:
 def add_enum_type(name: str, enums: Tuple[str], description: str):
     """Add enum type to parsed_types."""
     for el in parsed_enums:
-        if el['name'] == name:
+        if el.name == name:
             raise Exception('Warning: enum ' + name + ' already exists')
-    parsed_enums.append({
-        'name': name,
-        'enums': enums,
-        'description': description
-    })
+    parsed_enums.append(ParsedEnum(
+        name=name,
+        enums=enums,
+        description=description
+    ))
 
 
-def parse_ref(ref: str, prop_type, prop_info: Dict) -> Tuple[str, dict]:
+def parse_ref(ref: str, prop_type, prop_info: PropertyInfo) -> Tuple[str, PropertyInfo]:
     if ref not in TypeParser.all_types:
         TypeParser.all_types[ref] = TypeParser.parse_type_url(type_url=ref)
     type_dict = TypeParser.all_types[ref]
 
-    type_path = resolve_everest_dir_path('types' / type_dict['type_relative_path'] .with_suffix('.yaml'))
+    type_path = resolve_everest_dir_path('types' / type_dict.type_relative_path.with_suffix('.yaml'))
     if not type_path or not type_path.exists():
         raise EVerestParsingException('$ref: ' + ref + f' referenced type file "{type_path} does not exist.')
 
-    (td, _mod) = TypeParser.load_type_definition(type_path)
-    if 'types' in td and type_dict['type_name'] in td['types']:
-        local_type_info = td['types'][type_dict['type_name']]
+    with Profiler.phase('resolve_ref', ref):
+        (td, _mod) = TypeParser.load_type_definition(type_path)
+    if 'types' in td and type_dict.type_name in td['types']:
+        local_type_info = td['types'][type_dict.type_name]
         if local_type_info['type'] == 'string' and 'enum' in local_type_info:
-            prop_info['enum'] = True
-    prop_type = type_dict['namespaced_type']
-    prop_info['prop']['type'] = prop_type
-    prop_info['type_dict'] = type_dict
+            prop_info.enum = True
+    prop_type = type_dict.namespaced_type
+    prop_info.prop['type'] = prop_type
+    prop_info.type_dict = type_dict
 
-    path = Path('generated/types') / \
-        type_dict['type_relative_path'].with_suffix('.hpp')
-    type_headers.add(path.as_posix())
+    type_headers.add(TypeParser.type_header_path(type_dict))
 
     return (prop_type, prop_info)
 
 
-def parse_property(prop_name: str, prop: Dict, depends_on: List[str], type_file: bool) -> Tuple[str, dict]:
+def parse_property(prop_name: str, prop: Dict, depends_on: List[str], type_file: bool) -> Tuple[str, PropertyInfo]:
     """Determine type of property and proceed with it.
     In case it is a $ref, look it up in the TypeParser
     Currently, the following property types are supported:
@@ -259,11 +291,11 @@ def parse_property(prop_name: str, prop: Dict, depends_on: List[str], type_file:
     """
 
     prop_type = None
-    prop_info = {
-        'description': prop.get('description', 'TODO: description'),
-        'prop': prop,
-        'enum': False
-    }
+    prop_info = PropertyInfo(
+        description=prop.get('description', 'TODO: description'),
+        prop=prop,
+        enum=False
+    )
     if '$ref' in prop:
         return parse_ref(prop['$ref'], prop_type, prop_info)
 
@@ -273,14 +305,14 @@ def parse_property(prop_name: str, prop: Dict, depends_on: List[str], type_file:
     if prop['type'] == 'string':
         if 'enum' in prop and type_file:
             prop_type = stringcase.capitalcase(prop_name)
-            add_enum_type(prop_type, prop['enum'], prop_info['description'])
+            add_enum_type(prop_type, prop['enum'], prop_info.description)
         elif 'format' in prop:
             if prop['format'] in format_types:
                 prop_type = format_types[prop['format']]
             else:
                 # unsupported format type
                 prop_type = 'std::string'
-                prop_info['unsupported_format'] = True
+                prop_info.unsupported_format = True
         else:
             prop_type = 'std::string'
     elif prop['type'] == 'integer':
@@ -311,7 +343,7 @@ def parse_object(ob_name: str, json_schema: Dict, type_file: bool):
     and puts these information into the global dict parsed_types.
     """
 
-    ob_dict = {'name': ob_name, 'properties': [], 'depends_on': []}
+    ob_dict = ParsedType(name=ob_name, properties=[], depends_on=[])
     parsed_types.insert(0, ob_dict)
 
     if 'properties' not in json_schema:
@@ -321,17 +353,15 @@ def parse_object(ob_name: str, json_schema: Dict, type_file: bool):
                 TypeParser.all_types[json_schema['$ref']] = TypeParser.parse_type_url(type_url=json_schema['$ref'])
             type_dict = TypeParser.all_types[json_schema['$ref']]
 
-            type_path = resolve_everest_dir_path('types' / type_dict['type_relative_path'].with_suffix('.yaml'))
+            type_path = resolve_everest_dir_path('types' / type_dict.type_relative_path.with_suffix('.yaml'))
             if not type_path or not type_path.exists():
                 raise EVerestParsingException(
                     '$ref: ' + json_schema['$ref'] + f' referenced type file "{type_path} does not exist.')
             TypeParser.does_type_exist(type_url=json_schema['$ref'], json_type=json_schema['type'])
 
-            prop_type = type_dict['namespaced_type']
-            ob_dict['name'] = prop_type
-            path = Path('generated/types') / \
-                type_dict['type_relative_path'].with_suffix('.hpp')
-            type_headers.add(path.as_posix())
+            prop_type = type_dict.namespaced_type
+            ob_dict.name = prop_type
+            type_headers.add(TypeParser.type_header_path(type_dict))
             return ob_dict
         return
 
@@ -341,88 +371,87 @@ def parse_object(ob_name: str, json_schema: Dict, type_file: bool):
     for prop_name, prop in json_schema['properties'].items():
         if not prop_name.isidentifier() or keyword.iskeyword(prop_name):
             raise Exception(prop_name + ' can\'t be used as an identifier!')
-        (prop_type, prop_info) = parse_property(prop_name, prop, ob_dict['depends_on'], type_file)
-        ob_dict['properties'].append({
-            'name': prop_name,
-            'json_name': prop_name,
-            'type': prop_type,
-            'info': prop_info,
-            'enum': 'enum' in prop or prop_info['enum'],
-            'required': prop_name in json_schema.get('required', {}),
-        })
-
-    ob_dict['properties'].sort(key=lambda x: x.get('required'), reverse=True)
+        (prop_type, prop_info) = parse_property(prop_name, prop, ob_dict.depends_on, type_file)
+        ob_dict.properties.append(Property(
+            name=prop_name,
+            json_name=prop_name,
+            type=prop_type,
+            info=prop_info,
+            enum='enum' in prop or prop_info.enum,
+            required=prop_name in json_schema.get('required', {}),
+        ))
+
+    ob_dict.properties.sort(key=lambda x: x.required, reverse=True)
 
     return ob_dict
 
 
-def extended_build_type_info(name: str, info: dict, type_file=False) -> Tuple[dict, dict]:
+@Profiler.profiled('build_type_info', lambda name, *_args, **_kwargs: name)
+def extended_build_type_info(name: str, info: dict, type_file=False) -> Tuple[TypeInfo, EnumInfo]:
     """Extend build_type_info with enum and object type handling."""
     type_info = build_type_info(name, info['type'])
     enum_info = None
 
-    if type_info['json_type'] == 'string':
+    if type_info.json_type == 'string':
         if 'enum' in info and type_file:
-            enum_info = {
-                'name': name,
-                'description': info.get('description', 'TODO: description'),
-                'enum_type': stringcase.capitalcase(name),
-                'enum': info['enum']
-            }
-
-            type_info['enum_type'] = enum_info['enum_type']
+            enum_info = EnumInfo(
+                name=name,
+                description=info.get('description', 'TODO: description'),
+                enum_type=stringcase.capitalcase(name),
+                enum=info['enum']
+            )
+
+            type_info.enum_type = enum_info.enum_type
         elif '$ref' in info:
             if info['$ref'] not in TypeParser.all_types:
                 TypeParser.all_types[info['$ref']] = TypeParser.parse_type_url(type_url=info['$ref'])
             type_dict = TypeParser.all_types[info['$ref']]
 
-            type_path = resolve_everest_dir_path('types' / type_dict['type_relative_path'] .with_suffix('.yaml'))
+            type_path = resolve_everest_dir_path('types' / type_dict.type_relative_path.with_suffix('.yaml'))
             if not type_path or not type_path.exists():
                 raise EVerestParsingException('$ref: ' + info['$ref'] +
                                               f' referenced type file "{type_path} does not exist.')
 
-            (td, _mod) = TypeParser.load_type_definition(type_path)
-            if 'types' in td and type_dict['type_name'] in td['types']:
-                local_type_info = td['types'][type_dict['type_name']]
+            with Profiler.phase('resolve_ref', info['$ref']):
+                (td, _mod) = TypeParser.load_type_definition(type_path)
+            if 'types' in td and type_dict.type_name in td['types']:
+                local_type_info = td['types'][type_dict.type_name]
                 if local_type_info['type'] == 'string' and 'enum' in local_type_info:
-                    enum_info = {
-                        'name': name,
-                        'description': local_type_info.get('description', 'TODO: description'),
-                        'enum_type': type_dict['namespaced_type'],
-                        'enum': local_type_info['enum']
-                    }
-
-                    type_info['enum_type'] = enum_info['enum_type']
-            path = Path('generated/types') / \
-                type_dict['type_relative_path'].with_suffix('.hpp')
-            type_headers.add(path.as_posix())
-    elif type_info['json_type'] == 'object':
+                    enum_info = EnumInfo(
+                        name=name,
+                        description=local_type_info.get('description', 'TODO: description'),
+                        enum_type=type_dict.namespaced_type,
+                        enum=local_type_info['enum']
+                    )
+
+                    type_info.enum_type = enum_info.enum_type
+            type_headers.add(TypeParser.type_header_path(type_dict))
+    elif type_info.json_type == 'object':
         try:
             ob = parse_object(name, info, type_file)
-            if ob and 'name' in ob:
-                type_info['object_type'] = ob['name']
+            if ob:
+                type_info.object_type = ob.name
         except EVerestParsingException as e:
             raise EVerestParsingException(f'Error parsing object {name}: {e}')
-    elif type_info['json_type'] == 'array':
+    elif type_info.json_type == 'array':
         if '$ref' in info['items']:
             if info['items']['$ref'] not in TypeParser.all_types:
                 TypeParser.all_types[info['items']['$ref']] = TypeParser.parse_type_url(type_url=info['items']['$ref'])
             type_dict = TypeParser.all_types[info['items']['$ref']]
 
-            type_path = resolve_everest_dir_path('types' / type_dict['type_relative_path'] .with_suffix('.yaml'))
+            type_path = resolve_everest_dir_path('types' / type_dict.type_relative_path.with_suffix('.yaml'))
             if not type_path or not type_path.exists():
                 raise EVerestParsingException(
                     '$ref: ' + info['items']['$ref'] + f' referenced type file "{type_path} does not exist.')
 
-            (td, _mod) = TypeParser.load_type_definition(type_path)
-            if 'types' in td and type_dict['type_name'] in td['types']:
-                local_type_info = td['types'][type_dict['type_name']]
+            with Profiler.phase('resolve_ref', info['items']['$ref']):
+                (td, _mod) = TypeParser.load_type_definition(type_path)
+            if 'types' in td and type_dict.type_name in td['types']:
+                local_type_info = td['types'][type_dict.type_name]
                 if 'enum' in local_type_info:
-                    type_info['array_type_contains_enum'] = True
-                type_info['array_type'] = type_dict['namespaced_type']
-            path = Path('generated/types') / \
-                type_dict['type_relative_path'].with_suffix('.hpp')
-            type_headers.add(path.as_posix())
+                    type_info.array_type_contains_enum = True
+                type_info.array_type = type_dict.namespaced_type
+            type_headers.add(TypeParser.type_header_path(type_dict))
 
     return (type_info, enum_info)
 
@@ -452,20 +481,22 @@ def load_validators(schema_path: Path):
 def load_validated_interface_def(if_def_path: Path, validator):
     if_def = {}
     try:
-        if_def = yaml.safe_load(if_def_path.read_text())
-        # validating interface
-        validator.validate(if_def)
-        # validate var/cmd subparts
-        if "vars" in if_def:
-            for _var_name, var_def in if_def["vars"].items():
-                jsonschema.Draft7Validator.check_schema(var_def)
-        if "cmds" in if_def:
-            for _cmd_name, cmd_def in if_def["cmds"].items():
-                if "arguments" in cmd_def:
-                    for _arg_name, arg_def in cmd_def["arguments"].items():
-                        jsonschema.Draft7Validator.check_schema(arg_def)
-                if "result" in cmd_def:
-                    jsonschema.Draft7Validator.check_schema(cmd_def["result"])
+        with Profiler.phase('load_yaml', if_def_path):
+            if_def = yaml.safe_load(if_def_path.read_text())
+        with Profiler.phase('validate', if_def_path):
+            # validating interface
+            validator.validate(if_def)
+            # validate var/cmd subparts
+            if "vars" in if_def:
+                for _var_name, var_def in if_def["vars"].items():
+                    jsonschema.Draft7Validator.check_schema(var_def)
+            if "cmds" in if_def:
+                for _cmd_name, cmd_def in if_def["cmds"].items():
+                    if "arguments" in cmd_def:
+                        for _arg_name, arg_def in cmd_def["arguments"].items():
+                            jsonschema.Draft7Validator.check_schema(arg_def)
+                    if "result" in cmd_def:
+                        jsonschema.Draft7Validator.check_schema(cmd_def["result"])
     except OSError as err:
         raise Exception(f'Could not open interface definition file {err.filename}: {err.strerror}') from err
     except jsonschema.ValidationError as err:
@@ -480,9 +511,11 @@ def load_validated_type_def(type_def_path: Path, validator):
     """Load a type definition from the provided path and validate it with the provided validator."""
 
     try:
-        type_def = yaml.safe_load(type_def_path.read_text())
-        # validating type definition
-        validator.validate(type_def)
+        with Profiler.phase('load_yaml', type_def_path):
+            type_def = yaml.safe_load(type_def_path.read_text())
+        with Profiler.phase('validate', type_def_path):
+            # validating type definition
+            validator.validate(type_def)
 
         return type_def
     except OSError as err:
@@ -497,8 +530,10 @@ def load_validated_type_def(type_def_path: Path, validator):
 
 def load_validated_module_def(module_path: Path, validator):
     try:
-        module_def = yaml.safe_load(module_path.read_text())
-        validator.validate(module_def)
+        with Profiler.phase('load_yaml', module_path):
+            module_def = yaml.safe_load(module_path.read_text())
+        with Profiler.phase('validate', module_path):
+            validator.validate(module_def)
     except OSError as err:
         raise Exception(f'Could not open type definition file {err.filename}: {err.strerror}') from err
     except jsonschema.ValidationError as err:
@@ -520,11 +555,15 @@ def yaml2json(yaml_file: Path, json_file: Path):
         exit(1)
 
     with open(yaml_file, 'r') as yaml_content:
-        content_as_dict = yaml.safe_load(yaml_content)
+        documents = list(yaml.load_all(yaml_content, Loader=YamlSafeLoader))
+
+    # a multi-document yaml stream gets converted into a json array of its documents
+    content_as_dict = documents[0] if len(documents) == 1 else (documents or None)
 
     with open(json_file, 'w') as json_content:
         json.dump(content_as_dict, json_content, indent=2)
 
+
 def json2yaml(json_file: Path, yaml_file: Path):
     if not json_file.exists():
         print(f'The input file ({json_file}) does not exist')
@@ -534,10 +573,90 @@ def json2yaml(json_file: Path, yaml_file: Path):
         content_as_dict = json.load(json_content)
 
     with open(yaml_file, 'w') as yaml_content:
-        yaml.safe_dump(content_as_dict, yaml_content, indent=2, sort_keys=False, width=120)
+        yaml.dump(content_as_dict, yaml_content, Dumper=YamlSafeDumper, indent=2, sort_keys=False, width=120)
+
+
+def is_glob_pattern(pattern: str) -> bool:
+    return any(char in pattern for char in '*?[')
+
+
+def collect_conversions(inputs: List[str], output_dir: Path, input_suffixes: List[str], output_suffix: str,
+                        force: bool) -> Tuple[List[Tuple[Path, Path]], int]:
+    """Collect the (input, output) file pairs for converting files, directories and glob patterns.
+
+    Directories are searched recursively for files with one of the input_suffixes.  The path of a file
+    relative to its directory, or to the non-wildcard part of its glob pattern, is kept below output_dir.
+    Returns the pairs and the number of skipped files, whose output is already up to date.
+    Raises an exception, if two different input files would be converted to the same output file.
+    """
+    conversions = []
+    skipped = 0
+    # output file -> input file, for all files including the skipped ones
+    inputs_by_output = {}
+    for input_spec in inputs:
+        input_path = Path(input_spec)
+        if is_glob_pattern(input_spec):
+            base_parts = []
+            for part in input_path.parts:
+                if is_glob_pattern(part):
+                    break
+                base_parts.append(part)
+            base = Path(*base_parts)
+            files = [Path(file) for file in glob.glob(input_spec, recursive=True)
+                     if Path(file).suffix in input_suffixes]
+        elif input_path.is_dir():
+            base = input_path
+            files = [file for file in input_path.rglob('*') if file.suffix in input_suffixes]
+        else:
+            base = input_path.parent
+            files = [input_path]
+
+        for file in sorted(files):
+            if not file.is_file():
+                continue
+            output_file = (output_dir / file.relative_to(base)).with_suffix(output_suffix)
+            resolved_output_file = output_file.resolve()
+            resolved_file = file.resolve()
+            if resolved_output_file in inputs_by_output:
+                if inputs_by_output[resolved_output_file] != resolved_file:
+                    raise Exception(f'The input files {inputs_by_output[resolved_output_file]} and {resolved_file} '
+                                    f'would both be converted to {resolved_output_file}')
+                # the same file matched by more than one input
+                continue
+            inputs_by_output[resolved_output_file] = resolved_file
+
+            if not force and output_file.exists() and output_file.stat().st_mtime >= file.stat().st_mtime:
+                skipped += 1
+                continue
+            conversions.append((resolved_file, resolved_output_file))
+
+    return (conversions, skipped)
+
+
+def convert_files(conversions: List[Tuple[Path, Path]], converter, jobs: int):
+    """Run converter(input, output) for all conversions using jobs worker processes."""
+    for (_, output_file) in conversions:
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    if jobs <= 1 or len(conversions) <= 1:
+        for (input_file, output_file) in conversions:
+            converter(input_file, output_file)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        chunksize = max(1, len(conversions) // (jobs * 4))
+        # consume the results, so exceptions of the workers get raised
+        for _ in executor.map(converter, *zip(*conversions), chunksize=chunksize):
+            pass
 
-def __check_for_match(blocks_def, line, line_no, file_path):
-    match = re.search(blocks_def['regex_str'], line)
+
+@functools.lru_cache(maxsize=None)
+def __compile_block_regex(regex_str):
+    return re.compile(regex_str)
+
+
+def __check_for_match(blocks_def, block_regex, block_names, line, line_no, file_path):
+    match = block_regex.search(line)
     if not match:
         return None
 
@@ -559,20 +678,16 @@ def __check_for_match(blocks_def, line, line_no, file_path):
             f'  contains version "{mb["version"]}", which is different from the blocks definition version "{blocks_def["version"]}"'
         )
 
-    for block, block_info in blocks_def['definitions'].items():
-        if block_info['id'] != mb['id']:
-            continue
-
-        mb['name'] = block
-        mb['block'] = block_info
-
-    if not 'block' in mb:
+    if mb['id'] not in block_names:
         raise ValueError(
             f'Error while parsing {file_path}:\n'
             f'  matched line {line_no}: {line}\n'
             f'  contains uuid "{mb["id"]}", which doesn\'t exist in the block definition'
         )
 
+    mb['name'] = block_names[mb['id']]
+    mb['block'] = blocks_def['definitions'][mb['name']]
+
     return mb
 
 
@@ -598,25 +713,28 @@ def generate_tmpl_blocks(blocks_def, file_path=None):
         print(f'Could not open file {err.filename} for parsing blocks: {err.strerror}')
         exit(1)
 
-    line_no = 0
-    matched_block = None
-    content = None
+    # the regex is compiled once per blocks definition, the blocks get collected in a single pass over the lines
+    block_regex = __compile_block_regex(blocks_def['regex_str'])
+    block_names = {block_def['id']: block_name for (block_name, block_def) in blocks_def['definitions'].items()}
 
-    for line in file_data.splitlines(True):
-        line_no += 1
+    matched_block = None
+    content_lines = []
 
+    for line_no, line in enumerate(file_data.splitlines(True), start=1):
         if not matched_block:
-            matched_block = __check_for_match(blocks_def, line.rstrip(), line_no, file_path)
-            content = None
+            matched_block = __check_for_match(blocks_def, block_regex, block_names, line.rstrip(), line_no,
+                                              file_path)
+            content_lines = []
             continue
 
         if (line.strip() == matched_block['tag']):
+            content = ''.join(content_lines)
             if (content):
                 tmpl_block[matched_block['name']]['content'] = content.rstrip()
                 tmpl_block[matched_block['name']]['first_use'] = False
             matched_block = None
         else:
-            content = (content + line) if content else line
+            content_lines.append(line)
 
     if matched_block:
         raise ValueError(
@@ -628,6 +746,30 @@ def generate_tmpl_blocks(blocks_def, file_path=None):
     return tmpl_block
 
 
+def replace_tmpl_block_section(tmpl_blocks, blocks_def, block_name, begin_marker, end_marker, content):
+    """Replace the section between begin_marker and end_marker lines of a block with content.
+
+    The section is owned by ev-cli, it gets removed if content is empty and appended to the block if it doesn't
+    exist yet, everything else of the block is kept as is.  Return whether the section changed.
+    """
+    block = tmpl_blocks[block_name]
+    section_regex = re.compile(rf'\n*^[ \t]*{re.escape(begin_marker)}[ \t]*$.*?^[ \t]*{re.escape(end_marker)}[ \t]*$',
+                               re.MULTILINE | re.DOTALL)
+    block_content = section_regex.sub('', block['content']).strip('\n')
+    if not block_content.strip():
+        block_content = blocks_def['definitions'][block_name]['content']
+
+    if content:
+        block_content = f'{block_content}\n\n{begin_marker}\n{content}\n{end_marker}'
+
+    old_section = section_regex.search(block['content'])
+    changed = (old_section.group(0).strip('\n') if old_section else '') != \
+        (f'{begin_marker}\n{content}\n{end_marker}' if content else '')
+    block['content'] = block_content
+
+    return changed
+
+
 def load_tmpl_blocks(blocks_def, file_path, update):
     if update and file_path.exists():
         return generate_tmpl_blocks(blocks_def, file_path)
@@ -635,6 +777,86 @@ def load_tmpl_blocks(blocks_def, file_path, update):
         return generate_tmpl_blocks(blocks_def)
 
 
+def load_tmpl_blocks_of_files(blocks_files, update, jobs=None) -> List[Dict]:
+    """Load the blocks of several files concurrently, blocks_files is a list of (blocks_def, file_path).
+
+    Return the blocks in the order of blocks_files.
+    """
+    if len(blocks_files) <= 1 or jobs == 1:
+        return [load_tmpl_blocks(blocks_def, file_path, update) for (blocks_def, file_path) in blocks_files]
+
+    # reading the files dominates, threads overlap it without the startup and pickling costs of processes
+    with ThreadPoolExecutor(max_workers=min(len(blocks_files), jobs or os.cpu_count() or 1)) as executor:
+        return list(executor.map(lambda blocks_file: load_tmpl_blocks(*blocks_file, update), blocks_files))
+
+
+def materialize_content(file_info):
+    """Render streamed content into file_info['content'], formatting it if requested.
+
+    Cached content gets read from the cache.
+    """
+    if 'cached_path' in file_info:
+        file_info['content'] = file_info.pop('cached_path').read_text(encoding='utf-8')
+        return
+
+    if 'content_stream' not in file_info:
+        return
+
+    file_info['content'] = ''.join(file_info.pop('content_stream'))
+
+    if 'clang_format' in file_info:
+        (clang_format_path, config_file_path) = file_info.pop('clang_format')
+        clang_format(config_file_path, file_info)
+
+
+def __replace_file(file_path: Path, write):
+    """Write a file by calling write with a temporary sibling, which gets moved into place on success.
+
+    So readers never see partially written files.
+    """
+    tmp_path = file_path.with_name(f'.{file_path.name}.{os.getpid()}.tmp')
+
+    try:
+        write(tmp_path)
+        tmp_path.replace(file_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def __stream_content_to_file(file_info, tmp_path: Path):
+    """Write the rendered chunks of file_info['content_stream'] to tmp_path.
+
+    The chunks are either written directly or piped through clang-format, whose output goes straight into the
+    file, so the complete content never needs to be held in memory.
+    """
+    with open(tmp_path, 'w', encoding='utf-8') as out_file:
+        if 'clang_format' not in file_info:
+            out_file.writelines(file_info['content_stream'])
+        else:
+            (clang_format_path, config_file_path) = file_info['clang_format']
+            # contains the rendering of the streamed content, which clang-format waits for
+            with tempfile.TemporaryFile() as err_file, Profiler.phase('clang_format', file_info['path']):
+                format_cmd = subprocess.Popen([clang_format_path, '--style=file'], cwd=config_file_path,
+                                              stdin=subprocess.PIPE, stdout=out_file, stderr=err_file,
+                                              encoding='utf-8')
+                try:
+                    format_cmd.stdin.writelines(file_info['content_stream'])
+                    format_cmd.stdin.close()
+                except BrokenPipeError:
+                    pass
+                except BaseException:
+                    # rendering failed, clang-format must not wait for the rest of its input
+                    format_cmd.kill()
+                    format_cmd.wait()
+                    raise
+                format_cmd.wait()
+
+                if format_cmd.returncode != 0:
+                    err_file.seek(0)
+                    raise RuntimeError(f'clang-format failed with:\n{err_file.read().decode()}')
+
+
 def __show_diff_for(file_info):
     diff_path = shutil.which('diff')
     if diff_path == None:
@@ -649,7 +871,9 @@ def __show_diff_for(file_info):
         diff_ignore = '^#.*'
     diff_ignore_args = ['-I', diff_ignore] if diff_ignore else []
 
-    run_parms = {'input': file_info['content'], 'capture_output': True, 'encoding': 'utf-8'}
+    run_parms = {'input': file_info['content'], 'capture_output': True}
+    if not isinstance(file_info['content'], bytes):
+        run_parms['encoding'] = 'utf-8'
 
     diff = subprocess.run([
         diff_path,
@@ -661,7 +885,7 @@ def __show_diff_for(file_info):
         '-'
     ], **run_parms).stdout
     if diff:
-        print(diff)
+        print(diff.decode() if isinstance(diff, bytes) else diff)
 
 
 def filter_mod_files(only, mod_files):
@@ -693,6 +917,7 @@ def print_available_mod_files(mod_files):
             print(f'  {file_info["abbr"]}')
 
 
+@Profiler.profiled('write', lambda file_info, *_args, **_kwargs: file_info['path'])
 def write_content_to_file(file_info, strategy, only_diff=False):
     # strategy:
     #   update: update only if dest older or not existent
@@ -711,6 +936,7 @@ def write_content_to_file(file_info, strategy, only_diff=False):
     method = ''
 
     if only_diff:
+        materialize_content(file_info)
         return __show_diff_for(file_info)
 
     if strategy == 'update':
@@ -730,9 +956,24 @@ def write_content_to_file(file_info, strategy, only_diff=False):
     else:
         raise Exception(f'Invalid strategy "{strategy}"\nSupported strategies: {strategies}')
 
+    if 'cached_path' in file_info and file_path.exists() and \
+            filecmp.cmp(file_path, file_info['cached_path'], shallow=False):
+        # keeps the modification time, so build tools don't rebuild anything depending on the file
+        print(f'Skipping {printable_name} (unchanged)')
+        return
+
     print(f'{method} file {printable_name}')
 
     if not file_dir.exists():
         file_dir.mkdir(parents=True, exist_ok=True)
 
-    file_path.write_text(file_info['content'])
+    if 'cached_path' in file_info:
+        # a copy gets the time of writing and the permissions of a newly created file, hardlinks would share both
+        # with the cache and all other trees using it
+        __replace_file(file_path, lambda tmp_path: shutil.copyfile(file_info['cached_path'], tmp_path))
+    elif 'content_stream' in file_info:
+        __replace_file(file_path, lambda tmp_path: __stream_content_to_file(file_info, tmp_path))
+    elif isinstance(file_info['content'], bytes):
+        __replace_file(file_path, lambda tmp_path: tmp_path.write_bytes(file_info['content']))
+    else:
+        __replace_file(file_path, lambda tmp_path: tmp_path.write_text(file_info['content']))
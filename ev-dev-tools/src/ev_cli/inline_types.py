@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Deduplication of structurally identical inline enums and objects of the type files.
+
+Inline enums and objects get generated into the header of every type file using them.  The ones, which are
+structurally identical across the tree, are generated once into a shared header instead and the type files get
+aliases for them.
+"""
+
+from .model import FileInfo, ParsedType
+from .type_parsing import TypeParser
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import copy
+import hashlib
+
+import stringcase
+
+
+SHARED_NAMESPACE = '_shared_inline'
+SHARED_HEADER = f'generated/types/{SHARED_NAMESPACE}_types.hpp'
+
+PRIMITIVE_TYPES = ['std::string', 'int32_t', 'float', 'bool']
+
+
+def split_vector_type(cpp_type: str) -> Tuple[int, str]:
+    """Split the type of a property into the nesting depth of std::vector and the item type."""
+    depth = 0
+    while cpp_type.startswith('std::vector<') and cpp_type.endswith('>'):
+        cpp_type = cpp_type[len('std::vector<'):-1]
+        depth += 1
+
+    return (depth, cpp_type)
+
+
+def join_vector_type(depth: int, cpp_type: str) -> str:
+    return 'std::vector<' * depth + cpp_type + '>' * depth
+
+
+class InlineTypes:
+    """Inline enums and objects of a single type file, keyed by their name."""
+
+    def __init__(self, tmpl_data: Dict):
+        type_names = {stringcase.capitalcase(type_group['name']) for type_group in tmpl_data['type_groups']}
+
+        self.enums = {enum['enum_type']: enum for enum in tmpl_data['enums']
+                      if enum['enum_type'] not in type_names and '::' not in enum['enum_type']}
+        # objects without properties are not generated at all
+        self.structs = {parsed_type['name']: parsed_type for parsed_type in tmpl_data['types']
+                        if parsed_type['name'] not in type_names and parsed_type['properties']}
+        self.fingerprints = {}
+
+    def fingerprint(self, name: str, visiting=()) -> Optional[Tuple]:
+        """Return the structure of the inline type, or None if it can't be shared.
+
+        Inline objects using types of any type file, including its own, can't be shared, because the shared
+        header would need to include their headers, which include the shared header in turn.
+        """
+        if name in self.fingerprints:
+            return self.fingerprints[name]
+
+        if name in self.enums:
+            fingerprint = ('enum', tuple(self.enums[name]['enum']))
+        elif name in self.structs and name not in visiting:
+            properties = []
+            for prop in self.structs[name]['properties']:
+                (depth, item_type) = split_vector_type(prop['type'])
+                if item_type in PRIMITIVE_TYPES and not prop['enum']:
+                    item_fingerprint = item_type
+                else:
+                    item_fingerprint = self.fingerprint(item_type, visiting + (name,))
+                if item_fingerprint is None:
+                    properties = None
+                    break
+                properties.append((prop['name'], prop['required'], depth, item_fingerprint))
+            fingerprint = ('struct', tuple(properties)) if properties is not None else None
+        else:
+            fingerprint = None
+
+        self.fingerprints[name] = fingerprint
+        return fingerprint
+
+    def all_fingerprints(self) -> Dict[str, Tuple]:
+        """Return the fingerprints of all inline types, which can be shared."""
+        fingerprints = {}
+        for name in [*self.enums, *self.structs]:
+            fingerprint = self.fingerprint(name)
+            if fingerprint is not None:
+                fingerprints[name] = fingerprint
+
+        return fingerprints
+
+
+class SharedInlineTypes:
+    """Structurally identical inline types of all type files, which get generated into a shared header."""
+
+    def __init__(self):
+        # fingerprint -> shared type, with its name, kind, occurrences and template data
+        self.shared = {}
+        # relative path of a type file -> name of an inline type -> fingerprint
+        self.aliases = {}
+        # relative path of a type file -> its parsed template data and modification time
+        self.type_infos = {}
+        self.last_mtime = 0
+
+    def collect(self, types_with_namespace: List[Dict]):
+        """Fingerprint the inline types of all type files and determine the ones, which get shared."""
+        occurrences = {}
+        type_files = {}
+        for type_with_namespace in types_with_namespace:
+            type_info = TypeParser.generate_type_info(type_with_namespace, all_types=True)
+            if not type_info:
+                continue
+            self.last_mtime = max(self.last_mtime, type_info[1])
+            self.type_infos[type_with_namespace['relative_path'].as_posix()] = type_info
+
+            relative_path = type_with_namespace['relative_path'].as_posix()
+            inline_types = InlineTypes(type_info[0])
+            type_files[relative_path] = inline_types
+            for name, fingerprint in inline_types.all_fingerprints().items():
+                occurrences.setdefault(fingerprint, []).append((relative_path, name))
+
+        shared = {fingerprint for fingerprint, places in occurrences.items() if len(places) > 1}
+        # objects reference the inline types they are using, so these have to be shared as well
+        pending = list(shared)
+        while pending:
+            fingerprint = pending.pop()
+            if fingerprint[0] != 'struct':
+                continue
+            for (_name, _required, _depth, item_fingerprint) in fingerprint[1]:
+                if isinstance(item_fingerprint, tuple) and item_fingerprint not in shared:
+                    shared.add(item_fingerprint)
+                    pending.append(item_fingerprint)
+
+        # the most used shapes get the plain names, the remaining ones a hash postfix
+        used_names = set()
+        for fingerprint in sorted(shared, key=lambda fp: (-len(occurrences[fp]), SharedInlineTypes.digest(fp))):
+            name = Counter(name for (_path, name) in occurrences[fingerprint]).most_common(1)[0][0]
+            if name in used_names:
+                name = f'{name}_{SharedInlineTypes.digest(fingerprint)}'
+            used_names.add(name)
+
+            (path, local_name) = occurrences[fingerprint][0]
+            self.shared[fingerprint] = {
+                'name': name,
+                'kind': fingerprint[0],
+                'occurrences': occurrences[fingerprint],
+                'source': (type_files[path], local_name)
+            }
+            for (path, local_name) in occurrences[fingerprint]:
+                self.aliases.setdefault(path, {})[local_name] = fingerprint
+
+    @staticmethod
+    def digest(fingerprint: Tuple) -> str:
+        return hashlib.sha1(repr(fingerprint).encode('utf-8')).hexdigest()[:8]
+
+    def shared_type(self, cpp_type: str, local_aliases: Dict[str, Tuple], qualified: bool) -> Optional[str]:
+        """Return the type of a property with its inline types replaced by the shared ones."""
+        (depth, item_type) = split_vector_type(cpp_type)
+        if item_type not in local_aliases:
+            return None
+
+        name = self.shared[local_aliases[item_type]]['name']
+        return join_vector_type(depth, f'types::{SHARED_NAMESPACE}::{name}' if qualified else name)
+
+    def generate_tmpl_data(self) -> Dict:
+        """Generate the template data of the shared header."""
+        enums = []
+        types = []
+        emitted = set()
+
+        def add_struct(fingerprint):
+            if fingerprint in emitted:
+                return
+            emitted.add(fingerprint)
+            shared_type = self.shared[fingerprint]
+            (inline_types, local_name) = shared_type['source']
+            local_aliases = {name: fingerprint for name, fingerprint in inline_types.all_fingerprints().items()
+                             if fingerprint in self.shared}
+
+            properties = []
+            depends_on = []
+            for prop in inline_types.structs[local_name]['properties']:
+                cpp_type = self.shared_type(prop['type'], local_aliases, False)
+                if cpp_type is None:
+                    cpp_type = prop['type']
+                else:
+                    item_fingerprint = local_aliases[split_vector_type(prop['type'])[1]]
+                    if item_fingerprint[0] == 'struct':
+                        # nested objects have to be defined first
+                        add_struct(item_fingerprint)
+                        depends_on.append(self.shared[item_fingerprint]['name'])
+                properties.append(prop.copy(type=cpp_type))
+
+            types.append(ParsedType(name=shared_type['name'], properties=properties, depends_on=depends_on))
+
+        for fingerprint, shared_type in sorted(self.shared.items(), key=lambda item: item[1]['name']):
+            if shared_type['kind'] == 'enum':
+                (inline_types, local_name) = shared_type['source']
+                enums.append(inline_types.enums[local_name].copy(name=shared_type['name'],
+                                                                 enum_type=shared_type['name']))
+            else:
+                add_struct(fingerprint)
+
+        return {
+            'info': {
+                'type': SHARED_NAMESPACE,
+                'desc': 'inline types shared by several type files',
+                'type_headers': [],
+                'interface_name': SHARED_NAMESPACE,
+                'namespace': ['types', SHARED_NAMESPACE],
+                'hpp_guard': 'TYPES_SHARED_INLINE_TYPES_HPP',
+                'types_header': SHARED_HEADER,
+            },
+            'enums': enums,
+            'types': types,
+        }
+
+    def generate_header(self, output_dir: Path, split_sources: bool) -> List[FileInfo]:
+        """Render the shared header (and its source file with split_sources)."""
+        tmpl_data = self.generate_tmpl_data()
+        tmpl_data['info']['split_sources'] = split_sources
+
+        header_file = output_dir / Path(SHARED_HEADER).name
+        files = [(header_file, 'types.hpp')]
+        if split_sources:
+            files.append((header_file.with_suffix('.cpp'), 'types.cpp'))
+
+        return [FileInfo(
+            path=path,
+            content_stream=TypeParser.templates[template].generate(tmpl_data),
+            last_mtime=self.last_mtime,
+            printable_name=path.name
+        ) for (path, template) in files]
+
+    def type_info(self, type_with_namespace: Dict, apply=True) -> Optional[Tuple[Dict, float]]:
+        """Return a copy of the template data of a collected type file, with its shared inline types applied."""
+        type_info = self.type_infos.get(type_with_namespace['relative_path'].as_posix())
+        if not type_info:
+            return None
+
+        (tmpl_data, last_mtime) = copy.deepcopy(type_info)
+        if apply:
+            self.apply(tmpl_data, type_with_namespace)
+
+        return (tmpl_data, last_mtime)
+
+    def apply(self, tmpl_data: Dict, type_with_namespace: Dict):
+        """Replace the shared inline types of a type file by aliases of the shared ones."""
+        local_aliases = self.aliases.get(type_with_namespace['relative_path'].as_posix())
+        if not local_aliases:
+            return
+
+        inline_type_aliases = []
+        for local_name, fingerprint in local_aliases.items():
+            inline_type_aliases.append({
+                'name': local_name,
+                'kind': fingerprint[0],
+                'namespace': f'types::{SHARED_NAMESPACE}',
+                'shared_name': self.shared[fingerprint]['name']
+            })
+
+        tmpl_data['enums'] = [enum for enum in tmpl_data['enums'] if enum['enum_type'] not in local_aliases]
+        tmpl_data['types'] = [parsed_type for parsed_type in tmpl_data['types']
+                              if parsed_type['name'] not in local_aliases]
+        # the types using shared inline types, which need the shared header
+        users = set(local_aliases)
+        for parsed_type in tmpl_data['types']:
+            for prop in parsed_type['properties']:
+                cpp_type = self.shared_type(prop['type'], local_aliases, True)
+                if cpp_type is not None:
+                    prop['type'] = cpp_type
+                    users.add(parsed_type['name'])
+            parsed_type['depends_on'] = [name for name in parsed_type['depends_on'] if name not in local_aliases]
+
+        tmpl_data['info']['type_headers'] = sorted({*tmpl_data['info']['type_headers'], SHARED_HEADER})
+        tmpl_data['info']['inline_type_aliases'] = sorted(inline_type_aliases, key=lambda alias: alias['name'])
+        for type_group in tmpl_data['type_groups']:
+            if any(name in users for name in type_group['struct_names'] + type_group['enum_names']):
+                type_group['type_headers'] = sorted({*type_group['type_headers'], SHARED_HEADER})
+
+    def summary(self) -> Dict:
+        """Count the shared inline types and the declarations they replace, from the collected fingerprints."""
+        replaced_declarations = sum(len(shared_type['occurrences']) for shared_type in self.shared.values())
+
+        return {
+            'shared_types': len(self.shared),
+            'type_files': len(self.aliases),
+            'replaced_declarations': replaced_declarations,
+            'saved_declarations': replaced_declarations - len(self.shared)
+        }
+
+    def report(self, types_with_namespace: List[Dict], output_dir: Path, split_sources: bool) -> Dict:
+        """Extend the summary by the generated bytes saved by the shared inline types.
+
+        The collected type files get rendered with and without the shared inline types for this, without
+        clang-format, so it's expensive and only done on request.
+        """
+        def generated_bytes(apply):
+            files = []
+            for type_with_namespace in types_with_namespace:
+                type_info = self.type_info(type_with_namespace, apply)
+                if type_info:
+                    files.extend(TypeParser.render_type_headers(type_with_namespace, *type_info, output_dir,
+                                                                split_sources))
+            if apply:
+                files.extend(self.generate_header(output_dir, split_sources))
+
+            return sum(len(''.join(file_info['content_stream']).encode('utf-8')) for file_info in files)
+
+        bytes_before = generated_bytes(False)
+        bytes_after = generated_bytes(True)
+
+        return {
+            **self.summary(),
+            'bytes_before': bytes_before,
+            'bytes_after': bytes_after,
+            'saved_bytes': bytes_before - bytes_after
+        }
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Provide the records of the generator internal data model.
+
+The records use __slots__, so they need less memory and have faster attribute access than dicts.  They still
+support the dict protocol (item access, "in", get, pop, keys, ...), so the templates and helpers can treat them
+like the dicts they replace.  An optional field is missing until it gets set, like a missing key of a dict.
+"""
+
+from typing import Iterator
+
+
+class Record:
+    """Base of all records, a dict like object with a fixed set of keys."""
+    __slots__ = ()
+    _fields = ()
+    _field_set = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = tuple(slot for klass in reversed(cls.__mro__) for slot in getattr(klass, '__slots__', ()))
+        cls._field_set = frozenset(cls._fields)
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value):
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(f'{type(self).__name__} has no field {key}') from None
+
+    def __delitem__(self, key: str):
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key) -> bool:
+        return key in self._field_set and hasattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __eq__(self, other) -> bool:
+        if type(self) is not type(other):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{key}={value!r}' for (key, value) in self.items())
+        return f'{type(self).__name__}({fields})'
+
+    def keys(self):
+        return [key for key in self._fields if hasattr(self, key)]
+
+    def values(self):
+        return [getattr(self, key) for key in self.keys()]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default) if key in self._field_set else default
+
+    def pop(self, key: str, *default):
+        if key in self:
+            value = getattr(self, key)
+            delattr(self, key)
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def update(self, *others, **fields):
+        for other in others:
+            for key in other.keys():
+                self[key] = other[key]
+        for key, value in fields.items():
+            self[key] = value
+
+    def copy(self, **changes):
+        """Return a shallow copy of the record, with the given fields changed."""
+        fields = dict(self.items())
+        fields.update(changes)
+        return type(self)(**fields)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __getstate__(self):
+        return dict(self.items())
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
+
+class TypeUrl(Record):
+    """A parsed global type URL in the format /filename#/typename."""
+    __slots__ = ('type_relative_path', 'namespaced_type', 'header_file', 'type_name')
+
+
+class TypeInfo(Record):
+    """Type of a var, cmd argument, cmd result or config entry.
+
+    enum_type, object_type, array_type and array_type_contains_enum are only set for enums, objects and arrays.
+    """
+    __slots__ = ('name', 'is_variant', 'cpp_type', 'json_type', 'enum_type', 'object_type', 'array_type',
+                 'array_type_contains_enum')
+
+
+class EnumInfo(Record):
+    """An enum, which gets generated."""
+    __slots__ = ('name', 'description', 'enum_type', 'enum')
+
+
+class ParsedEnum(Record):
+    """An inline enum, as collected while parsing the properties of an object."""
+    __slots__ = ('name', 'enums', 'description')
+
+
+class PropertyInfo(Record):
+    """The schema of a property and what is known about its type.
+
+    type_dict is only set for references to types, unsupported_format for strings of unsupported formats.
+    """
+    __slots__ = ('description', 'prop', 'enum', 'type_dict', 'unsupported_format')
+
+
+class Property(Record):
+    """A property of an object."""
+    __slots__ = ('name', 'json_name', 'type', 'info', 'enum', 'required')
+
+
+class ParsedType(Record):
+    """An object, which gets generated as struct, with the names of the structs it depends on."""
+    __slots__ = ('name', 'properties', 'depends_on')
+
+
+class Command(Record):
+    """A command of an interface, result is None for commands without result."""
+    __slots__ = ('name', 'args', 'result')
+
+
+class FileInfo(Record):
+    """A generated file.
+
+    Its content is either given by content, for rendering it lazily while writing by content_stream, or by
+    cached_path, the file in the output cache holding it.
+    """
+    __slots__ = ('path', 'content', 'content_stream', 'cached_path', 'last_mtime', 'printable_name', 'abbr',
+                 'filename', 'clang_format')
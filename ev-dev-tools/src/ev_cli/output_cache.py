@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Provide a content addressed cache of generated outputs, which can be shared by worktrees and CI jobs.
+
+An entry is addressed by the hash of everything its outputs depend on: the contents of the input files, the
+templates and sources of ev-cli, its version, the clang-format config and version and the generation options.
+On a hit, the cached outputs get copied into place, unless they are already up to date, instead of rendering and
+formatting them again.
+Entries are written to a temporary directory and renamed into place, so concurrent processes never see
+incomplete entries.  The least recently used entries get evicted, when the cache exceeds its size limit.
+"""
+
+from . import __version__
+from . import helpers
+from .model import FileInfo
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+import uuid
+
+
+CACHE_DIR_ENV = 'EV_CLI_CACHE_DIR'
+CACHE_MAX_SIZE_ENV = 'EV_CLI_CACHE_MAX_SIZE'
+DEFAULT_MAX_SIZE = '1G'
+
+# matches the type files referenced by $ref in yaml (block or flow style) and json
+REF_REGEX = re.compile(r'''["']?\$ref["']?\s*:\s*["']?/([^#"'\s]+)#''')
+
+# temporary directories older than this (in seconds) are left over by interrupted runs
+STALE_TMP_AGE = 3600
+
+SIZE_SUFFIXES = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def parse_size(size: str) -> int:
+    """Parse a size in bytes with an optional K, M or G suffix, like 512M."""
+    match = re.fullmatch(r'\s*(\d+)\s*([KMG]?)i?B?\s*', size, re.IGNORECASE)
+    if not match:
+        raise ValueError(f'Invalid size "{size}", expected a number of bytes with optional K, M or G suffix')
+
+    return int(match.group(1)) * SIZE_SUFFIXES[match.group(2).upper()]
+
+
+def format_size(size: int) -> str:
+    for suffix in ('G', 'M', 'K'):
+        if size >= SIZE_SUFFIXES[suffix]:
+            return f'{size / SIZE_SUFFIXES[suffix]:.1f} {suffix}iB'
+
+    return f'{size} B'
+
+
+def _hash_files(hasher, paths: Iterable[Path], root: Path):
+    for path in sorted(paths):
+        hasher.update(path.relative_to(root).as_posix().encode())
+        hasher.update(b'\0')
+        hasher.update(path.read_bytes())
+        hasher.update(b'\0')
+
+
+def _clang_format_version() -> str:
+    clang_format_path = shutil.which('clang-format')
+    if clang_format_path is None:
+        # the generation fails without clang-format anyway
+        return 'clang-format not found'
+
+    return subprocess.run([clang_format_path, '--version'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          encoding='utf-8', check=False).stdout
+
+
+class OutputCache:
+    """Directory backed cache of generated outputs."""
+
+    def __init__(self, cache_dir: Path, max_size: int, clang_format_dir: Optional[Path]):
+        self.cache_dir = cache_dir
+        self.entries_dir = cache_dir / 'entries'
+        self.stats_file = cache_dir / 'stats'
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.file_hashes = {}
+        self.ref_closures = {}
+
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+
+        generator = hashlib.sha256(f'ev-cli {__version__}\0'.encode())
+        package_dir = Path(__file__).parent
+        _hash_files(generator, [*package_dir.glob('*.py'), *(package_dir / 'templates').glob('*.j2')], package_dir)
+        if clang_format_dir:
+            _hash_files(generator, [clang_format_dir / '.clang-format'], clang_format_dir)
+            # different versions of clang-format format the same code differently
+            generator.update(_clang_format_version().encode())
+        else:
+            generator.update(b'clang-format disabled')
+        self.generator_hash = generator.hexdigest()
+
+    @classmethod
+    def from_args(cls, args) -> Optional['OutputCache']:
+        """Return the cache configured by the command line or the environment, if any."""
+        cache_dir = getattr(args, 'cache_dir', None) or os.environ.get(CACHE_DIR_ENV)
+        if not cache_dir:
+            return None
+
+        max_size = parse_size(getattr(args, 'cache_max_size', None) or os.environ.get(CACHE_MAX_SIZE_ENV) or
+                              DEFAULT_MAX_SIZE)
+        clang_format_dir = None
+        if not getattr(args, 'disable_clang_format', True):
+            clang_format_dir = Path(args.clang_format_file).resolve()
+
+        return cls(Path(cache_dir).resolve(), max_size, clang_format_dir)
+
+    def file_hash(self, path: Path) -> str:
+        if path not in self.file_hashes:
+            self.file_hashes[path] = hashlib.sha256(path.read_bytes()).hexdigest()
+
+        return self.file_hashes[path]
+
+    def type_closure(self, paths: Iterable[Path]) -> List[Path]:
+        """Return the given files together with all type files they reference, directly or indirectly."""
+        closure = set()
+        pending = list(paths)
+        while pending:
+            path = pending.pop()
+            if path in closure:
+                continue
+            closure.add(path)
+
+            if path not in self.ref_closures:
+                referenced = set()
+                for type_relative_path in REF_REGEX.findall(path.read_text(encoding='utf-8')):
+                    try:
+                        referenced.add(helpers.resolve_everest_dir_path(f'types/{type_relative_path}.yaml'))
+                    except helpers.EVerestParsingException:
+                        # the generation reports the missing file
+                        pass
+                self.ref_closures[path] = referenced
+            pending.extend(self.ref_closures[path])
+
+        return sorted(closure)
+
+    def key(self, kind: str, name: str, inputs: Iterable[Path], options: Dict) -> str:
+        """Return the key of the outputs of the given kind and name, generated from inputs with options."""
+        hasher = hashlib.sha256(f'{self.generator_hash}\0{kind}\0{name}\0'.encode())
+        hasher.update(json.dumps(options, sort_keys=True).encode())
+        for path in sorted(set(inputs)):
+            # the contents count, not where the tree is checked out
+            input_name = path.name
+            for everest_dir in helpers.everest_dirs:
+                if everest_dir in path.parents:
+                    input_name = path.relative_to(everest_dir).as_posix()
+                    break
+            hasher.update(f'\0{input_name}\0{self.file_hash(path)}'.encode())
+
+        return hasher.hexdigest()
+
+    def lookup(self, key: str, output_dir: Path, last_mtime: float) -> Optional[List[FileInfo]]:
+        """Return the cached outputs of the key, placed into output_dir, or None if they are not cached."""
+        entry_dir = self.entries_dir / key
+        manifest_file = entry_dir / 'manifest.json'
+        try:
+            manifest = json.loads(manifest_file.read_text())
+            # the modification time of the manifest is the time of the last use
+            os.utime(manifest_file)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return [FileInfo(
+            path=output_dir / output['name'],
+            cached_path=entry_dir / 'files' / output['name'],
+            last_mtime=last_mtime,
+            printable_name=output['printable_name']
+        ) for output in manifest['outputs']]
+
+    def store(self, key: str, output_dir: Path, file_infos: List[FileInfo]):
+        """Store the outputs of the key, their streamed content gets rendered and formatted for that."""
+        tmp_dir = self.entries_dir / f'.tmp-{uuid.uuid4().hex}'
+        try:
+            outputs = []
+            size = 0
+            for file_info in file_infos:
+                helpers.materialize_content(file_info)
+                name = file_info['path'].relative_to(output_dir).as_posix()
+                content = file_info['content']
+                cached_file = tmp_dir / 'files' / name
+                cached_file.parent.mkdir(parents=True, exist_ok=True)
+                if isinstance(content, bytes):
+                    cached_file.write_bytes(content)
+                else:
+                    cached_file.write_text(content, encoding='utf-8')
+                # guard the cached files against being modified in place
+                cached_file.chmod(0o444)
+                size += cached_file.stat().st_size
+                outputs.append({'name': name, 'printable_name': str(file_info['printable_name'])})
+
+            (tmp_dir / 'manifest.json').write_text(json.dumps({'outputs': outputs, 'size': size}))
+            try:
+                tmp_dir.rename(self.entries_dir / key)
+                self.stored += 1
+            except OSError:
+                # another process stored the same entry meanwhile
+                pass
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def get_or_generate(self, key: str, output_dir: Path, last_mtime: float,
+                        generate: Callable[[], List[FileInfo]]) -> List[FileInfo]:
+        """Return the cached outputs of the key, or generate and store them."""
+        file_infos = self.lookup(key, output_dir, last_mtime)
+        if file_infos is None:
+            file_infos = generate()
+            self.store(key, output_dir, file_infos)
+
+        return file_infos
+
+    def entries(self) -> List[Dict]:
+        """Return the complete entries with their size and time of last use, least recently used first."""
+        entries = []
+        for entry_dir in self.entries_dir.iterdir():
+            if entry_dir.name.startswith('.'):
+                continue
+            manifest_file = entry_dir / 'manifest.json'
+            try:
+                size = json.loads(manifest_file.read_text())['size']
+                last_used = manifest_file.stat().st_mtime
+            except (OSError, ValueError, KeyError):
+                continue
+            entries.append({'path': entry_dir, 'size': size, 'last_used': last_used})
+
+        return sorted(entries, key=lambda entry: entry['last_used'])
+
+    def remove_entry(self, entry_dir: Path):
+        # rename first, so the entry disappears at once for concurrent lookups
+        removed_dir = self.entries_dir / f'.tmp-{uuid.uuid4().hex}'
+        try:
+            entry_dir.rename(removed_dir)
+        except OSError:
+            return
+        shutil.rmtree(removed_dir, ignore_errors=True)
+
+    def evict(self) -> int:
+        """Remove the least recently used entries, until the cache fits into its size limit."""
+        # leftovers of interrupted runs
+        for tmp_dir in self.entries_dir.glob('.tmp-*'):
+            try:
+                if tmp_dir.stat().st_mtime < time.time() - STALE_TMP_AGE:
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+            except OSError:
+                pass
+
+        entries = self.entries()
+        total_size = sum(entry['size'] for entry in entries)
+        evicted = 0
+        for entry in entries:
+            if total_size <= self.max_size:
+                break
+            self.remove_entry(entry['path'])
+            total_size -= entry['size']
+            evicted += 1
+
+        return evicted
+
+    def close(self):
+        """Evict entries if necessary and record the lookups of this run."""
+        if not (self.hits or self.misses):
+            return
+
+        evicted = self.evict() if self.stored else 0
+        record = json.dumps({'time': time.time(), 'hits': self.hits, 'misses': self.misses, 'stored': self.stored,
+                             'evicted': evicted})
+        # a single small append is atomic, so concurrent runs don't need a lock
+        with open(self.stats_file, 'a', encoding='utf-8') as stats_file:
+            stats_file.write(record + '\n')
+
+    def stats(self) -> Dict:
+        """Return the number of entries, their size and the recorded lookups."""
+        stats = {'cache_dir': str(self.cache_dir), 'max_size': self.max_size, 'runs': 0, 'hits': 0, 'misses': 0,
+                 'stored': 0, 'evicted': 0}
+        entries = self.entries()
+        stats['entries'] = len(entries)
+        stats['size'] = sum(entry['size'] for entry in entries)
+
+        if self.stats_file.exists():
+            for line in self.stats_file.read_text(encoding='utf-8').splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                stats['runs'] += 1
+                for counter in ('hits', 'misses', 'stored', 'evicted'):
+                    stats[counter] += record.get(counter, 0)
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+
+        return stats
+
+    def clear(self):
+        """Remove all entries and the recorded lookups."""
+        for entry_dir in list(self.entries_dir.iterdir()):
+            self.remove_entry(entry_dir)
+        if self.stats_file.exists():
+            self.stats_file.unlink()
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Provide profiling of the code generation phases.
+"""
+
+from contextlib import contextmanager
+import functools
+from pathlib import Path
+from typing import Dict, List, Tuple
+import json
+import os
+import threading
+import time
+
+import jinja2 as j2
+
+
+class Profiler:
+    """Record the durations of generation phases per file.
+
+    Recording is disabled by default, in which case phase() and timed_stream() are no-ops.  Durations are
+    inclusive, so nested phases (e.g. rendering while streaming into clang-format) are contained in their
+    parents.
+    """
+    enabled = False
+    # (phase, file, start, duration, thread id)
+    events: List[Tuple[str, str, float, float, int]] = []
+    origin = time.perf_counter()
+
+    @classmethod
+    def enable(cls):
+        cls.enabled = True
+        cls.events.clear()
+        cls.origin = time.perf_counter()
+
+    @classmethod
+    def record(cls, phase: str, file, start: float, duration: float):
+        cls.events.append((phase, str(file) if file is not None else '', start, duration, threading.get_ident()))
+
+    @classmethod
+    @contextmanager
+    def phase(cls, phase: str, file=None):
+        """Record the duration of the enclosed block as phase for the given file."""
+        if not cls.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.record(phase, file, start, time.perf_counter() - start)
+
+    @classmethod
+    def profiled(cls, phase: str, file_of=None):
+        """Decorate a function to record its duration as phase.
+
+        file_of gets called with the arguments of the decorated function and returns the file to record.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:
+                    return func(*args, **kwargs)
+                with cls.phase(phase, file_of(*args, **kwargs) if file_of else None):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @classmethod
+    def timed_stream(cls, phase: str, chunks, file=None):
+        """Wrap a generator and record the time spent producing its items as a single event."""
+        if not cls.enabled:
+            yield from chunks
+            return
+
+        start = None
+        duration = 0.0
+        iterator = iter(chunks)
+        while True:
+            chunk_start = time.perf_counter()
+            if start is None:
+                start = chunk_start
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                duration += time.perf_counter() - chunk_start
+            yield chunk
+
+        cls.record(phase, file, start, duration)
+
+    @classmethod
+    def write_chrome_trace(cls, trace_path: Path):
+        """Write all recorded events in the Chrome trace event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        trace_events = [{
+            'name': phase,
+            'cat': 'ev-cli',
+            'ph': 'X',
+            'ts': (start - cls.origin) * 1e6,
+            'dur': duration * 1e6,
+            'pid': pid,
+            'tid': tid,
+            'args': {'file': file}
+        } for (phase, file, start, duration, tid) in cls.events]
+
+        trace_path.write_text(json.dumps({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}))
+
+    @classmethod
+    def summary(cls) -> Tuple[Dict, Dict]:
+        """Aggregate the recorded events by phase and by (phase, file) into [count, total duration]."""
+        by_phase = {}
+        by_file = {}
+        for (phase, file, _start, duration, _tid) in cls.events:
+            for key, aggregate in ((phase, by_phase), ((phase, file), by_file)):
+                entry = aggregate.setdefault(key, [0, 0.0])
+                entry[0] += 1
+                entry[1] += duration
+
+        return (by_phase, by_file)
+
+    @classmethod
+    def print_summary(cls, top: int):
+        """Print the total time per phase and the top most expensive phase/file combinations."""
+        (by_phase, by_file) = cls.summary()
+
+        print(f'\n{"phase (inclusive)":<24}{"count":>8}{"total [ms]":>14}{"mean [ms]":>12}')
+        for phase, (count, total) in sorted(by_phase.items(), key=lambda x: x[1][1], reverse=True):
+            print(f'{phase:<24}{count:>8}{total * 1e3:>14.2f}{total * 1e3 / count:>12.3f}')
+
+        print(f'\ntop {top} phase/file combinations')
+        print(f'{"phase":<24}{"total [ms]":>14}{"count":>8}  file')
+        ranked = sorted(by_file.items(), key=lambda x: x[1][1], reverse=True)[:top]
+        for (phase, file), (count, total) in ranked:
+            print(f'{phase:<24}{total * 1e3:>14.2f}{count:>8}  {file}')
+
+
+class ProfiledTemplate(j2.Template):
+    """Jinja template recording its render time with the Profiler."""
+
+    def render(self, *args, **kwargs):
+        with Profiler.phase('render', self.name):
+            return super().render(*args, **kwargs)
+
+    def generate(self, *args, **kwargs):
+        return Profiler.timed_stream('render', super().generate(*args, **kwargs), self.name)
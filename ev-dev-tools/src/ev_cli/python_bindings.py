@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Provide the template data of python bindings for the payloads of types and interfaces.
+
+Every type file becomes a module with an enum per enum and a struct per object, named like the generated c++
+types, plus the validators of all its types.  Every interface becomes a module with a struct holding the arguments
+of each command and the validators of the command results and vars.  The validators get composed from the
+schemas at generation time, so checking a payload needs neither a schema nor a json schema library at runtime.
+"""
+
+from . import helpers
+from .type_parsing import TypeParser
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+import keyword
+import re
+
+import stringcase
+
+
+# names used by the generated functions, which must not be used for fields
+RESERVED_NAMES = {'self', 'cls', 'data', 'path'}
+
+# how a value gets converted back into json: not at all, by to_dict or value, or by the generic to_json
+DUMP_PLAIN = 'plain'
+DUMP_STRUCT = 'struct'
+DUMP_ENUM = 'enum'
+DUMP_JSON = 'json'
+
+ANNOTATIONS = {'string': 'str', 'integer': 'int', 'number': 'float', 'boolean': 'bool', 'null': 'None'}
+
+
+def identifier(name: str) -> str:
+    """Return a python identifier for the given name of a property or enum value."""
+    name = re.sub(r'\W', '_', str(name))
+    if not name or name[0].isdigit():
+        name = f'v_{name}'
+    if keyword.iskeyword(name) or name in RESERVED_NAMES:
+        name = f'{name}_'
+
+    return name
+
+
+def docstring(text: str) -> str:
+    """Return the text escaped for a docstring."""
+    return text.strip().replace('\\', '\\\\').replace('"""', '\\"\\"\\"')
+
+
+def module_alias(relative_path: Path) -> str:
+    return '_types_' + '_'.join(identifier(part) for part in relative_path.parts)
+
+
+def call(factory: str, *args, **kwargs) -> str:
+    """Return the expression calling a validator factory of the runtime, leaving out unset keyword arguments."""
+    arguments = list(args) + [f'{key}={value!r}' for (key, value) in kwargs.items() if value is not None]
+    return f'_rt.{factory}({", ".join(arguments)})'
+
+
+class PythonModule:
+    """Collect the enums, structs and validators of a generated module."""
+
+    def __init__(self, package: str, relative_path: Path = None, type_file: bool = True):
+        self.package = package
+        self.relative_path = relative_path
+        self.type_file = type_file
+        self.imports = {}
+        self.enums = {}
+        self.structs = {}
+        self.validators = []
+        self.last_mtime = 0
+        self.type_defs = {}
+
+    def tmpl_data(self) -> Dict:
+        return {
+            'package': self.package,
+            'imports': sorted(self.imports.items()),
+            'enums': list(self.enums.values()),
+            'structs': list(self.structs.values()),
+            'validators': self.validators,
+        }
+
+    def add_validator(self, name: str, schema: Dict, class_name: str) -> Tuple[str, str, str]:
+        """Add a module level validator for the schema and return its name, annotation and dump."""
+        (expression, annotation, dump) = self.schema_validator(schema, class_name)
+        self.validators.append({'name': name, 'expression': expression})
+
+        return (name, annotation, dump)
+
+    def add_enum(self, name: str, schema: Dict) -> str:
+        if name in self.enums:
+            if self.enums[name]['values'] != schema['enum']:
+                raise helpers.EVerestParsingException(f'Conflicting definitions of the enum {name}')
+            return name
+
+        members = []
+        member_names = set()
+        for value in schema['enum']:
+            member_name = identifier(value)
+            while member_name in member_names:
+                member_name += '_'
+            member_names.add(member_name)
+            members.append({'name': member_name, 'value': value})
+
+        self.enums[name] = {
+            'name': name,
+            'description': docstring(schema.get('description', '')),
+            'values': schema['enum'],
+            'members': members,
+        }
+
+        return name
+
+    def add_struct(self, name: str, schema: Dict, required: List[str] = None) -> str:
+        if name in self.structs:
+            if self.structs[name]['schema'] != schema:
+                raise helpers.EVerestParsingException(f'Conflicting definitions of the object {name}')
+            return name
+
+        # reserve the name first, so recursive inline objects terminate
+        struct = {'name': name, 'description': docstring(schema.get('description', '')), 'schema': schema}
+        self.structs[name] = struct
+
+        required = schema.get('required', []) if required is None else required
+        fields = []
+        for (json_name, prop) in schema.get('properties', {}).items():
+            field_name = identifier(json_name)
+            (validator, annotation, dump) = self.add_validator(f'_validate_{name}_{field_name}', prop,
+                                                               stringcase.capitalcase(json_name))
+            fields.append({
+                'name': field_name,
+                'json_name': json_name,
+                'required': json_name in required,
+                'validator': validator,
+                'annotation': annotation,
+                'dump': dump,
+            })
+
+        struct['fields'] = fields
+        struct['slots'] = repr(tuple(field['name'] for field in fields))
+        struct['required'] = [field['json_name'] for field in fields if field['required']]
+        struct['closed'] = schema.get('additionalProperties') is False
+
+        return name
+
+    def load_type_schema(self, type_url: str) -> Tuple[Path, Dict]:
+        type_dict = TypeParser.parse_type_url(type_url=type_url)
+        type_path = helpers.resolve_everest_dir_path('types' / type_dict.type_relative_path.with_suffix('.yaml'))
+        if not type_path or not type_path.exists():
+            raise helpers.EVerestParsingException(f'$ref: {type_url} referenced type file "{type_path}" does '
+                                                  'not exist.')
+
+        if type_path not in self.type_defs:
+            (type_def, last_mtime) = TypeParser.load_type_definition(type_path)
+            self.type_defs[type_path] = type_def
+            self.last_mtime = max(self.last_mtime, last_mtime)
+
+        type_schemas = self.type_defs[type_path].get('types', {})
+        if type_dict.type_name not in type_schemas:
+            raise helpers.EVerestParsingException(f'$ref: {type_url} referenced type does not exist.')
+
+        return (type_dict, type_schemas[type_dict.type_name])
+
+    def ref_validator(self, type_url: str) -> Tuple[str, str, str]:
+        (type_dict, schema) = self.load_type_schema(type_url)
+
+        if type_dict.type_relative_path == self.relative_path:
+            prefix = ''
+        else:
+            alias = module_alias(type_dict.type_relative_path)
+            self.imports[alias] = '.'.join([self.package, 'types',
+                                            *(identifier(part) for part in type_dict.type_relative_path.parts)])
+            prefix = f'{alias}.'
+
+        class_name = stringcase.capitalcase(type_dict.type_name)
+        if schema['type'] == 'object' and 'properties' in schema:
+            return (call('struct_type', f'lambda: {prefix}{class_name}'), f'{prefix}{class_name}', DUMP_STRUCT)
+        if schema['type'] == 'string' and 'enum' in schema:
+            return (call('enum_type', f'lambda: {prefix}{class_name}'), f'{prefix}{class_name}', DUMP_ENUM)
+
+        # the module may still be importing, so its validator is looked up on first use
+        annotation = ANNOTATIONS.get(schema['type'], 'object')
+        return (call('deferred', f'lambda: {prefix}VALIDATORS[{type_dict.type_name!r}]'), annotation, DUMP_JSON)
+
+    def schema_validator(self, schema: Dict, class_name: str) -> Tuple[str, str, str]:
+        """Return the validator expression, the annotation and the dump of values of the schema.
+
+        Inline enums and objects of type files become enums and structs named class_name, like in c++.
+        """
+        if '$ref' in schema:
+            return self.ref_validator(schema['$ref'])
+
+        json_type = schema.get('type')
+        if isinstance(json_type, list):
+            options = [self.schema_validator({**schema, 'type': option}, class_name) for option in json_type]
+            return (call('any_of', *(option[0] for option in options)), 'object', DUMP_JSON)
+
+        if json_type == 'object':
+            if 'properties' not in schema:
+                return (call('free_object'), 'dict', DUMP_PLAIN)
+            if self.type_file:
+                name = self.add_struct(class_name, schema)
+                return (call('struct_type', f'lambda: {name}'), name, DUMP_STRUCT)
+            properties = ', '.join(f'{prop_name!r}: {self.schema_validator(prop, class_name)[0]}'
+                                   for (prop_name, prop) in schema['properties'].items())
+            return (call('inline_object', f'{{{properties}}}', tuple(schema.get('required', ()))), 'dict', DUMP_JSON)
+
+        if json_type == 'array':
+            items = schema.get('items')
+            (item_validator, item_annotation, item_dump) = \
+                self.schema_validator(items, class_name) if isinstance(items, dict) else (None, 'object', DUMP_PLAIN)
+            return (call('array', *filter(None, [item_validator]), min_items=schema.get('minItems'),
+                         max_items=schema.get('maxItems')),
+                    f'List[{item_annotation}]', DUMP_PLAIN if item_dump == DUMP_PLAIN else DUMP_JSON)
+
+        if json_type == 'string':
+            if 'enum' in schema:
+                if self.type_file:
+                    name = self.add_enum(class_name, schema)
+                    return (call('enum_type', f'lambda: {name}'), name, DUMP_ENUM)
+                return (call('string_enum', repr(list(schema['enum']))), 'str', DUMP_PLAIN)
+            return (call('string', min_length=schema.get('minLength'), max_length=schema.get('maxLength'),
+                         pattern=schema.get('pattern')), 'str', DUMP_PLAIN)
+
+        if json_type in ('integer', 'number'):
+            return (call(json_type, minimum=schema.get('minimum'), maximum=schema.get('maximum'),
+                         exclusive_minimum=schema.get('exclusiveMinimum'),
+                         exclusive_maximum=schema.get('exclusiveMaximum')), ANNOTATIONS[json_type], DUMP_PLAIN)
+
+        if json_type in ('boolean', 'null'):
+            return (call(json_type), ANNOTATIONS[json_type], DUMP_PLAIN)
+
+        return (call('any_value'), 'object', DUMP_PLAIN)
+
+
+def generate_tmpl_data_for_type(package: str, type_with_namespace, type_def) -> Dict:
+    """Generate the template data of the module of a type file."""
+    module = PythonModule(package, type_with_namespace['relative_path'], type_file=True)
+
+    type_validators = []
+    for (type_name, type_schema) in type_def.get('types', {}).items():
+        try:
+            (validator, _annotation, _dump) = module.add_validator(f'_validate_{identifier(type_name)}',
+                                                                   type_schema, stringcase.capitalcase(type_name))
+        except helpers.EVerestParsingException as e:
+            raise helpers.EVerestParsingException(f'Error parsing type {type_name}: {e}')
+        type_validators.append({'name': type_name, 'validator': validator})
+
+    tmpl_data = module.tmpl_data()
+    tmpl_data['info'] = {
+        'name': f'types {type_with_namespace["namespace"]}',
+        'desc': docstring(type_def.get('description', '')),
+        'last_mtime': module.last_mtime,
+    }
+    tmpl_data['type_validators'] = type_validators
+
+    return tmpl_data
+
+
+def generate_tmpl_data_for_if(package: str, interface: str, if_def) -> Dict:
+    """Generate the template data of the module of an interface."""
+    module = PythonModule(package, type_file=False)
+
+    cmds = []
+    for (cmd, cmd_info) in if_def.get('cmds', {}).items():
+        # all arguments of a command are required
+        arguments = cmd_info.get('arguments', {})
+        arguments_struct = module.add_struct(f'{stringcase.pascalcase(cmd)}Arguments', {
+            'description': cmd_info.get('description', ''),
+            'type': 'object',
+            'properties': arguments,
+        }, required=list(arguments))
+
+        result_validator = None
+        if 'result' in cmd_info:
+            (result_validator, _annotation, _dump) = module.add_validator(f'_validate_{identifier(cmd)}_result',
+                                                                          cmd_info['result'], 'Result')
+        cmds.append({'name': cmd, 'arguments': arguments_struct, 'result': result_validator})
+
+    var_validators = []
+    for (var, var_info) in if_def.get('vars', {}).items():
+        (validator, _annotation, _dump) = module.add_validator(f'_validate_var_{identifier(var)}', var_info,
+                                                               stringcase.capitalcase(var))
+        var_validators.append({'name': var, 'validator': validator})
+
+    tmpl_data = module.tmpl_data()
+    tmpl_data['info'] = {
+        'name': f'interface {interface}',
+        'desc': docstring(if_def.get('description', '')),
+        'last_mtime': module.last_mtime,
+    }
+    tmpl_data['cmds'] = cmds
+    tmpl_data['var_validators'] = var_validators
+
+    return tmpl_data
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Provide metrics of the generated code, for finding the outputs which are the most expensive to compile.
+
+The declarations are counted by matching the generated c++ code line by line, which is good enough for the
+code generated by the templates, but not a c++ parser.
+"""
+
+from typing import Dict, List
+import posixpath
+import re
+
+
+INCLUDE_REGEX = re.compile(r'^[ \t]*#[ \t]*include[ \t]*([<"])([^>"]+)[>"]', re.MULTILINE)
+STRUCT_REGEX = re.compile(r'^[ \t]*(?:struct|class)[ \t]+\w+(?:[ \t]+final)?\s*(?::[^;{]*)?\{', re.MULTILINE)
+ENUM_REGEX = re.compile(r'^[ \t]*enum[ \t]+(?:class[ \t]+)?\w+\s*(?::\s*[\w:]+\s*)?\{', re.MULTILINE)
+# a return type followed by a (qualified) name and a parameter list, ending a declaration or starting a definition
+FUNCTION_REGEX = re.compile(r'^[ \t]*(?!(?:return|else|throw|case|new|delete)\b)(?:[\w:~][\w:<>,&*~]*[ \t]+)+'
+                            r'(?:operator\W+|[\w:~]+)\([^;{}]*\)[ \t]*(?:const[ \t]*)?(?:override[ \t]*)?'
+                            r'(?:noexcept[ \t]*)?(?:\{|;|:)', re.MULTILINE)
+
+
+def analyze_output(name: str, kind: str, content: str) -> Dict:
+    """Count the size, declarations and includes of a generated file."""
+    return {
+        'name': name,
+        'kind': kind,
+        'bytes': len(content.encode('utf-8')),
+        'lines': content.count('\n'),
+        'structs': len(STRUCT_REGEX.findall(content)),
+        'enums': len(ENUM_REGEX.findall(content)),
+        'functions': len(FUNCTION_REGEX.findall(content)),
+        'includes': [posixpath.normpath(posixpath.join(posixpath.dirname(name), path)) if delimiter == '"' else path
+                     for (delimiter, path) in INCLUDE_REGEX.findall(content)]
+    }
+
+
+def _generated_includes(output: Dict, outputs: Dict[str, Dict], closures: Dict[str, set]) -> set:
+    """Return the names of all generated outputs, which get included by the output directly or indirectly."""
+    if output['name'] in closures:
+        return closures[output['name']]
+
+    # guard against include cycles, the include guards break them in the compiler as well
+    closures[output['name']] = set()
+    closure = set()
+    for include in output['includes']:
+        if include in outputs and include != output['name']:
+            closure.add(include)
+            closure |= _generated_includes(outputs[include], outputs, closures)
+    closures[output['name']] = closure
+
+    return closure
+
+
+def build_report(outputs: List[Dict], modules: List[Dict]) -> List[Dict]:
+    """Add the include fan-out, the including modules and the estimated compile cost to the analyzed outputs.
+
+    Every module is given by its name, the generated headers included by its sources and the number of its
+    translation units.  The compile cost of an output is estimated by the number of bytes the compiler has to
+    parse for it over all translation units of the tree - outputs not used by any module count once.  The
+    outputs are returned ranked by their compile cost.
+    """
+    outputs_by_name = {output['name']: output for output in outputs}
+    closures = {}
+
+    for output in outputs:
+        generated_includes = _generated_includes(output, outputs_by_name, closures)
+        output['include_count'] = len(output['includes'])
+        output['generated_include_count'] = len(generated_includes)
+        output['transitive_bytes'] = output['bytes'] + sum(outputs_by_name[include]['bytes']
+                                                           for include in generated_includes)
+        output['including_modules'] = 0
+        output['translation_units'] = 0
+
+    for module in modules:
+        used_outputs = set()
+        for root in module['headers']:
+            if root in outputs_by_name:
+                used_outputs.add(root)
+                used_outputs |= _generated_includes(outputs_by_name[root], outputs_by_name, closures)
+
+        for name in used_outputs:
+            outputs_by_name[name]['including_modules'] += 1
+            outputs_by_name[name]['translation_units'] += module['translation_units']
+
+    for output in outputs:
+        output['compile_cost'] = output['bytes'] * max(output['translation_units'], 1)
+
+    return sorted(outputs, key=lambda output: (-output['compile_cost'], output['name']))
+
+
+def format_report(ranked_outputs: List[Dict], top: int) -> str:
+    """Format the ranked outputs as table."""
+    columns = [('cost[kB]', lambda output: f'{output["compile_cost"] / 1000:.1f}'),
+               ('bytes', lambda output: str(output['bytes'])),
+               ('structs', lambda output: str(output['structs'])),
+               ('enums', lambda output: str(output['enums'])),
+               ('funcs', lambda output: str(output['functions'])),
+               ('incl', lambda output: str(output['include_count'])),
+               ('gen.incl', lambda output: str(output['generated_include_count'])),
+               ('modules', lambda output: str(output['including_modules'])),
+               ('TUs', lambda output: str(output['translation_units']))]
+
+    shown_outputs = ranked_outputs[:top] if top > 0 else ranked_outputs
+    rows = [[header for (header, _value) in columns] + ['output']]
+    for output in shown_outputs:
+        rows.append([value(output) for (_header, value) in columns] + [f'{output["name"]} ({output["kind"]})'])
+
+    widths = [max(len(row[idx]) for row in rows) for idx in range(len(columns))]
+    lines = ['  '.join([cell.rjust(width) for (cell, width) in zip(row, widths)] + [row[-1]]) for row in rows]
+
+    total_cost = sum(output['compile_cost'] for output in ranked_outputs)
+    total_bytes = sum(output['bytes'] for output in ranked_outputs)
+    lines.append(f'{len(ranked_outputs)} generated files with {total_bytes} bytes, '
+                 f'estimated compile cost {total_cost / 1000:.1f} kB')
+
+    return '\n'.join(lines)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Provide self contained json schema bundles of interfaces.
+
+The $refs into the types tree get resolved once at generation time: every referenced type is put into the
+definitions of the bundle, exactly once, and the $refs get rewritten to point there.  So a validator loading
+the bundle doesn't need to resolve anything outside of it.
+"""
+
+from . import helpers
+from .type_parsing import TypeParser
+
+from typing import Dict, Tuple
+import struct
+
+
+# keywords, whose values are annotations only and are not needed for validating
+ANNOTATION_KEYWORDS = ['description', 'title', '$comment', 'examples']
+
+# keywords, whose values are a schema, a list of schemas or a dict of schemas
+SCHEMA_KEYWORDS = ['items', 'additionalItems', 'contains', 'additionalProperties', 'propertyNames', 'not', 'if',
+                   'then', 'else']
+SCHEMA_LIST_KEYWORDS = ['items', 'allOf', 'anyOf', 'oneOf']
+SCHEMA_DICT_KEYWORDS = ['properties', 'patternProperties', 'definitions', 'dependencies']
+
+
+def definition_name(type_url: str) -> str:
+    """Return the name of the definition of a type in the bundle, like the namespace of its c++ type."""
+    type_dict = TypeParser.parse_type_url(type_url=type_url)
+    return '::'.join([*type_dict['type_relative_path'].parts, type_dict['type_name']])
+
+
+class SchemaBundler:
+    """Collect the schemas of an interface together with all types they reference."""
+
+    def __init__(self):
+        self.definitions = {}
+        self.last_mtime = 0
+
+    def resolve_type(self, type_url: str) -> str:
+        """Add the schema of the referenced type to the definitions and return the $ref pointing to it."""
+        name = definition_name(type_url)
+        if name not in self.definitions:
+            type_dict = TypeParser.parse_type_url(type_url=type_url)
+            type_path = helpers.resolve_everest_dir_path('types' / type_dict['type_relative_path'].with_suffix('.yaml'))
+            if not type_path or not type_path.exists():
+                raise helpers.EVerestParsingException(f'$ref: {type_url} referenced type file "{type_path}" does '
+                                                      'not exist.')
+
+            type_def, last_mtime = TypeParser.load_type_definition(type_path)
+            if type_dict['type_name'] not in type_def.get('types', {}):
+                raise helpers.EVerestParsingException(f'$ref: {type_url} referenced type does not exist.')
+            self.last_mtime = max(self.last_mtime, last_mtime)
+
+            # reserve the name first, so recursive types terminate
+            self.definitions[name] = None
+            self.definitions[name] = self.bundle_schema(type_def['types'][type_dict['type_name']])
+
+        return f'#/definitions/{name}'
+
+    def bundle_schema(self, schema):
+        """Return a copy of the schema without annotations and with the $refs into the types tree resolved."""
+        if not isinstance(schema, dict):
+            return schema
+
+        bundled = {}
+        for keyword, value in schema.items():
+            if keyword in ANNOTATION_KEYWORDS:
+                continue
+            if keyword == '$ref' and isinstance(value, str) and value.startswith('/'):
+                bundled[keyword] = self.resolve_type(value)
+            elif keyword in SCHEMA_LIST_KEYWORDS and isinstance(value, list):
+                bundled[keyword] = [self.bundle_schema(item) for item in value]
+            elif keyword in SCHEMA_KEYWORDS:
+                bundled[keyword] = self.bundle_schema(value)
+            elif keyword in SCHEMA_DICT_KEYWORDS and isinstance(value, dict):
+                bundled[keyword] = {name: self.bundle_schema(item) for name, item in value.items()}
+            else:
+                bundled[keyword] = value
+
+        return bundled
+
+
+def generate_schema_bundle(interface: str, if_def: Dict) -> Tuple[Dict, float]:
+    """Generate the schema bundle of an interface and return it together with the latest modification time of the
+    type files it uses."""
+    bundler = SchemaBundler()
+
+    bundle = {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'interface': interface,
+        'vars': {var: bundler.bundle_schema(var_info) for var, var_info in if_def.get('vars', {}).items()},
+        'cmds': {}
+    }
+    for cmd, cmd_info in if_def.get('cmds', {}).items():
+        bundle['cmds'][cmd] = {
+            'arguments': {arg: bundler.bundle_schema(arg_info)
+                          for arg, arg_info in cmd_info.get('arguments', {}).items()}
+        }
+        if 'result' in cmd_info:
+            bundle['cmds'][cmd]['result'] = bundler.bundle_schema(cmd_info['result'])
+
+    bundle['definitions'] = dict(sorted(bundler.definitions.items()))
+
+    return (bundle, bundler.last_mtime)
+
+
+def encode_cbor(value) -> bytes:
+    """Encode a json value as CBOR (RFC 8949), which e.g. nlohmann::json::from_cbor can read."""
+    chunks = []
+    _encode_cbor(value, chunks)
+    return b''.join(chunks)
+
+
+def _cbor_head(major_type: int, argument: int) -> bytes:
+    if argument < 24:
+        return bytes([(major_type << 5) | argument])
+    for (additional_info, size) in ((24, 'B'), (25, 'H'), (26, 'I'), (27, 'Q')):
+        if argument < 1 << (8 * struct.calcsize(size)):
+            return bytes([(major_type << 5) | additional_info]) + struct.pack(f'>{size}', argument)
+
+    raise ValueError(f'Value {argument} is too large for CBOR')
+
+
+def _encode_cbor(value, chunks):
+    # bool has to be checked before int, because it is a subclass of it
+    if value is None:
+        chunks.append(b'\xf6')
+    elif value is True:
+        chunks.append(b'\xf5')
+    elif value is False:
+        chunks.append(b'\xf4')
+    elif isinstance(value, int):
+        chunks.append(_cbor_head(0, value) if value >= 0 else _cbor_head(1, -1 - value))
+    elif isinstance(value, float):
+        chunks.append(b'\xfb' + struct.pack('>d', value))
+    elif isinstance(value, str):
+        encoded = value.encode('utf-8')
+        chunks.append(_cbor_head(3, len(encoded)))
+        chunks.append(encoded)
+    elif isinstance(value, (list, tuple)):
+        chunks.append(_cbor_head(4, len(value)))
+        for item in value:
+            _encode_cbor(item, chunks)
+    elif isinstance(value, dict):
+        chunks.append(_cbor_head(5, len(value)))
+        for key, item in value.items():
+            _encode_cbor(str(key), chunks)
+            _encode_cbor(item, chunks)
+    else:
+        raise TypeError(f'Can not encode value of type {type(value).__name__} as CBOR')
@@ -9,9 +9,12 @@ author: kai-uwe.hermann@pionix.de
 """
 
 from . import helpers
+from .model import EnumInfo, FileInfo, TypeUrl
+from .profiling import Profiler
 
 from pathlib import Path
 from typing import Dict, List, Tuple
+import json
 
 
 import stringcase
@@ -23,17 +26,18 @@ class TypeParser:
     templates = None
     all_types = {}
     validated_type_defs = {}
+    fine_grained_headers = False
 
     @classmethod
-    def parse_type_url(cls, type_url: str) -> Dict:
+    def parse_type_url(cls, type_url: str) -> TypeUrl:
         """Parse a global type URL in the following format /filename#/typename."""
 
-        type_dict = {
-            'type_relative_path': None,
-            'namespaced_type': None,
-            'header_file': None,
-            'type_name': None
-        }
+        type_dict = TypeUrl(
+            type_relative_path=None,
+            namespaced_type=None,
+            header_file=None,
+            type_name=None
+        )
         if not type_url.startswith('/'):
             raise Exception('type_url: ' + type_url + ' needs to start with a "/".')
         if '#/' not in type_url:
@@ -42,19 +46,33 @@ class TypeParser:
         type_relative_path = Path(type_relative_path[1:])
 
         namespaced_type = 'types::' + '::'.join(type_relative_path.parts) + f'::{prop_type}'
-        type_dict['type_relative_path'] = type_relative_path
-        type_dict['namespaced_type'] = namespaced_type
-        type_dict['type_name'] = prop_type
+        type_dict.type_relative_path = type_relative_path
+        type_dict.namespaced_type = namespaced_type
+        type_dict.type_name = prop_type
 
         return type_dict
 
     @classmethod
+    def type_header_path(cls, type_dict: TypeUrl) -> str:
+        """Return the header, which needs to be included for using the type of the parsed type URL.
+
+        With fine grained headers, every type of a type file has its own header.
+        """
+        if TypeParser.fine_grained_headers:
+            path = Path('generated/types') / type_dict.type_relative_path / f'{type_dict.type_name}.hpp'
+        else:
+            path = Path('generated/types') / type_dict.type_relative_path.with_suffix('.hpp')
+
+        return path.as_posix()
+
+    @classmethod
+    @Profiler.profiled('resolve_ref', lambda _cls, type_url, *_args, **_kwargs: type_url)
     def does_type_exist(cls, type_url: str, json_type: str):
         """Checks if the referenced type exists"""
         if type_url not in TypeParser.all_types:
             TypeParser.all_types[type_url] = TypeParser.parse_type_url(type_url=type_url)
         type_dict = TypeParser.all_types[type_url]
-        type_path = helpers.resolve_everest_dir_path('types' / type_dict['type_relative_path'].with_suffix('.yaml'))
+        type_path = helpers.resolve_everest_dir_path('types' / type_dict.type_relative_path.with_suffix('.yaml'))
         if not type_path or not type_path.exists():
             raise helpers.EVerestParsingException(
                 '$ref: ' + type_url + f' referenced type file "{type_path} does not exist.')
@@ -62,18 +80,86 @@ class TypeParser:
             TypeParser.validated_type_defs[type_path] = helpers.load_validated_type_def(
                 type_path, TypeParser.validators['type'])
 
-        if type_dict['type_name'] not in TypeParser.validated_type_defs[type_path]['types']:
+        if type_dict.type_name not in TypeParser.validated_type_defs[type_path]['types']:
             raise helpers.EVerestParsingException('$ref: ' + type_url + ' referenced type "' +
-                                                  type_dict['type_name'] + f'" does not exist in type file "{type_path}".')
+                                                  type_dict.type_name + f'" does not exist in type file "{type_path}".')
 
-        type_schema = TypeParser.validated_type_defs[type_path]['types'][type_dict['type_name']]
+        type_schema = TypeParser.validated_type_defs[type_path]['types'][type_dict.type_name]
 
         if json_type != type_schema['type']:
             raise helpers.EVerestParsingException('$ref: ' + type_url + ' referenced type "' +
-                                                  type_dict['type_name'] + f'" in type file "{type_path}"' +
+                                                  type_dict.type_name + f'" in type file "{type_path}"' +
                                                   f' should be of type "{json_type}" but is of type: "' +
                                                   type_schema['type'] + '".')
 
+    @classmethod
+    def resolve_type_schema(cls, type_url: str, json_type: str) -> Dict:
+        """Return the schema of the referenced type."""
+        TypeParser.does_type_exist(type_url=type_url, json_type=json_type)
+        type_dict = TypeParser.all_types[type_url]
+        type_path = helpers.resolve_everest_dir_path('types' / type_dict.type_relative_path.with_suffix('.yaml'))
+
+        return TypeParser.validated_type_defs[type_path]['types'][type_dict.type_name]
+
+    @classmethod
+    def generate_sample_json(cls, schema: Dict):
+        """Generate a json value for the given schema, which is unchanged by a roundtrip through the generated
+        conversion functions."""
+        if '$ref' in schema:
+            schema = TypeParser.resolve_type_schema(schema['$ref'], schema['type'])
+
+        json_type = schema['type'] if isinstance(schema['type'], str) else schema['type'][0]
+
+        if json_type == 'object':
+            return {prop_name: TypeParser.generate_sample_json(prop)
+                    for prop_name, prop in schema.get('properties', {}).items()}
+        elif json_type == 'array':
+            if 'items' not in schema:
+                return []
+            item_schema = schema['items']
+            if '$ref' in item_schema:
+                item_schema = TypeParser.resolve_type_schema(item_schema['$ref'], item_schema['type'])
+            if 'enum' in item_schema:
+                # arrays of enums are converted via the underlying integer of the enum, so every enumerator is
+                # sampled by its index
+                return list(range(len(item_schema['enum'])))
+            return [TypeParser.generate_sample_json(schema['items'])] * 2
+        elif json_type == 'string':
+            return schema['enum'][0] if 'enum' in schema else 'sample'
+
+        return {'number': 0.5, 'integer': 1, 'boolean': True, 'null': None}[json_type]
+
+    @classmethod
+    def generate_roundtrip_test(cls, types_with_namespace, test_file: Path):
+        """Generate a c++ test program, which roundtrips a sample of every type through its json conversion."""
+        types_headers = []
+        roundtrips = []
+        last_mtime = 0
+        for type_with_namespace in types_with_namespace:
+            type_def, type_mtime = TypeParser.load_type_definition(type_with_namespace['path'])
+            last_mtime = max(last_mtime, type_mtime)
+            types_headers.append((Path('generated/types') /
+                                  type_with_namespace['relative_path'].with_suffix('.hpp')).as_posix())
+
+            for type_name, type_schema in type_def.get('types', {}).items():
+                if type_schema['type'] != 'object' or not type_schema.get('properties'):
+                    continue
+                roundtrips.append({
+                    'cpp_type': '::'.join(['types', *type_with_namespace['relative_path'].parts,
+                                           stringcase.capitalcase(type_name)]),
+                    'sample': json.dumps(TypeParser.generate_sample_json(type_schema))
+                })
+
+        return FileInfo(
+            path=test_file,
+            content=TypeParser.templates['types_roundtrip_test.cpp'].render({
+                'types_headers': types_headers,
+                'roundtrips': roundtrips
+            }),
+            last_mtime=last_mtime,
+            printable_name=test_file.name
+        )
+
     @classmethod
     def generate_tmpl_data_for_type(cls, type_with_namespace, type_def):
         """Generate template data based on the provided type and type definition."""
@@ -82,10 +168,17 @@ class TypeParser:
         helpers.type_headers.clear()
         types = []
         enums = []
+        # the enums, structs and headers needed by each type, for generating fine grained headers
+        type_groups = []
 
         for type_name, type_properties in type_def.get('types', {}).items():
             type_url = f'/{type_with_namespace["relative_path"]}#/{type_name}'
             TypeParser.all_types[type_url] = TypeParser.parse_type_url(type_url=type_url)
+
+            known_types = {id(parsed_type) for parsed_type in helpers.parsed_types}
+            known_enums = len(helpers.parsed_enums)
+            previous_type_headers = set(helpers.type_headers)
+            helpers.type_headers.clear()
             try:
                 (_type_info, enum_info) = helpers.extended_build_type_info(type_name, type_properties, type_file=True)
                 if enum_info:
@@ -93,17 +186,28 @@ class TypeParser:
             except helpers.EVerestParsingException as e:
                 raise helpers.EVerestParsingException(f'Error parsing type {type_name}: {e}')
 
+            type_groups.append({
+                'name': type_name,
+                'struct_names': [stringcase.capitalcase(parsed_type.name) for parsed_type in helpers.parsed_types
+                                 if id(parsed_type) not in known_types],
+                'enum_names': [stringcase.capitalcase(parsed_enum.name)
+                               for parsed_enum in helpers.parsed_enums[known_enums:]] +
+                              ([enum_info.enum_type] if enum_info else []),
+                'type_headers': sorted(helpers.type_headers)
+            })
+            helpers.type_headers.update(previous_type_headers)
+
         for parsed_enum in helpers.parsed_enums:
-            enum_info = {
-                'name': parsed_enum['name'],
-                'description': parsed_enum['description'],
-                'enum_type': stringcase.capitalcase(parsed_enum['name']),
-                'enum': parsed_enum['enums']
-            }
+            enum_info = EnumInfo(
+                name=parsed_enum.name,
+                description=parsed_enum.description,
+                enum_type=stringcase.capitalcase(parsed_enum.name),
+                enum=parsed_enum.enums
+            )
             enums.append(enum_info)
 
         for parsed_type in helpers.parsed_types:
-            parsed_type['name'] = stringcase.capitalcase(parsed_type['name'])
+            parsed_type.name = stringcase.capitalcase(parsed_type.name)
             types.append(parsed_type)
 
         type_headers = sorted(helpers.type_headers)
@@ -112,11 +216,11 @@ class TypeParser:
         sorted_types: List = []
         for struct_type in types:
             insert_at: int = 0
-            for dep_struct_type in struct_type['depends_on']:
+            for dep_struct_type in struct_type.depends_on:
 
                 for i, _entry in enumerate(sorted_types):
                     # the new one depends on the current
-                    if sorted_types[i]['name'] == dep_struct_type:
+                    if sorted_types[i].name == dep_struct_type:
                         insert_at = max(insert_at, i + 1)
                         break
 
@@ -130,10 +234,51 @@ class TypeParser:
             },
             'enums': enums,
             'types': sorted_types,
+            'type_groups': type_groups,
         }
 
         return tmpl_data
 
+    @classmethod
+    def split_tmpl_data_by_type(cls, tmpl_data, type_with_namespace) -> List[Tuple[str, Dict]]:
+        """Split the template data of a type file into the template data of each of its types.
+
+        Each type gets its inline enums and structs.  Inline structs are shared between types of the same name,
+        so a type includes the header of the type owning such a struct.
+        """
+        struct_owners = {}
+        for type_group in tmpl_data['type_groups']:
+            for struct_name in type_group['struct_names']:
+                struct_owners[struct_name] = type_group['name']
+
+        type_tmpl_data = []
+        for type_group in tmpl_data['type_groups']:
+            types = [parsed_type for parsed_type in tmpl_data['types']
+                     if parsed_type['name'] in type_group['struct_names']]
+            type_headers = set(type_group['type_headers'])
+            for parsed_type in types:
+                for dep_struct_type in parsed_type['depends_on']:
+                    owner = struct_owners.get(dep_struct_type, type_group['name'])
+                    if owner != type_group['name']:
+                        type_headers.add(TypeParser.type_header_path(TypeUrl(
+                            type_relative_path=type_with_namespace['relative_path'],
+                            type_name=owner
+                        )))
+
+            info = {**tmpl_data['info'], 'type_headers': sorted(type_headers)}
+            if 'inline_type_aliases' in info:
+                type_names = type_group['struct_names'] + type_group['enum_names']
+                info['inline_type_aliases'] = [alias for alias in info['inline_type_aliases']
+                                               if alias['name'] in type_names]
+
+            type_tmpl_data.append((type_group['name'], {
+                'info': info,
+                'enums': [enum for enum in tmpl_data['enums'] if enum['enum_type'] in type_group['enum_names']],
+                'types': types,
+            }))
+
+        return type_tmpl_data
+
     @classmethod
     def load_type_definition(cls, type_path: Path):
         """Load a type definition from the provided path and check its last modification time."""
@@ -160,12 +305,26 @@ class TypeParser:
         return (tmpl_data, last_mtime)
 
     @classmethod
-    def generate_type_headers(cls, type_with_namespace, all_types, output_dir):
-        """Render template data to generate type headers."""
-        tmpl_data, last_mtime = TypeParser.generate_type_info(type_with_namespace, all_types)
-
-        types_parts = {'types': None}
+    def generate_type_headers(cls, type_with_namespace, all_types, output_dir, split_sources=False,
+                              shared_inline_types=None) -> List[Dict]:
+        """Render template data to generate type headers.
+
+        With split_sources, the header only declares the conversion functions and their definitions get
+        generated into a separate source file.  With fine grained headers, every type gets its own header
+        (and source file), the header of the type file includes all of them and a header with forward
+        declarations of its types is generated.  With shared_inline_types, inline types shared with other
+        type files are replaced by aliases.
+        """
+        type_info = shared_inline_types.type_info(type_with_namespace) if shared_inline_types else None
+        if not type_info:
+            type_info = TypeParser.generate_type_info(type_with_namespace, all_types)
+
+        return TypeParser.render_type_headers(type_with_namespace, *type_info, output_dir, split_sources)
 
+    @classmethod
+    def render_type_headers(cls, type_with_namespace, tmpl_data, last_mtime, output_dir,
+                            split_sources=False) -> List[Dict]:
+        """Render the type headers of the given template data, see generate_type_headers."""
         output_path = output_dir / type_with_namespace['relative_path']
         types_file = output_path.with_suffix('.hpp')
         output_path = output_path.parent
@@ -174,16 +333,47 @@ class TypeParser:
         namespaces = ['types']
         namespaces.extend(type_with_namespace["relative_path"].parts)
 
+        hpp_guard_prefix = 'TYPES_' + helpers.snake_case(''.join(type_with_namespace["uppercase_path"])).upper()
         tmpl_data['info']['interface_name'] = f'{type_with_namespace["namespace"]}'
         tmpl_data['info']['namespace'] = namespaces
-        tmpl_data['info']['hpp_guard'] = 'TYPES_' + helpers.snake_case(
-            ''.join(type_with_namespace["uppercase_path"])).upper() + '_TYPES_HPP'
-
-        types_parts['types'] = {
-            'path': types_file,
-            'content': TypeParser.templates['types.hpp'].render(tmpl_data),
-            'last_mtime': last_mtime,
-            'printable_name': types_file.relative_to(output_path.parent)
-        }
+        tmpl_data['info']['hpp_guard'] = hpp_guard_prefix + '_TYPES_HPP'
+        tmpl_data['info']['split_sources'] = split_sources
+        tmpl_data['info']['types_header'] = (
+            Path('generated/types') / type_with_namespace['relative_path'].with_suffix('.hpp')).as_posix()
+
+        def file_info(path: Path, template: str, data: Dict) -> FileInfo:
+            return FileInfo(
+                path=path,
+                content_stream=TypeParser.templates[template].generate(data),
+                last_mtime=last_mtime,
+                printable_name=path.relative_to(output_path.parent)
+            )
+
+        if not TypeParser.fine_grained_headers:
+            types_parts = [file_info(types_file, 'types.hpp', tmpl_data)]
+            if split_sources:
+                types_parts.append(file_info(types_file.with_suffix('.cpp'), 'types.cpp', tmpl_data))
+
+            return types_parts
+
+        types_parts = []
+        type_headers = []
+        for (type_name, type_tmpl_data) in TypeParser.split_tmpl_data_by_type(tmpl_data, type_with_namespace):
+            type_header = TypeParser.type_header_path(TypeUrl(
+                type_relative_path=type_with_namespace['relative_path'],
+                type_name=type_name
+            ))
+            type_headers.append(type_header)
+            type_tmpl_data['info']['hpp_guard'] = f'{hpp_guard_prefix}_{helpers.snake_case(type_name).upper()}_TYPE_HPP'
+            type_tmpl_data['info']['types_header'] = type_header
+
+            type_file = output_dir / type_with_namespace['relative_path'] / f'{type_name}.hpp'
+            type_file.parent.mkdir(parents=True, exist_ok=True)
+            types_parts.append(file_info(type_file, 'types.hpp', type_tmpl_data))
+            if split_sources:
+                types_parts.append(file_info(type_file.with_suffix('.cpp'), 'types.cpp', type_tmpl_data))
+
+        tmpl_data['info']['type_headers'] = type_headers
+        types_parts.append(file_info(types_file, 'types_umbrella.hpp', tmpl_data))
 
         return types_parts
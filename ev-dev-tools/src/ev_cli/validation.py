@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2022 Pionix GmbH and Contributors to EVerest
+#
+"""
+Provide validation of all manifests, interfaces and types of an everest tree without generating any code.
+"""
+
+from . import helpers
+from .type_parsing import TypeParser
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import jsonschema
+import yaml
+
+
+def _error(path: Path, location: str, message: str) -> Dict:
+    return {'file': str(path), 'location': location, 'message': message}
+
+
+def _json_path(path) -> str:
+    return '/'.join(str(part) for part in path)
+
+
+def _find_refs(node, location: List):
+    """Yield (location, $ref, type) of all $ref entries in node."""
+    if isinstance(node, dict):
+        if '$ref' in node:
+            yield (_json_path(location), node['$ref'], node.get('type'))
+        for key, value in node.items():
+            yield from _find_refs(value, location + [key])
+    elif isinstance(node, list):
+        for idx, value in enumerate(node):
+            yield from _find_refs(value, location + [idx])
+
+
+def _check_subschemas(if_def: Dict, path: Path) -> List[Dict]:
+    """Check, that the var/cmd definitions of an interface are valid json schemas."""
+    subschemas = []
+    for var_name, var_def in if_def.get('vars', {}).items():
+        subschemas.append((f'vars/{var_name}', var_def))
+    for cmd_name, cmd_def in if_def.get('cmds', {}).items():
+        for arg_name, arg_def in cmd_def.get('arguments', {}).items():
+            subschemas.append((f'cmds/{cmd_name}/arguments/{arg_name}', arg_def))
+        if 'result' in cmd_def:
+            subschemas.append((f'cmds/{cmd_name}/result', cmd_def['result']))
+
+    errors = []
+    for location, subschema in subschemas:
+        try:
+            jsonschema.Draft7Validator.check_schema(subschema)
+        except jsonschema.SchemaError as err:
+            errors.append(_error(path, location, f'invalid json schema: {err.message}'))
+
+    return errors
+
+
+def _check_interfaces_exist(module_def: Dict, path: Path) -> List[Dict]:
+    errors = []
+    for section in ('provides', 'requires'):
+        for impl_id, impl_info in module_def.get(section, {}).items():
+            if not isinstance(impl_info, dict) or 'interface' not in impl_info:
+                continue
+            try:
+                helpers.resolve_everest_dir_path(f'interfaces/{impl_info["interface"]}.yaml')
+            except helpers.EVerestParsingException:
+                errors.append(_error(path, f'{section}/{impl_id}',
+                                     f'interface "{impl_info["interface"]}" does not exist'))
+
+    return errors
+
+
+def init_worker(everest_dirs: List[Path], schemas_dir: Path):
+    """Set up the global state of helpers and TypeParser, needed for validating in a worker process."""
+    helpers.everest_dirs = everest_dirs
+    TypeParser.validators = helpers.load_validators(schemas_dir)
+
+
+def validate_file(kind: str, path: Path) -> List[Dict]:
+    """Validate a single file of kind "type", "interface" or "module" and return all found errors."""
+    try:
+        definition = yaml.safe_load(path.read_text())
+    except OSError as err:
+        return [_error(path, '', f'could not open file: {err.strerror}')]
+    except yaml.YAMLError as err:
+        return [_error(path, '', f'could not parse file: {err}')]
+
+    errors = [_error(path, _json_path(err.absolute_path), err.message)
+              for err in TypeParser.validators[kind].iter_errors(definition)]
+
+    if not isinstance(definition, dict):
+        return errors
+
+    if kind == 'interface':
+        errors.extend(_check_subschemas(definition, path))
+    elif kind == 'module':
+        errors.extend(_check_interfaces_exist(definition, path))
+
+    for (location, ref, json_type) in _find_refs(definition, []):
+        try:
+            TypeParser.does_type_exist(type_url=ref, json_type=json_type)
+        except helpers.EVerestParsingException as err:
+            # EVerestParsingException derives from SystemExit, so it needs to be caught explicitly
+            errors.append(_error(path, location, str(err)))
+        except Exception as err:
+            errors.append(_error(path, location, f'$ref: {ref}: {err}'))
+
+    return errors
+
+
+def _validate_files(files: List[Tuple[str, Path]]) -> List[Dict]:
+    errors = []
+    for (kind, path) in files:
+        errors.extend(validate_file(kind, path))
+    return errors
+
+
+def validate_tree(files: List[Tuple[str, Path]], everest_dirs: List[Path], schemas_dir: Path,
+                  jobs: int) -> List[Dict]:
+    """Validate all given (kind, path) files using jobs worker processes and return all errors."""
+    if jobs <= 1 or len(files) <= 1:
+        init_worker(everest_dirs, schemas_dir)
+        return _validate_files(files)
+
+    # every worker keeps its own cache of validated type definitions, so hand out contiguous batches
+    batch_size = max(1, len(files) // (jobs * 4))
+    batches = [files[idx:idx + batch_size] for idx in range(0, len(files), batch_size)]
+
+    errors = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(everest_dirs, schemas_dir)) as executor:
+        for batch_errors in executor.map(_validate_files, batches):
+            errors.extend(batch_errors)
+
+    return errors
@@ -8,7 +8,12 @@ def pytest_addoption(parser):
                      help="everest-core path; default = '~/checkout/everest-workspace/everest-core'")
     parser.addoption("--libocpp", action="store", default="~/checkout/everest-workspace/libocpp",
                      help="libocpp path; default = '~/checkout/everest-workspace/libocpp'")
+    parser.addoption("--everest-core-pool", action="store_true", default=False,
+                     help="reuse running everest-core instances across tests with the same config")
 
 def pytest_configure(config):
+    if hasattr(config, "workerinput"):
+        # pytest-xdist workers: the controller process has installed the config already
+        return
     everest_prefix = config.getoption("--everest-prefix")
     shutil.copy("conf/ocpp16-config.json", f"{everest_prefix}/share/everest/modules/OCPP")
\ No newline at end of file
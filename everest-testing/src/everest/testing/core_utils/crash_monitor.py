@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2023 Pionix GmbH and Contributors to EVerest
+
+import asyncio
+import logging
+import signal
+import threading
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# the crashes of EverestCore instances, which haven't been stopped since
+_crashes: List["EverestCrashedError"] = []
+_crash_listeners: List[Callable[["EverestCrashedError"], None]] = []
+_lock = threading.Lock()
+
+
+def signal_name(signum: int) -> str:
+    """Returns the name of the signal, or its number for signals without a name, e.g. real-time signals
+    """
+    try:
+        return signal.Signals(signum).name
+    except ValueError:
+        return str(signum)
+
+
+class EverestCrashedError(Exception):
+    """Raised by the waits of the test harness, if EVerest exited while it should be running
+    """
+
+    def __init__(self, everest_uuid: str, returncode: int) -> None:
+        self.everest_uuid = everest_uuid
+        self.returncode = returncode
+        reason = f"signal {signal_name(-returncode)}" if returncode < 0 else f"code {returncode}"
+        super().__init__(f"EVerest {everest_uuid} exited with {reason}")
+
+
+def report_crash(error: EverestCrashedError):
+    """Fails all pending and future waits with the error, until it is cleared
+    """
+    logging.error(str(error))
+    with _lock:
+        _crashes.append(error)
+        listeners = list(_crash_listeners)
+
+    for listener in listeners:
+        listener(error)
+
+
+def clear_crash(error: EverestCrashedError):
+    """Clears a crash, e.g. once the crashed instance has been stopped
+    """
+    with _lock:
+        if error in _crashes:
+            _crashes.remove(error)
+
+
+def current_crash() -> Optional[EverestCrashedError]:
+    """Returns the first crash, which hasn't been cleared
+    """
+    with _lock:
+        return _crashes[0] if _crashes else None
+
+
+def raise_on_crash():
+    crash = current_crash()
+    if crash is not None:
+        raise crash
+
+
+def add_crash_listener(listener: Callable[[EverestCrashedError], None]):
+    """Calls the listener with the error of each crash, possibly from another thread
+    """
+    with _lock:
+        _crash_listeners.append(listener)
+
+
+def remove_crash_listener(listener: Callable[[EverestCrashedError], None]):
+    with _lock:
+        if listener in _crash_listeners:
+            _crash_listeners.remove(listener)
+
+
+async def wait_or_crash(awaitable: Awaitable[T]) -> T:
+    """Awaits the awaitable, but cancels it and raises EverestCrashedError as soon as EVerest crashes
+    """
+    loop = asyncio.get_running_loop()
+    crashed = loop.create_future()
+
+    def on_crash(error: EverestCrashedError):
+        try:
+            loop.call_soon_threadsafe(lambda: crashed.done() or crashed.set_result(error))
+        except RuntimeError:
+            # the loop has been closed
+            pass
+
+    task = asyncio.ensure_future(awaitable)
+    add_crash_listener(on_crash)
+    try:
+        # checked after adding the listener, so no crash gets lost in between
+        raise_on_crash()
+        await asyncio.wait({task, crashed}, return_when=asyncio.FIRST_COMPLETED)
+        if task.done():
+            return task.result()
+        raise crashed.result()
+    finally:
+        remove_crash_listener(on_crash)
+        if not task.done():
+            task.cancel()
+        if not crashed.done():
+            crashed.cancel()
@@ -1,22 +1,31 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2020 - 2023 Pionix GmbH and Contributors to EVerest
 
+import asyncio
+import hashlib
 import logging
 import os
-import signal
 from threading import Thread
 import threading
 import time
 import subprocess
 from pathlib import Path
 import tempfile
-from typing import List, TypedDict, Optional
+from typing import Any, Callable, Dict, List, Tuple, TypedDict, Optional
 import uuid
 import yaml
 import selectors
 from signal import SIGINT
 
+from everest.testing.core_utils.crash_monitor import EverestCrashedError, clear_crash, report_crash, signal_name
+from everest.testing.core_utils.everest_log import EverestLog
+from everest.testing.core_utils.worker_resources import get_worker_resources
+
 STARTUP_TIMEOUT = 30
+# bytes read from the output pipes of EVerest at once
+LOG_READ_SIZE = 65536
+# time in seconds the exit monitor gets to report a crash after the status fifo got closed
+EXIT_REPORT_TIMEOUT = 1
 
 
 class TestControlModuleConnection(TypedDict):
@@ -26,46 +35,202 @@ class TestControlModuleConnection(TypedDict):
 
 
 class StatusFifoListener:
+    """Reads the statuses EVerest writes line by line to the status fifo in a background thread and keeps their
+    history, so a wait also sees the statuses that arrived before it started
+    """
+
     def __init__(self, status_fifo_path: Path):
         if (not status_fifo_path.exists()):
             os.mkfifo(status_fifo_path)
 
         # note: open doesn't support non-blocking, so we use os.open to get the fd
-        fd = os.open(status_fifo_path, flags=(os.O_RDONLY | os.O_NONBLOCK))
-        self._file_obj = open(fd)
+        self._fd = os.open(status_fifo_path, flags=(os.O_RDONLY | os.O_NONBLOCK))
+        # written to by close() to wake up the reader
+        (self._wakeup_fd, self._wakeup_write_fd) = os.pipe()
 
         selector = selectors.DefaultSelector()
-        selector.register(self._file_obj, selectors.EVENT_READ)
+        selector.register(self._fd, selectors.EVENT_READ)
+        selector.register(self._wakeup_fd, selectors.EVENT_READ)
         self._selector = selector
 
-    def wait_for_status(self, timeout: float, match_status: list[str]) -> Optional[list[str]]:
-        if match_status is None:
-            match_status = []
+        # the received statuses with the time.monotonic() of their arrival
+        self._history: List[Tuple[float, str]] = []
+        # set, once the writer has closed the fifo
+        self._closed = False
+        # set by fail(), raised by all waits
+        self._error: Optional[Exception] = None
+        self._condition = threading.Condition()
+        self._async_waiters: List[tuple] = []
+
+        self._reader_thread = Thread(target=self._read, name=f"status-fifo-{status_fifo_path}", daemon=True)
+        self._reader_thread.start()
+
+    @property
+    def history(self) -> List[Tuple[float, str]]:
+        """Returns all statuses received so far with the time.monotonic() of their arrival, in order
+        """
+        with self._condition:
+            return list(self._history)
 
-        end_time = time.time() + timeout
+    @property
+    def closed(self) -> bool:
+        return self._closed
 
+    def _read(self):
+        partial_line = b''
         while True:
-            for _key, _mask in self._selector.select(timeout):
-                data = self._file_obj.read()
+            for key, _mask in self._selector.select():
+                if key.fd == self._wakeup_fd:
+                    return
+
+                try:
+                    data = os.read(self._fd, 4096)
+                except BlockingIOError:
+                    continue
+
                 if len(data) == 0:
-                    return None
+                    # the writer has closed the fifo, a status without a line break is complete as well
+                    self._add([partial_line], closed=True)
+                    return
+
+                # a read can end anywhere in a line, the rest of it comes with the next read
+                lines = (partial_line + data).split(b'\n')
+                partial_line = lines.pop()
+                self._add(lines)
+
+    def _add(self, lines: List[bytes], closed: bool = False):
+        statuses = [line.decode().strip() for line in lines if line.strip()]
+        with self._condition:
+            now = time.monotonic()
+            self._history.extend((now, status) for status in statuses)
+            self._closed = self._closed or closed
+            self._condition.notify_all()
+
+            self._notify_async_waiters()
+
+    def _notify_async_waiters(self):
+        """Resolves the futures of the async waits, which are done, must be called with the condition held
+        """
+        for waiter in list(self._async_waiters):
+            (loop, future, match_status, match_all, since) = waiter
+            (done, result) = self._check(match_status, match_all, since)
+            if done:
+                self._async_waiters.remove(waiter)
+                try:
+                    loop.call_soon_threadsafe(StatusFifoListener._resolve, future, result)
+                except RuntimeError:
+                    # the loop of the waiter has been closed
+                    pass
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result):
+        if future.done():
+            return
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+    def fail(self, error: Exception):
+        """Raises the error in all pending and future waits, which haven't been matched, e.g. when EVerest crashed
+        """
+        with self._condition:
+            self._error = error
+            self._condition.notify_all()
+            self._notify_async_waiters()
+
+    def _check(self, match_status: List[str], match_all: bool, since: Optional[float]) -> tuple:
+        """Returns if a wait is done and its result, which is the error passed to fail() for failed waits, must be
+        called with the condition held
+        """
+        received_status = [status for (timestamp, status) in self._history if since is None or timestamp >= since]
 
-                # plural!
-                received_status = data.splitlines()
+        if len(match_status) == 0:
+            # we're not trying to match any messages
+            matched_status = received_status
+            done = len(matched_status) > 0
+        else:
+            # return the filtered matched messages
+            matched_status = [status for status in match_status if status in received_status]
+            done = len(matched_status) == len(match_status) if match_all else len(matched_status) > 0
+
+        if done:
+            return (True, matched_status)
+        if self._error is not None:
+            return (True, self._error)
+        if self._closed:
+            return (True, None)
+        return (False, None)
+
+    def wait_for_status(self, timeout: float, match_status: List[str], match_all: bool = False,
+                        since: Optional[float] = None) -> Optional[List[str]]:
+        """Waits until any (or with match_all all) of match_status have been received, any status if match_status is
+        empty
+
+        Args:
+            timeout (float): time in seconds until the wait times out
+            match_status (List[str]): the statuses to wait for
+            match_all (bool): wait for all of match_status instead of any of them
+            since (float, optional): only consider statuses received at this time.monotonic() or later, all
+             statuses received so far if None
+
+        Returns:
+            the matched statuses, an empty list on timeout, None if the fifo was closed without a match
 
-                if len(match_status) == 0:
-                    # we're not trying to match any messages
-                    return received_status
+        Raises:
+            the error passed to fail(), if there was no match
+        """
+        if match_status is None:
+            match_status = []
+
+        with self._condition:
+            if self._condition.wait_for(lambda: self._check(match_status, match_all, since)[0], timeout):
+                (_done, result) = self._check(match_status, match_all, since)
+                if isinstance(result, Exception):
+                    raise result
+                return result
+
+            return []
+
+    async def wait_for_status_async(self, timeout: float, match_status: List[str], match_all: bool = False,
+                                    since: Optional[float] = None) -> Optional[List[str]]:
+        """Like wait_for_status(), but the event loop keeps running meanwhile
+        """
+        if match_status is None:
+            match_status = []
 
-                # return the filtered matched messages
-                matched_status = [status for status in match_status if status in received_status]
-                if len(matched_status) > 0:
-                    return matched_status
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._condition:
+            (done, result) = self._check(match_status, match_all, since)
+            if done:
+                if isinstance(result, Exception):
+                    raise result
+                return result
+            waiter = (loop, future, match_status, match_all, since)
+            self._async_waiters.append(waiter)
 
-            timeout = end_time - time.time()
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return []
+        finally:
+            with self._condition:
+                if waiter in self._async_waiters:
+                    self._async_waiters.remove(waiter)
+
+    def close(self):
+        """Stops the reader and closes the fifo, the history stays available
+        """
+        if self._reader_thread.is_alive():
+            os.write(self._wakeup_write_fd, b'\0')
+            self._reader_thread.join()
 
-            if timeout < 0:
-                return []
+        if self._fd is not None:
+            self._selector.close()
+            for fd in [self._fd, self._wakeup_fd, self._wakeup_write_fd]:
+                os.close(fd)
+            self._fd = None
 
 
 class EverestCore:
@@ -81,7 +246,10 @@ class EverestCore:
 
         self.process = None
         self.everest_uuid = uuid.uuid4().hex
-        self.temp_dir = Path(tempfile.mkdtemp(prefix=self.everest_uuid))
+        # the uuid makes the MQTT prefixes unique, claiming it ensures that across the workers of a test run
+        worker_resources = get_worker_resources()
+        worker_resources.claim("mqtt-prefix", self.everest_uuid)
+        self.temp_dir = Path(tempfile.mkdtemp(prefix=self.everest_uuid, dir=worker_resources.temp_root))
         self.temp_everest_config_file = tempfile.NamedTemporaryFile(
             delete=False, mode="w+", suffix=".yaml", dir=self.temp_dir)
         self.everest_core_user_config_path = Path(
@@ -117,17 +285,70 @@ class EverestCore:
         logging.info(f"temp everest config: {self.everest_config_path} based on {config_path}")
 
         self.test_control_modules = None
+        self.status_listener: Optional[StatusFifoListener] = None
 
+        # the output of EVerest, the last lines of which are attached to reports of failed tests
+        self.log = EverestLog(self.everest_uuid)
         self.log_reader_thread: Thread = None
+        self.log_reader_task: Optional[asyncio.Task] = None
+        # wait for the exit of EVerest and report a crash, if it wasn't stopped
+        self.exit_monitor_thread: Optional[Thread] = None
+        self.exit_monitor_task: Optional[asyncio.Task] = None
+        self.crash_error: Optional[EverestCrashedError] = None
+        # set by EverestCorePool while no test uses the instance, its exit then doesn't fail the waits of other tests
+        self.idle = False
+        self._stopping = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self.everest_running = False
         self.all_modules_started_event = threading.Event()
 
-    def start(self, standalone_module: Optional[str] = None, modules_to_test: List[TestControlModuleConnection] = None):
-        """Starts everest-core in a subprocess
+        # files, whose contents are part of the effective config besides the config and user-config
+        self.config_dependencies: List[Path] = []
+        # called once with this instance by the next reset(), e.g. to reset the state modules keep in files
+        self.reset_hooks: List[Callable[['EverestCore'], None]] = []
+        # files, which modules of a running instance keep using when the instance is reused, by the module
+        self.module_files: Dict[str, Any] = {}
+        self.running_config_hash: Optional[str] = None
+        self.reused = False
+
+    def is_running(self) -> bool:
+        """Returns True, if the manager process has been started and hasn't exited yet
+        """
+        if isinstance(self.process, subprocess.Popen):
+            self.process.poll()
+        return self.process is not None and self.process.returncode is None
+
+    def effective_config_hash(self, standalone_module: Optional[str] = None,
+                              modules_to_test: List[TestControlModuleConnection] = None) -> str:
+        """Returns a hash of everything EVerest gets started with: the config, the user-config, the config
+        dependencies and the start arguments
+        """
+        hasher = hashlib.sha256(repr((standalone_module, modules_to_test)).encode())
+        for path in [self.everest_config_path, *sorted(self.everest_core_user_config_path.iterdir()),
+                     *self.config_dependencies]:
+            hasher.update(f'\0{path}\0'.encode())
+            if Path(path).is_file():
+                hasher.update(Path(path).read_bytes())
+
+        return hasher.hexdigest()
+
+    def is_reusable(self, standalone_module: Optional[str] = None,
+                    modules_to_test: List[TestControlModuleConnection] = None) -> bool:
+        """Returns True, if start() with these arguments would keep the running instance, because its effective
+        config didn't change
+        """
+        if not self.is_running():
+            return False
 
-        Args:
-            standalone_module (str, optional): If set, a submodule can be started separately. EVerest will then wait for the submodule to be started.
-             Defaults to None.
+        self.test_control_modules = modules_to_test
+        self.create_testing_user_config()
+
+        return self.effective_config_hash(standalone_module, modules_to_test) == self.running_config_hash
+
+    def _prepare_start(self, standalone_module: Optional[str],
+                       modules_to_test: List[TestControlModuleConnection]) -> Optional[tuple]:
+        """Prepares starting everest-core, returns None if the running instance is kept, the effective config hash,
+        the arguments of the manager and the expected status otherwise
         """
 
         manager_path = self.prefix_path / 'bin/manager'
@@ -138,7 +359,20 @@ class EverestCore:
         self.test_control_modules = modules_to_test
         self.create_testing_user_config()
 
+        config_hash = self.effective_config_hash(standalone_module, modules_to_test)
+        if self.is_running():
+            if config_hash == self.running_config_hash:
+                logging.info('EVerest is already running with the same effective config, reusing it')
+                self.reused = True
+                return None
+            logging.info('EVerest is running with a different effective config, restarting it')
+            self.stop()
+        self.reused = False
+
         status_fifo_path = self.temp_dir / "status.fifo"
+        if self.status_listener:
+            # a second reader of the fifo would take statuses away from the new listener
+            self.status_listener.close()
         self.status_listener = StatusFifoListener(status_fifo_path)
         logging.info(status_fifo_path)
 
@@ -154,34 +388,140 @@ class EverestCore:
         logging.info('Starting EVerest...')
         logging.info('  '.join(args))
 
-        self.process = subprocess.Popen(
-            args, cwd=self.prefix_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-        self.log_reader_thread = Thread(target=self.read_everest_log)
-        self.log_reader_thread.start()
-
         expected_status = 'ALL_MODULES_STARTED' if standalone_module == None else 'WAITING_FOR_STANDALONE_MODULES'
 
-        status = self.status_listener.wait_for_status(STARTUP_TIMEOUT, [expected_status])
+        return (config_hash, args, expected_status)
+
+    def _started(self, status: Optional[List[str]], config_hash: str, expected_status: str):
+        if self.crash_error:
+            raise self.crash_error
         if status == None or len(status) == 0:
             raise TimeoutError("Timeout while waiting for EVerest to start")
 
         logging.info("EVerest has started")
+        self.running_config_hash = config_hash
         if expected_status == 'ALL_MODULES_STARTED':
             self.all_modules_started_event.set()
 
-    def read_everest_log(self):
-        while self.process.poll() == None:
-            stderr_raw = self.process.stderr.readline()
-            stderr_formatted = stderr_raw.strip().decode()
-            logging.debug(f'  {stderr_formatted}')
+    def start(self, standalone_module: Optional[str] = None, modules_to_test: List[TestControlModuleConnection] = None):
+        """Starts everest-core in a subprocess
+
+        Args:
+            standalone_module (str, optional): If set, a submodule can be started separately. EVerest will then wait
+             for the submodule to be started. Defaults to None.
+        """
+
+        prepared = self._prepare_start(standalone_module, modules_to_test)
+        if prepared is None:
+            return
+        (config_hash, args, expected_status) = prepared
+
+        self.process = subprocess.Popen(
+            args, cwd=self.prefix_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._stopping = False
+        self.crash_error = None
+
+        self.log_reader_thread = Thread(target=self.read_everest_log)
+        self.log_reader_thread.start()
+        self.exit_monitor_thread = Thread(target=self.monitor_exit, daemon=True)
+        self.exit_monitor_thread.start()
+
+        status = self.status_listener.wait_for_status(STARTUP_TIMEOUT, [expected_status])
+        if status is None:
+            # the fifo got closed, most likely because EVerest exited, which the monitor is about to report
+            self.exit_monitor_thread.join(EXIT_REPORT_TIMEOUT)
+        self._started(status, config_hash, expected_status)
+
+    async def start_async(self, standalone_module: Optional[str] = None,
+                          modules_to_test: List[TestControlModuleConnection] = None):
+        """Starts everest-core in a subprocess like start(), but without blocking the event loop, so e.g. a central
+        system keeps serving while EVerest starts up
+        """
+
+        if self.is_running() and not self.is_reusable(standalone_module, modules_to_test):
+            logging.info('EVerest is running with a different effective config, restarting it')
+            await self.stop_async()
+
+        prepared = self._prepare_start(standalone_module, modules_to_test)
+        if prepared is None:
+            return
+        (config_hash, args, expected_status) = prepared
 
-        if self.process.returncode == 0:
+        self._loop = asyncio.get_running_loop()
+        self.process = await asyncio.create_subprocess_exec(
+            *args, cwd=self.prefix_path, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        self._stopping = False
+        self.crash_error = None
+
+        self.log_reader_task = asyncio.create_task(self.read_everest_log_async())
+        self.exit_monitor_task = asyncio.create_task(self.monitor_exit_async())
+
+        status = await self.status_listener.wait_for_status_async(STARTUP_TIMEOUT, [expected_status])
+        if status is None:
+            # the fifo got closed, most likely because EVerest exited, which the monitor is about to report
+            await asyncio.wait({self.exit_monitor_task}, timeout=EXIT_REPORT_TIMEOUT)
+        self._started(status, config_hash, expected_status)
+
+    def monitor_exit(self):
+        self._exited(self.process.wait())
+
+    async def monitor_exit_async(self):
+        self._exited(await self.process.wait())
+
+    def _exited(self, returncode: int):
+        """Called once the process has exited, fails all waits of the harness, if it wasn't stopped by stop()
+        """
+        if returncode == 0:
             logging.info("EVerest stopped with return code 0")
-        elif self.process.returncode < 0:
-            logging.info(f"EVerest stopped by signal {signal.Signals(-self.process.returncode).name}")
+        elif returncode < 0:
+            logging.info(f"EVerest stopped by signal {signal_name(-returncode)}")
         else:
-            logging.warning(f"EVerest stopped with return code: {self.process.returncode}")
+            logging.warning(f"EVerest stopped with return code: {returncode}")
+
+        if self._stopping:
+            return
+
+        if self.idle:
+            logging.warning(f"Idle EVerest {self.everest_uuid} exited, it won't be reused")
+            return
+
+        self.crash_error = EverestCrashedError(self.everest_uuid, returncode)
+        if self.status_listener:
+            self.status_listener.fail(self.crash_error)
+        report_crash(self.crash_error)
+
+    def read_everest_log(self):
+        """Drains stdout and stderr of EVerest into its log until both are closed
+        """
+        selector = selectors.DefaultSelector()
+        for (stream_name, stream) in [('stdout', self.process.stdout), ('stderr', self.process.stderr)]:
+            selector.register(stream.fileno(), selectors.EVENT_READ, stream_name)
+
+        with selector:
+            while selector.get_map():
+                for key, _mask in selector.select():
+                    # reads whatever the pipe holds, without waiting for a complete line
+                    data = os.read(key.fd, LOG_READ_SIZE)
+                    if data:
+                        self.log.feed(key.data, data)
+                    else:
+                        self.log.close_stream(key.data)
+                        selector.unregister(key.fd)
+
+        logging.debug("EVerest output stopped")
+
+    async def read_everest_log_async(self):
+        """Drains stdout and stderr of EVerest into its log until both are closed
+        """
+        async def read_stream(stream_name: str, stream: asyncio.StreamReader):
+            while True:
+                data = await stream.read(LOG_READ_SIZE)
+                if not data:
+                    break
+                self.log.feed(stream_name, data)
+            self.log.close_stream(stream_name)
+
+        await asyncio.gather(read_stream('stdout', self.process.stdout), read_stream('stderr', self.process.stderr))
 
         logging.debug("EVerest output stopped")
 
@@ -189,13 +529,126 @@ class EverestCore:
         """Stops execution of EVerest by signaling SIGINT
         """
         logging.debug("CONTROLLER stop() function called...")
-        if self.process:
+        self._stopping = True
+        if isinstance(self.process, asyncio.subprocess.Process):
+            self._stop_async_process()
+        elif self.process:
             # NOTE (aw): we could also call process.kill()
             self.process.send_signal(SIGINT)
             self.process.wait()
 
         if self.log_reader_thread:
             self.log_reader_thread.join()
+        if self.exit_monitor_thread:
+            self.exit_monitor_thread.join()
+
+        self._stopped()
+
+    def _stopped(self):
+        if self.status_listener:
+            self.status_listener.close()
+
+        if self.crash_error:
+            # the crash has been dealt with
+            clear_crash(self.crash_error)
+
+        self.running_config_hash = None
+
+    def _stop_async_process(self):
+        """Stops a process started by start_async() from synchronous code, e.g. the teardown of a fixture or a
+        function running in an executor
+        """
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+
+        if self._loop.is_running() and not in_loop:
+            asyncio.run_coroutine_threadsafe(self.stop_async(), self._loop).result()
+        elif not self._loop.is_running() and not self._loop.is_closed():
+            self._loop.run_until_complete(self.stop_async())
+        elif self.process.returncode is None:
+            # the process is reaped by the event loop only, which can't be waited for here
+            self.process.send_signal(SIGINT)
+            logging.warning("EVerest was started by start_async(), but can't be awaited, use stop_async()")
+
+    async def stop_async(self):
+        """Stops execution of EVerest by signaling SIGINT, without blocking the event loop
+        """
+        logging.debug("CONTROLLER stop_async() function called...")
+        self._stopping = True
+        if isinstance(self.process, subprocess.Popen):
+            await asyncio.get_running_loop().run_in_executor(None, self.stop)
+            return
+
+        if self.process and self.process.returncode is None:
+            self.process.send_signal(SIGINT)
+            await self.process.wait()
+
+        if self.log_reader_task:
+            await self.log_reader_task
+        if self.exit_monitor_task:
+            await self.exit_monitor_task
+
+        self._stopped()
+
+    def reset(self):
+        """Resets the state a test may have left behind, so the running instance can be used by the next test:
+        runs the reset hooks, removes user-config files besides the testing user-config and clears the retained
+        MQTT messages below the external prefix
+        """
+        (reset_hooks, self.reset_hooks) = (self.reset_hooks, [])
+        for reset_hook in reset_hooks:
+            reset_hook(self)
+
+        testing_user_config = self.everest_core_user_config_path / self.everest_config_path.name
+        for path in self.everest_core_user_config_path.iterdir():
+            if path != testing_user_config and path.is_file():
+                logging.debug(f"Removing user-config {path}")
+                path.unlink()
+
+        self.reset_mqtt_state()
+
+    def reset_mqtt_state(self, collect_timeout: float = 0.5):
+        """Clears the retained MQTT messages below the external prefix of this instance, raises a RuntimeError if the
+        broker rejects the subscription
+        """
+        from paho.mqtt import client as mqtt_client
+
+        retained_topics = set()
+        subscribed = threading.Event()
+        granted = []
+
+        def on_subscribe(_client, _userdata, _mid, granted_qos):
+            granted.extend(granted_qos)
+            subscribed.set()
+
+        def on_message(_client, _userdata, message):
+            if message.retain and message.payload:
+                retained_topics.add(message.topic)
+
+        client = mqtt_client.Client(f"{self.everest_uuid}_reset")
+        client.on_subscribe = on_subscribe
+        client.on_message = on_message
+        client.connect(os.environ.get("MQTT_SERVER_ADDRESS", "127.0.0.1"),
+                       int(os.environ.get("MQTT_SERVER_PORT", "1883")))
+        client.loop_start()
+        try:
+            # the external topics follow the prefix without a separating level, so '#' can't directly follow it
+            client.subscribe([(f"{self.mqtt_external_prefix}everest_external/#", 0),
+                              (f"{self.mqtt_external_prefix}everest_api/#", 0)])
+            if not subscribed.wait(collect_timeout * 10) or 0x80 in granted:
+                raise RuntimeError(f"Subscribing to the external MQTT topics of EVerest {self.everest_uuid} failed")
+
+            # the broker sends the retained messages right after subscribing
+            time.sleep(collect_timeout)
+            for topic in list(retained_topics):
+                client.publish(topic, b'', retain=True)
+        finally:
+            client.loop_stop()
+            client.disconnect()
+
+        logging.debug(f"Cleared {len(retained_topics)} retained MQTT message(s)")
 
     def create_testing_user_config(self):
         """Creates a user-config file to include the PyTestControlModule in the current SIL simulation.
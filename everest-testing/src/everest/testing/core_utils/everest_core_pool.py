@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2023 Pionix GmbH and Contributors to EVerest
+
+import hashlib
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from everest.testing.core_utils.everest_core import EverestCore
+
+
+class EverestCorePool:
+    """Keeps running EverestCore instances between tests, so tests with the same config don't pay the startup of
+    EVerest each time.
+
+    An instance is handed out again only for the same base config and gets reset in between, EverestCore.start()
+    restarts it anyway, if the effective config (user-config, config dependencies, start arguments) changed.
+    """
+
+    def __init__(self, prefix_path: Path, max_idle: int = 1) -> None:
+        """
+        Args:
+            prefix_path (Path): location of installed everest distribution
+            max_idle (int): number of idle instances kept running, the least recently used ones get stopped
+        """
+        self.prefix_path = prefix_path
+        self.max_idle = max_idle
+        # instances by their id, together with the key of the config they were created with
+        self._idle: Dict[int, Tuple[str, EverestCore]] = OrderedDict()
+        self._in_use: Dict[int, Tuple[str, EverestCore]] = {}
+
+    @staticmethod
+    def config_key(config_path: Optional[Path]) -> str:
+        return hashlib.sha256(Path(config_path).read_bytes()).hexdigest() if config_path else ''
+
+    def acquire(self, config_path: Path = None) -> EverestCore:
+        """Returns a running instance started with the given config, if there is one, a new one otherwise
+        """
+        key = self.config_key(config_path)
+        for (core_id, (idle_key, everest_core)) in list(self._idle.items()):
+            if not everest_core.is_running():
+                # exited while idle, which only got logged
+                del self._idle[core_id]
+                everest_core.stop()
+                continue
+            if idle_key == key:
+                self._in_use[core_id] = self._idle.pop(core_id)
+                everest_core.idle = False
+                logging.info(f"Reusing running EVerest {everest_core.everest_uuid}")
+                return everest_core
+
+        everest_core = EverestCore(self.prefix_path, config_path)
+        self._in_use[id(everest_core)] = (key, everest_core)
+
+        return everest_core
+
+    def release(self, everest_core: EverestCore):
+        """Resets a running instance and keeps it for the next test, stops it if it isn't healthy
+        """
+        (key, _everest_core) = self._in_use.pop(id(everest_core))
+
+        if not everest_core.is_running():
+            everest_core.stop()
+            return
+
+        try:
+            everest_core.reset()
+        except Exception as e:
+            logging.warning(f"Resetting EVerest {everest_core.everest_uuid} failed, stopping it: {e}")
+            everest_core.stop()
+            return
+
+        # its exit from now on must not fail the waits of the tests using other instances
+        everest_core.idle = True
+        self._idle[id(everest_core)] = (key, everest_core)
+        while len(self._idle) > self.max_idle:
+            (_core_id, (_key, evicted_core)) = self._idle.popitem(last=False)
+            logging.info(f"Stopping idle EVerest {evicted_core.everest_uuid}")
+            evicted_core.stop()
+
+    def close(self):
+        """Stops all instances of the pool
+        """
+        for (_key, everest_core) in self._idle.values():
+            everest_core.stop()
+        self._idle.clear()
+
+        for (_key, everest_core) in self._in_use.values():
+            everest_core.stop()
+        self._in_use.clear()
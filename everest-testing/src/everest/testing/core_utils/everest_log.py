@@ -0,0 +1,158 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2023 Pionix GmbH and Contributors to EVerest
+
+import gzip
+import logging
+import re
+import threading
+import weakref
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_TAIL_LINES = 1000
+
+# the lines EVerest writes are logged with level DEBUG to this logger, silence it to save the formatting
+EVEREST_LOGGER = logging.getLogger("everest.manager")
+
+# the logs of all EverestCore instances alive and the test they currently write their log files for
+_everest_logs: "weakref.WeakSet[EverestLog]" = weakref.WeakSet()
+_current_test: Optional[Dict] = None
+_registry_lock = threading.Lock()
+
+
+class EverestLog:
+    """Collects the output of an EVerest manager process: keeps the last lines in a bounded ring buffer and writes
+    all lines to a gzip compressed log file per test, if the log plugin is active
+
+    The pipes of the process are drained by the readers of EverestCore as fast as the data arrives, so EVerest
+    never waits for a full pipe. Everything else, like the framing of the lines, happens in the reader.
+    """
+
+    def __init__(self, name: str, max_lines: int = DEFAULT_TAIL_LINES) -> None:
+        self.name = name
+        self._lines: deque = deque(maxlen=max_lines)
+        self._partial_lines: Dict[str, bytes] = {}
+        self._log_file = None
+        # returns the directory of the log file of the current test, None without
+        self._log_dir: Optional[Callable[[], Path]] = None
+        self._log_file_path: Optional[Path] = None
+        self._lock = threading.Lock()
+        # set, if lines were added since the current test started
+        self.active = False
+
+        with _registry_lock:
+            _everest_logs.add(self)
+            if _current_test is not None:
+                self.open_file(_current_test["log_dir"])
+
+    def feed(self, stream: str, data: bytes):
+        """Adds data read from the stream of the given name, a line split across reads is completed by later data
+        """
+        lines = (self._partial_lines.pop(stream, b'') + data).split(b'\n')
+        partial_line = lines.pop()
+        if partial_line:
+            self._partial_lines[stream] = partial_line
+        self._add(lines)
+
+    def close_stream(self, stream: str):
+        """Adds the rest of a stream, which has been closed
+        """
+        partial_line = self._partial_lines.pop(stream, b'')
+        if partial_line:
+            self._add([partial_line])
+
+    def _add(self, lines: List[bytes]):
+        if not lines:
+            return
+
+        with self._lock:
+            self._lines.extend(lines)
+            self.active = True
+            self._write(b'\n'.join(lines) + b'\n')
+
+        if EVEREST_LOGGER.isEnabledFor(logging.DEBUG):
+            for line in lines:
+                EVEREST_LOGGER.debug(f'  {line.decode(errors="replace").rstrip()}')
+
+    def tail(self, lines: Optional[int] = None) -> List[str]:
+        """Returns the last lines of the output, all lines in the ring buffer if lines is None
+        """
+        with self._lock:
+            buffered_lines = list(self._lines)
+
+        if lines is not None:
+            buffered_lines = buffered_lines[-lines:] if lines > 0 else []
+        return [line.decode(errors="replace").rstrip() for line in buffered_lines]
+
+    @property
+    def log_file_path(self) -> Optional[Path]:
+        return self._log_file_path
+
+    def open_file(self, log_dir: Callable[[], Path]):
+        """Writes the following lines to a new log file in the directory returned by log_dir, closes the current
+        one. The file gets created with the first line, so instances without output during a test don't leave empty
+        files and log_dir only gets called then
+        """
+        with self._lock:
+            (previous_log_file, self._log_file) = (self._log_file, None)
+            self._log_dir = log_dir
+            self._log_file_path = None
+            self.active = False
+        if previous_log_file:
+            previous_log_file.close()
+
+    def _write(self, data: bytes):
+        """Writes to the log file of the current test, must be called with the lock held
+        """
+        if self._log_file is None:
+            if self._log_dir is None:
+                return
+            log_dir = self._log_dir()
+            log_dir.mkdir(parents=True, exist_ok=True)
+            self._log_file_path = log_dir / f"everest-{self.name}.log.gz"
+            # the fastest level, most of the compression of the very repetitive logs comes with it anyway
+            self._log_file = gzip.open(self._log_file_path, "ab", compresslevel=1)
+
+        self._log_file.write(data)
+
+    def close_file(self):
+        with self._lock:
+            (log_file, self._log_file) = (self._log_file, None)
+            self._log_dir = None
+        if log_file:
+            log_file.close()
+
+
+def log_dir_of_test(base_dir: Path, nodeid: str) -> Path:
+    """Returns the directory for the log files of the test with the given node id
+    """
+    return Path(base_dir) / re.sub(r'[^\w.-]+', '_', nodeid).strip('_')
+
+
+def begin_test(log_dir: Callable[[], Path]):
+    """Directs the logs of all EverestCore instances, including the ones created later on, to files in the directory
+    returned by log_dir, which only gets called once an instance writes a log file
+    """
+    global _current_test
+    with _registry_lock:
+        _current_test = {"log_dir": log_dir}
+        for everest_log in list(_everest_logs):
+            everest_log.open_file(log_dir)
+
+
+def end_test():
+    """Closes the log files of the current test
+    """
+    global _current_test
+    with _registry_lock:
+        _current_test = None
+        for everest_log in list(_everest_logs):
+            everest_log.close_file()
+
+
+def active_logs() -> List[EverestLog]:
+    """Returns the logs, which got output since the current test started
+    """
+    with _registry_lock:
+        return [everest_log for everest_log in _everest_logs if everest_log.active]
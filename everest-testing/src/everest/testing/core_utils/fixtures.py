@@ -6,20 +6,51 @@ import pytest
 
 
 from everest.testing.core_utils.everest_core import EverestCore
+from everest.testing.core_utils.everest_core_pool import EverestCorePool
+from everest.testing.core_utils.worker_resources import WorkerResources, get_worker_resources
+
+
+@pytest.fixture(scope="session")
+def worker_resources() -> WorkerResources:
+    """Fixture providing the ports, temp root and log directories of this pytest-xdist worker"""
+
+    return get_worker_resources()
+
+
+@pytest.fixture(scope="session")
+def everest_core_pool(request) -> EverestCorePool:
+    """Fixture providing the pool of running everest-core instances shared by the tests of the session, None if
+    the pool isn't enabled with --everest-core-pool"""
+
+    if not request.config.getoption("--everest-core-pool", default=False):
+        yield None
+        return
+
+    everest_core_pool = EverestCorePool(Path(request.config.getoption("--everest-prefix")))
+    yield everest_core_pool
+
+    everest_core_pool.close()
 
 
 @pytest.fixture
-def everest_core(request) -> EverestCore:
+def everest_core(request, everest_core_pool: EverestCorePool) -> EverestCore:
     """Fixture that can be used to start and stop everest-core"""
 
     everest_prefix = Path(request.config.getoption("--everest-prefix"))
     marker = request.node.get_closest_marker("everest_core_config")
     if marker is None:
-        everest_core = EverestCore(everest_prefix)
+        config_path = None
     else:
         path = Path('/etc/everest') if everest_prefix == '/usr' else everest_prefix / 'etc/everest'
         config_path = path / marker.args[0]
-        everest_core = EverestCore(everest_prefix, config_path)
+
+    if everest_core_pool is not None:
+        everest_core = everest_core_pool.acquire(config_path)
+        yield everest_core
+        everest_core_pool.release(everest_core)
+        return
+
+    everest_core = EverestCore(everest_prefix, config_path)
     yield everest_core
 
     # FIXME (aw): proper life time management, shouldn't the fixure start and stop?
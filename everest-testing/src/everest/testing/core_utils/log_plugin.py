@@ -0,0 +1,73 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2023 Pionix GmbH and Contributors to EVerest
+
+from pathlib import Path
+
+import pytest
+
+from everest.testing.core_utils.everest_log import active_logs, begin_test, end_test, log_dir_of_test
+from everest.testing.core_utils.worker_resources import get_worker_resources, remove_run_dir
+
+DEFAULT_LOG_DIR = "/tmp/everest_test_logs"
+DEFAULT_LOG_TAIL_LINES = 200
+
+# the id of the test run of the pytest-xdist workers, set in the controller process only
+_xdist_run_id = None
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("everest")
+    group.addoption("--everest-log-dir", action="store", default=DEFAULT_LOG_DIR,
+                    help=f"directory for the compressed EVerest logs of each test; default = '{DEFAULT_LOG_DIR}'")
+    group.addoption("--everest-log-tail", action="store", type=int, default=DEFAULT_LOG_TAIL_LINES,
+                    help="number of the last EVerest log lines attached to the report of a failed test; "
+                         f"default = {DEFAULT_LOG_TAIL_LINES}")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Writes the EVerest logs of each test, including its fixtures, to files of their own
+    """
+    base_dir = Path(item.config.getoption("--everest-log-dir"))
+    # only tests with EverestCore instances need the worker resources
+    begin_test(lambda: log_dir_of_test(get_worker_resources().logs_dir(base_dir), item.nodeid))
+    try:
+        yield
+    finally:
+        end_test()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Attaches the last lines of the EVerest logs written during a failed test to its report
+    """
+    outcome = yield
+    report = outcome.get_result()
+    if not report.failed:
+        return
+
+    tail_lines = item.config.getoption("--everest-log-tail")
+    for everest_log in active_logs():
+        title = f"EVerest {everest_log.name} log, last {tail_lines} lines"
+        if everest_log.log_file_path:
+            title += f" (full log: {everest_log.log_file_path})"
+        report.sections.append((title, "\n".join(everest_log.tail(tail_lines))))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Called by pytest-xdist in the controller process for each worker
+    """
+    global _xdist_run_id
+    _xdist_run_id = node.workerinput["testrunuid"]
+
+
+def pytest_sessionfinish(session):
+    """Removes the temp files of the workers, in the controller process once all workers finished
+    """
+    if hasattr(session.config, "workerinput"):
+        return
+
+    if _xdist_run_id is not None:
+        remove_run_dir(_xdist_run_id)
+    remove_run_dir()
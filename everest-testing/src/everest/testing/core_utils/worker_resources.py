@@ -0,0 +1,132 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2020 - 2023 Pionix GmbH and Contributors to EVerest
+
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+# set by pytest-xdist in its worker processes
+XDIST_WORKER_ENV = "PYTEST_XDIST_WORKER"
+XDIST_TESTRUNUID_ENV = "PYTEST_XDIST_TESTRUNUID"
+
+MAX_PORT_ATTEMPTS = 100
+
+
+class ResourceCollisionError(Exception):
+    """Raised if a resource is claimed by two workers of the same test run
+    """
+
+
+def run_dir_of(run_id: str, base_dir: Optional[Path] = None) -> Path:
+    """Returns the directory shared by all workers of the test run with the given id
+    """
+    base_dir = Path(tempfile.gettempdir()) if base_dir is None else base_dir
+    return base_dir / f"everest-testing-{run_id}"
+
+
+class WorkerResources:
+    """Allocates the resources of the tests running in this process, i.e. one pytest-xdist worker, so that workers
+    running in parallel on the same host don't get in each others way: ports, a temp root, MQTT prefixes and log
+    directories.
+
+    All workers of a test run claim their resources in a shared directory. A claim is a file created exclusively,
+    holding the id of the claiming worker, so a resource claimed twice raises a ResourceCollisionError instead of
+    two EVerest instances silently sharing it.
+    """
+
+    def __init__(self, worker_id: Optional[str] = None, run_id: Optional[str] = None,
+                 base_dir: Optional[Path] = None) -> None:
+        self.xdist_worker = XDIST_WORKER_ENV in os.environ
+        self.worker_id = worker_id or os.environ.get(XDIST_WORKER_ENV, "master")
+        # the pid tells apart two processes with the same worker id
+        self.owner = f"{self.worker_id} (pid {os.getpid()})"
+        # without pytest-xdist there is only this process in the test run
+        run_id = run_id or os.environ.get(XDIST_TESTRUNUID_ENV) or uuid.uuid4().hex
+
+        self.run_dir = run_dir_of(run_id, base_dir)
+        self.claims_dir = self.run_dir / "claims"
+        self.claims_dir.mkdir(parents=True, exist_ok=True)
+
+        self.claim("temp-root", self.worker_id)
+        self.temp_root = self.run_dir / self.worker_id
+        self.temp_root.mkdir(exist_ok=True)
+
+        self._ports: Dict[str, int] = {}
+
+    def claim(self, kind: str, value) -> None:
+        """Claims the resource for this worker, raises a ResourceCollisionError if another worker claimed it
+        """
+        claim_path = self.claims_dir / f"{kind}-{value}"
+        try:
+            fd = os.open(claim_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+        except FileExistsError:
+            owner = claim_path.read_text()
+            if owner != self.owner:
+                raise ResourceCollisionError(f"{kind} {value} of worker {self.owner} is used by worker {owner}")
+            return
+
+        with os.fdopen(fd, "w") as claim_file:
+            claim_file.write(self.owner)
+
+    def allocate_port(self) -> int:
+        """Returns a free TCP port on localhost, which no other worker of the test run got
+        """
+        for _ in range(MAX_PORT_ATTEMPTS):
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as port_socket:
+                port_socket.bind(("127.0.0.1", 0))
+                port = port_socket.getsockname()[1]
+            try:
+                self.claim("port", port)
+                return port
+            except ResourceCollisionError:
+                logging.debug(f"Port {port} is used by another worker, trying another one")
+
+        raise ResourceCollisionError(f"No free port found for worker {self.owner}")
+
+    def port(self, name: str) -> int:
+        """Returns the port of the given name, which stays the same for all tests of this worker, e.g. the port of
+        a central system, so that a running EVerest can connect to it again
+        """
+        if name not in self._ports:
+            self._ports[name] = self.allocate_port()
+
+        return self._ports[name]
+
+    def logs_dir(self, base_dir: Path) -> Path:
+        """Returns the directory for the logs of this worker below base_dir, base_dir itself without xdist
+        """
+        return Path(base_dir) / self.worker_id if self.xdist_worker else Path(base_dir)
+
+
+_worker_resources: Optional[WorkerResources] = None
+
+
+def get_worker_resources() -> WorkerResources:
+    """Returns the resources of the worker running in this process
+    """
+    global _worker_resources
+    if _worker_resources is None:
+        _worker_resources = WorkerResources()
+        logging.info(f"worker {_worker_resources.worker_id} temp root: {_worker_resources.temp_root}")
+
+    return _worker_resources
+
+
+def remove_run_dir(run_id: Optional[str] = None):
+    """Removes the directory of the test run with the given id, once all of its workers finished. Without run id,
+    the one of the resources of this process gets removed, if they have been allocated
+    """
+    global _worker_resources
+    if run_id is not None:
+        run_dir = run_dir_of(run_id)
+    elif _worker_resources is not None:
+        (run_dir, _worker_resources) = (_worker_resources.run_dir, None)
+    else:
+        return
+
+    shutil.rmtree(run_dir, ignore_errors=True)
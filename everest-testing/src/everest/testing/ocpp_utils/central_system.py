@@ -8,6 +8,7 @@ import websockets
 from ocpp.routing import create_route_map
 from ocpp.charge_point import ChargePoint
 
+from everest.testing.core_utils.crash_monitor import wait_or_crash
 from everest.testing.ocpp_utils.charge_point_v16 import ChargePoint16
 from everest.testing.ocpp_utils.charge_point_v201 import ChargePoint201
 
@@ -86,7 +87,7 @@ class CentralSystem:
         """
         try:
             logging.debug("Waiting for chargepoint to connect")
-            await asyncio.wait_for(self.chargepoint_set_event.wait(), timeout)
+            await wait_or_crash(asyncio.wait_for(self.chargepoint_set_event.wait(), timeout))
             logging.debug("Chargepoint connected!")
             self.chargepoint_set_event.clear()
         except asyncio.exceptions.TimeoutError:
@@ -96,7 +97,8 @@ class CentralSystem:
             t_timeout = time.time() + timeout
             received_boot_notification = False
             while (time.time() < t_timeout and not received_boot_notification):
-                raw_message = await asyncio.wait_for(self.chargepoint.wait_for_message(), timeout=timeout)
+                raw_message = await wait_or_crash(
+                    asyncio.wait_for(self.chargepoint.wait_for_message(), timeout=timeout))
                 # FIXME(piet): Make proper check for BootNotification
                 received_boot_notification = "BootNotification" in raw_message
 
@@ -15,6 +15,8 @@ from ocpp.messages import unpack
 from ocpp.charge_point import ChargePoint as CP
 from ocpp.charge_point import snake_to_camel_case, camel_to_snake_case, asdict, remove_nones
 
+from everest.testing.core_utils.crash_monitor import wait_or_crash
+
 
 @dataclass
 class ChargePointInfo:
@@ -53,7 +55,8 @@ class FirmwareInfo:
 
 @dataclass
 class OcppTestConfiguration:
-    csms_port: str = 9000
+    # None: a port of this pytest-xdist worker, which stays the same for all its tests
+    csms_port: Optional[int] = None
     charge_point_info: ChargePointInfo = ChargePointInfo()
     config_path: Optional[Path] = None
     authorization_info: Optional[AuthorizationInfo] = None
@@ -108,7 +111,7 @@ async def wait_for_and_validate(meta_data: TestUtility, charge_point: CP, exp_ac
     t_timeout = time.time() + timeout
     while (time.time() < t_timeout):
         try:
-            raw_message = await asyncio.wait_for(charge_point.wait_for_message(), timeout=timeout)
+            raw_message = await wait_or_crash(asyncio.wait_for(charge_point.wait_for_message(), timeout=timeout))
             charge_point.message_event.clear()
             msg = unpack(raw_message)
             if (msg.action != None):
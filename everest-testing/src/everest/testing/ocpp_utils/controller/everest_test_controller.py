@@ -1,47 +1,117 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2020 - 2023 Pionix GmbH and Contributors to EVerest
 
+import asyncio
 import os
 import json
 import shutil
+import sqlite3
 from pathlib import Path
 from paho.mqtt import client as mqtt_client
 import logging
 import yaml
 import tempfile
 from datetime import datetime
+from typing import List, Optional
 
 from everest.testing.ocpp_utils.controller.test_controller_interface import TestController
 from everest.testing.core_utils.everest_core import EverestCore, TestControlModuleConnection
+from everest.testing.core_utils.worker_resources import get_worker_resources
 
 logging.basicConfig(level=logging.DEBUG)
 
 TEST_LOGS_DIR = "/tmp/everest_ocpp_test_logs"
 
+# tables of the OCPP databases, whose rows are created with the database and are kept by reset_ocpp_databases()
+OCPP_DATABASE_PRESERVED_TABLES = {"CONNECTORS", "AUTH_LIST_VERSION", "AVAILABILITY", "SCHEMA_MIGRATIONS"}
+
+
+def reset_ocpp_databases(database_dir: Path):
+    """Deletes the rows tests leave behind in the OCPP databases of the given directory, e.g. transactions, auth
+    cache and charging profiles. The device model database isn't touched, it is written by the test setup only
+    """
+    for database_path in Path(database_dir).glob("*.db"):
+        if database_path.name == "device_model_storage.db":
+            continue
+
+        connection = sqlite3.connect(database_path)
+        try:
+            tables = [row[0] for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+            for table in tables:
+                if table.upper() not in OCPP_DATABASE_PRESERVED_TABLES:
+                    connection.execute(f'DELETE FROM "{table}"')
+            connection.commit()
+        finally:
+            connection.close()
+
 
 class EverestTestController(TestController):
 
     def __init__(self, everest_core_path: Path, libocpp_path: Path, config_path: Path, chargepoint_id: str, ocpp_version: str,
-                 test_function_name: str = None, ocpp_module_id: str = "ocpp") -> None:
-        self.everest_core = EverestCore(everest_core_path, config_path)
+                 test_function_name: str = None, ocpp_module_id: str = "ocpp",
+                 everest_core: EverestCore = None) -> None:
+        """If everest_core is given, e.g. a running instance of an EverestCorePool, it is used instead of a new
+        instance and the OCPP files are kept in its temp dir, so they stay the same for all tests using it
+        """
+        self.pooled = everest_core is not None
+        self.everest_core = everest_core if self.pooled else EverestCore(everest_core_path, config_path)
         self.libocpp_path = libocpp_path
         self.config_path = config_path
         self.mqtt_client = None
         self.chargepoint_id = chargepoint_id
         self.ocpp_version = ocpp_version
         self.test_function_name = test_function_name
-        self.temp_ocpp_config_file = tempfile.NamedTemporaryFile(
-            delete=False, mode="w+", suffix=".json")
-        self.temp_ocpp_user_config_file = tempfile.NamedTemporaryFile(
-            delete=False, mode="w+", suffix=".json")
-        self.temp_ocpp_database_dir = tempfile.TemporaryDirectory()
-        self.temp_ocpp_log_dir = tempfile.TemporaryDirectory()
-        self.temp_ocpp_certs_dir = tempfile.TemporaryDirectory()
+        if self.pooled and "ocpp" in self.everest_core.module_files:
+            # the instance has been used by an earlier test, it still runs with its files
+            (self.temp_ocpp_config_file, self.temp_ocpp_user_config_file, self.temp_ocpp_database_dir,
+             self.temp_ocpp_log_dir, self.temp_ocpp_certs_dir) = self.everest_core.module_files["ocpp"]
+        else:
+            temp_dir = self.everest_core.temp_dir
+            self.temp_ocpp_config_file = tempfile.NamedTemporaryFile(
+                delete=False, mode="w+", suffix=".json", dir=temp_dir)
+            self.temp_ocpp_user_config_file = tempfile.NamedTemporaryFile(
+                delete=False, mode="w+", suffix=".json", dir=temp_dir)
+            self.temp_ocpp_database_dir = tempfile.TemporaryDirectory(dir=temp_dir)
+            self.temp_ocpp_log_dir = tempfile.TemporaryDirectory(dir=temp_dir)
+            self.temp_ocpp_certs_dir = tempfile.TemporaryDirectory(dir=temp_dir)
+            if self.pooled:
+                self.everest_core.module_files["ocpp"] = (
+                    self.temp_ocpp_config_file, self.temp_ocpp_user_config_file, self.temp_ocpp_database_dir,
+                    self.temp_ocpp_log_dir, self.temp_ocpp_certs_dir)
+                self.everest_core.config_dependencies += [Path(self.temp_ocpp_config_file.name),
+                                                          Path(self.temp_ocpp_user_config_file.name)]
         self.first_run = True
         self.mqtt_external_prefix = ""
         self.ocpp_module_id = ocpp_module_id
 
     def start(self, central_system_port=None, standalone_module=None):
+        modules_to_test = self._prepare_start(central_system_port, standalone_module)
+        self.everest_core.start(
+            standalone_module=standalone_module, modules_to_test=modules_to_test)
+        self._connect()
+
+    async def start_async(self, central_system_port=None, standalone_module=None):
+        """Like start(), but the event loop keeps running while EVerest starts up, so the central system can serve the
+        connecting charge point meanwhile. The blocking preparation of the config files, databases and certificates
+        runs in the default executor
+        """
+        loop = asyncio.get_running_loop()
+        modules_to_test = await loop.run_in_executor(None, self._prepare_start, central_system_port, standalone_module)
+        if self.pooled:
+            # a subprocess of the event loop gets killed with the loop, which lives for one test only, so a pooled
+            # instance is started in the default executor instead
+            await loop.run_in_executor(None, lambda: self.everest_core.start(
+                standalone_module=standalone_module, modules_to_test=modules_to_test))
+        else:
+            await self.everest_core.start_async(
+                standalone_module=standalone_module, modules_to_test=modules_to_test)
+        await loop.run_in_executor(None, self._connect)
+
+    def _prepare_start(self, central_system_port, standalone_module) -> Optional[List[TestControlModuleConnection]]:
+        """Writes the OCPP and everest-core configs, initializes the databases and installs the certificates, returns
+        the modules to test
+        """
         logging.info(f"Central system port: {central_system_port}")
         # modify ocpp config with given central system port and modify everest-core config as well
         everest_config = yaml.safe_load(
@@ -71,16 +141,26 @@ class EverestTestController(TestController):
         if self.first_run:
             logging.info("First run")
             self.first_run = False
-            self.temp_ocpp_config_file.write(json.dumps(ocpp_config))
-            self.temp_ocpp_config_file.flush()
-            self.temp_ocpp_user_config_file.write("{}")
-            self.temp_ocpp_user_config_file.flush()
+            for (file, content) in [(self.temp_ocpp_config_file, json.dumps(ocpp_config)),
+                                    (self.temp_ocpp_user_config_file, "{}")]:
+                # the files of a reused instance hold the content of the earlier test
+                file.seek(0)
+                file.write(content)
+                file.truncate()
+                file.flush()
+
+        # commands initializing the databases, which aren't run again for an instance that is reused
+        init_database_commands = []
 
         if "active_modules" in everest_config and self.ocpp_module_id in everest_config["active_modules"]:
-            os.makedirs(TEST_LOGS_DIR, exist_ok=True)
+            test_logs_dir = get_worker_resources().logs_dir(TEST_LOGS_DIR)
+            os.makedirs(test_logs_dir, exist_ok=True)
             everest_config["active_modules"][self.ocpp_module_id]["config_module"]["ChargePointConfigPath"] = self.temp_ocpp_config_file.name
+            # a config changing with each test would prevent reusing the instance
+            message_log_name = self.everest_core.everest_uuid if self.pooled else \
+                f"{self.test_function_name}-{datetime.utcnow().isoformat()}"
             everest_config["active_modules"][self.ocpp_module_id]["config_module"][
-                "MessageLogPath"] = f"{TEST_LOGS_DIR}/{self.test_function_name}-{datetime.utcnow().isoformat()}"
+                "MessageLogPath"] = f"{test_logs_dir}/{message_log_name}"
             everest_config["active_modules"][self.ocpp_module_id]["config_module"]["CertsPath"] = self.temp_ocpp_certs_dir.name
             if everest_config["active_modules"][self.ocpp_module_id]["module"] == "OCPP":
                 everest_config["active_modules"][self.ocpp_module_id]["config_module"][
@@ -90,33 +170,55 @@ class EverestTestController(TestController):
                 everest_config["active_modules"][self.ocpp_module_id]["config_module"]["CoreDatabasePath"] = self.temp_ocpp_database_dir.name
                 everest_config["active_modules"][self.ocpp_module_id]["config_module"][
                     "DeviceModelDatabasePath"] = f"{self.temp_ocpp_database_dir.name}/device_model_storage.db"
-                os.system(
-                    f"python3 {str(self.libocpp_path)}/config/v201/init_device_model_db.py --out {self.temp_ocpp_database_dir.name}/device_model_storage.db --config_path {str(self.libocpp_path)}/config/v201")
-                os.system(
-                    f"python3 {str(self.libocpp_path)}/config/v201/insert_device_model_config.py --config {self.temp_ocpp_config_file.name} --db {str(self.temp_ocpp_database_dir.name)}/device_model_storage.db")
+                init_database_commands = [
+                    f"python3 {str(self.libocpp_path)}/config/v201/init_device_model_db.py"
+                    f" --out {self.temp_ocpp_database_dir.name}/device_model_storage.db"
+                    f" --config_path {str(self.libocpp_path)}/config/v201",
+                    f"python3 {str(self.libocpp_path)}/config/v201/insert_device_model_config.py"
+                    f" --config {self.temp_ocpp_config_file.name}"
+                    f" --db {str(self.temp_ocpp_database_dir.name)}/device_model_storage.db"]
 
         self.everest_core.temp_everest_config_file.seek(0)
         yaml.dump(everest_config, self.everest_core.temp_everest_config_file)
+        self.everest_core.temp_everest_config_file.truncate()
+        self.everest_core.temp_everest_config_file.flush()
+
+        modules_to_test = None
+        if standalone_module == 'probe_module':
+            modules_to_test = [TestControlModuleConnection(
+                evse_manager_id="connector_1", car_simulator_id="car_simulator", ocpp_id="ocpp")]
+
+        if not self.everest_core.is_reusable(standalone_module, modules_to_test):
+            if self.everest_core.is_running():
+                # a pooled instance with a different config, the databases mustn't be written while it runs
+                self.everest_core.stop()
+            if self.pooled:
+                # the device model database of an earlier config gets created anew
+                Path(f"{self.temp_ocpp_database_dir.name}/device_model_storage.db").unlink(missing_ok=True)
+            for command in init_database_commands:
+                os.system(command)
 
-        # install default certificates
-        certs_dir = self.everest_core.etc_path / 'certs'
+            # install default certificates
+            certs_dir = self.everest_core.etc_path / 'certs'
 
-        shutil.copytree(
-            f"{certs_dir}/ca", f"{self.temp_ocpp_certs_dir.name}/ca", dirs_exist_ok=True)
-        shutil.copytree(
-            f"{certs_dir}/client", f"{self.temp_ocpp_certs_dir.name}/client", dirs_exist_ok=True)
+            shutil.copytree(
+                f"{certs_dir}/ca", f"{self.temp_ocpp_certs_dir.name}/ca", dirs_exist_ok=True)
+            shutil.copytree(
+                f"{certs_dir}/client", f"{self.temp_ocpp_certs_dir.name}/client", dirs_exist_ok=True)
 
         logging.info(f"temp ocpp config: {self.temp_ocpp_config_file.name}")
         logging.info(
             f"temp ocpp user config: {self.temp_ocpp_user_config_file.name}")
         logging.info(f"temp ocpp certs path: {self.temp_ocpp_certs_dir.name}")
 
-        modules_to_test = None
-        if standalone_module == 'probe_module':
-            modules_to_test = [TestControlModuleConnection(
-                evse_manager_id="connector_1", car_simulator_id="car_simulator", ocpp_id="ocpp")]
-        self.everest_core.start(
-            standalone_module=standalone_module, modules_to_test=modules_to_test)
+        return modules_to_test
+
+    def _connect(self):
+        """Connects to the MQTT broker of the started EVerest and enables the car simulators
+        """
+        if self.pooled:
+            database_dir = self.temp_ocpp_database_dir.name
+            self.everest_core.reset_hooks.append(lambda _everest_core: reset_ocpp_databases(database_dir))
         self.mqtt_external_prefix = self.everest_core.mqtt_external_prefix
 
         mqtt_server_uri = os.environ.get("MQTT_SERVER_ADDRESS", "127.0.0.1")
@@ -130,9 +232,28 @@ class EverestTestController(TestController):
         self.mqtt_client.publish(
             f"{self.mqtt_external_prefix}everest_external/nodered/2/carsim/cmd/enable", "true")
 
+    @property
+    def reused(self) -> bool:
+        """True, if the last start() reused a running instance, which won't boot again
+        """
+        return self.everest_core.reused
+
     def stop(self):
+        if self.pooled:
+            # the instance is kept running by the pool
+            if self.mqtt_client:
+                self.mqtt_client.disconnect()
+            return
         self.everest_core.stop()
 
+    async def stop_async(self):
+        """Like stop(), but without blocking the event loop
+        """
+        if self.pooled:
+            await asyncio.get_running_loop().run_in_executor(None, self.stop)
+            return
+        await self.everest_core.stop_async()
+
     def plug_in(self, connector_id=1):
         self.mqtt_client.publish(f"{self.mqtt_external_prefix}everest_external/nodered/{connector_id}/carsim/cmd/execute_charging_session",
                                  "sleep 1;iec_wait_pwr_ready;sleep 1;draw_power_regulated 32,1;sleep 200;unplug")
@@ -23,6 +23,21 @@ class TestController:
         """
         raise NotImplementedError()
 
+    async def start_async(self, *args, **kwargs):
+        """
+        This method starts the chargepoint like start(), but without blocking
+        the event loop, so the CSMS can serve the connecting chargepoint meanwhile.
+        Calls start() by default.
+        """
+        self.start(*args, **kwargs)
+
+    async def stop_async(self):
+        """
+        This method stops the chargepoint like stop(), but without blocking
+        the event loop. Calls stop() by default.
+        """
+        self.stop()
+
     def plug_in(self, connector_id):
         """
         Plug in of an electric vehicle to the chargepoint.
@@ -19,11 +19,30 @@ from everest.testing.ocpp_utils.controller.test_controller_interface import Test
 from everest.testing.ocpp_utils.controller.everest_test_controller import EverestTestController
 from everest.testing.ocpp_utils.central_system import CentralSystem
 from everest.testing.ocpp_utils.charge_point_utils import TestUtility, OcppTestConfiguration
+from everest.testing.core_utils.everest_core_pool import EverestCorePool
+from everest.testing.core_utils import fixtures as core_fixtures
+from everest.testing.core_utils.worker_resources import WorkerResources
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
 
+# the fixtures used by the ocpp fixtures, re-exported so "from everest.testing.ocpp_utils.fixtures import *" provides
+# them as well
+everest_core_pool = core_fixtures.everest_core_pool
+worker_resources = core_fixtures.worker_resources
+
+
+def _csms_port(test_config: OcppTestConfiguration, worker_resources: WorkerResources, name: str) -> int:
+    """Returns the port of the central system, the csms_port of the test_config gets claimed, so workers using the
+    same port raise a ResourceCollisionError instead of failing to bind it
+    """
+    if test_config.csms_port is None:
+        return worker_resources.port(name)
+
+    worker_resources.claim("port", test_config.csms_port)
+    return test_config.csms_port
+
 
 @pytest.fixture
-def test_controller(request, test_config: OcppTestConfiguration) -> TestController:
+def test_controller(request, test_config: OcppTestConfiguration, everest_core_pool: EverestCorePool) -> TestController:
     """Fixture that references the the test_controller that can be used for
     control events for the test cases.
     """
@@ -41,14 +60,18 @@ def test_controller(request, test_config: OcppTestConfiguration) -> TestControll
         config_path = Path(marker.args[0])
 
     libocpp_path = Path(request.config.getoption("--libocpp"))
+    everest_core = everest_core_pool.acquire(config_path) if everest_core_pool is not None else None
     test_controller = EverestTestController(
-        everest_core_path, libocpp_path, config_path, test_config.charge_point_info.charge_point_id, ocpp_version, request.function.__name__)
+        everest_core_path, libocpp_path, config_path, test_config.charge_point_info.charge_point_id, ocpp_version,
+        request.function.__name__, everest_core=everest_core)
     yield test_controller
     test_controller.stop()
+    if everest_core is not None:
+        everest_core_pool.release(everest_core)
 
 
 @pytest_asyncio.fixture
-async def central_system_v16(request, test_config: OcppTestConfiguration):
+async def central_system_v16(request, test_config: OcppTestConfiguration, worker_resources: WorkerResources):
     """Fixture for CentralSystem. Can be started as TLS or
     plain websocket depending on the request parameter.
     """
@@ -60,7 +83,7 @@ async def central_system_v16(request, test_config: OcppTestConfiguration):
                                     test_config.certificate_info.csms_passphrase)
     else:
         ssl_context = None
-    cs = CentralSystem(None,
+    cs = CentralSystem(_csms_port(test_config, worker_resources, "csms-ocpp1.6"),
                        test_config.charge_point_info.charge_point_id,
                        ocpp_version='ocpp1.6')
     await cs.start(ssl_context)
@@ -70,7 +93,7 @@ async def central_system_v16(request, test_config: OcppTestConfiguration):
 
 
 @pytest_asyncio.fixture
-async def central_system_v201(request, test_config: OcppTestConfiguration):
+async def central_system_v201(request, test_config: OcppTestConfiguration, worker_resources: WorkerResources):
     """Fixture for CentralSystem. Can be started as TLS or
     plain websocket depending on the request parameter.
     """
@@ -81,7 +104,7 @@ async def central_system_v201(request, test_config: OcppTestConfiguration):
                                     test_config.certificate_info.csms_passphrase)
     else:
         ssl_context = None
-    cs = CentralSystem(None,
+    cs = CentralSystem(_csms_port(test_config, worker_resources, "csms-ocpp2.0.1"),
                        test_config.charge_point_info.charge_point_id,
                        ocpp_version='ocpp2.0.1')
     await cs.start(ssl_context)
@@ -96,11 +119,12 @@ async def central_system_v16_standalone(request, central_system_v16: CentralSyst
     """
     marker = request.node.get_closest_marker('standalone_module')
     if marker is None:
-        test_controller.start(central_system_v16.port)
+        await test_controller.start_async(central_system_v16.port)
     else:
         standalone_module = marker.args[0]
-        test_controller.start(central_system_v16.port, standalone_module)
+        await test_controller.start_async(central_system_v16.port, standalone_module)
     yield central_system_v16
+    await test_controller.stop_async()
 
 
 @pytest_asyncio.fixture
@@ -109,22 +133,28 @@ async def charge_point_v16(request, central_system_v16: CentralSystem, test_cont
     """
     marker = request.node.get_closest_marker('standalone_module')
     if marker is None:
-        test_controller.start(central_system_v16.port)
+        await test_controller.start_async(central_system_v16.port)
     else:
         raise Exception("Using a standalone module with the charge_point_v16 fixture is not supported, please use central_system_v16_standalone")
-    cp = await central_system_v16.wait_for_chargepoint()
+    # a reused instance is connected already and doesn't boot again
+    cp = await central_system_v16.wait_for_chargepoint(
+        wait_for_bootnotification=not getattr(test_controller, "reused", False))
     yield cp
     cp.stop()
+    await test_controller.stop_async()
 
 
 @pytest_asyncio.fixture
 async def charge_point_v201(central_system_v201: CentralSystem, test_controller: TestController):
     """Fixture for ChargePoint16. Requires central_system_v201 and test_controller. Starts test_controller immediately
     """
-    test_controller.start(central_system_v201.port)
-    cp = await central_system_v201.wait_for_chargepoint()
+    await test_controller.start_async(central_system_v201.port)
+    # a reused instance is connected already and doesn't boot again
+    cp = await central_system_v201.wait_for_chargepoint(
+        wait_for_bootnotification=not getattr(test_controller, "reused", False))
     yield cp
     cp.stop()
+    await test_controller.stop_async()
 
 
 @pytest.fixture